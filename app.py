@@ -5,11 +5,16 @@ from collections.abc import Generator
 from contextlib import contextmanager
 
 from dotenv import load_dotenv
+from testcontainers.core.container import DockerContainer
+from testcontainers.core.waiting_utils import wait_for_logs
 from testcontainers.redis import RedisContainer
 from typer import Argument, Exit, Option, Typer
 
 parser = Typer()
 
+CLUSTER_IMAGE = "grokzen/redis-cluster:7.0.10"
+CLUSTER_FIRST_PORT = 7000
+
 
 @parser.command()
 def run(
@@ -53,12 +58,17 @@ def test(
     verbose: bool = Option(False, help="Show log messages and tests output."),
     coverage: bool = Option(False, help="Show coverage report."),
     junit: bool = Option(False, help="Write JUnitXML output to 'junit.xml'."),
+    in_memory: bool = Option(
+        False, help="Use in-memory storage, skips Redis and its integration tests."
+    ),
+    cluster: bool = Option(False, help="Run against a local Redis Cluster."),
 ) -> None:
     """
     Run tests by a given path.
     """
     load_dotenv()
-    command = ["pytest"] + ([test_path] if test_path else [])
+    default_paths = ["tests/unit", "tests/e2e"] if in_memory else []
+    command = ["pytest"] + ([test_path] if test_path else default_paths)
     command.extend(
         [
             "--cov=app",
@@ -72,11 +82,113 @@ def test(
     )
     command.extend(["-vvs", "--log-cli-level=DEBUG"] if verbose else ["-v"])
     command.extend(["--junit-xml=junit.xml"] if junit else [])
-    with init_app_dependencies():
+    if in_memory:
+        os.environ["MEET_GRID__STORAGE_BACKEND"] = "memory"
+        dependencies = contextlib.nullcontext()
+    elif cluster:
+        dependencies = init_cluster_dependencies()
+    else:
+        dependencies = init_app_dependencies()
+    with dependencies:
         process = subprocess.run(command)
     raise Exit(process.returncode)
 
 
+@parser.command()
+def bench(
+    *,
+    output: str | None = Option(None, help="Write JSON report to the file."),
+    baseline: str | None = Option(None, help="JSON report to compare against."),
+    threshold: float = Option(0.1, help="Allowed slowdown vs baseline (0.1=10%)."),
+    quick: bool = Option(False, help="Run a reduced matrix, e.g. for CI."),
+    repeat: int = Option(3, help="Timing repetitions per stage, median is kept."),
+    backend: str | None = Option(None, help="Stats backend: python/numpy/bitset."),
+) -> None:
+    """
+    Run stats engine micro-benchmarks on synthetic topics.
+    """
+    load_dotenv()
+    from app.bench import (
+        FULL_MATRIX,
+        QUICK_MATRIX,
+        BenchReport,
+        compare_reports,
+        iter_cases,
+        run_matrix,
+        synthetic_topic,
+    )
+    from app.core import config
+
+    if backend is not None:
+        config.STATS.BACKEND = backend
+
+    report = run_matrix(
+        iter_cases(QUICK_MATRIX if quick else FULL_MATRIX),
+        lambda case: synthetic_topic(
+            case.voters,
+            case.horizon_days,
+            case.intervals_per_vote,
+            constrained=case.constrained,
+        ),
+        repeat=repeat,
+        on_result=lambda result: print(
+            f"{result.case.name:>20} "
+            + " ".join(f"{k}={v * 1000:.2f}ms" for k, v in result.timings.items())
+            + f" peak={result.peak_memory_bytes // 1024}KiB"
+        ),
+    )
+    if output:
+        with open(output, "w") as file:
+            file.write(report.model_dump_json(indent=2))
+
+    if baseline:
+        with open(baseline) as file:
+            previous = BenchReport.model_validate_json(file.read())
+        regressions = compare_reports(previous, report, threshold=threshold)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression.case} {regression.stage}: "
+                f"x{regression.ratio:.2f} "
+                f"({regression.baseline * 1000:.2f}ms -> "
+                f"{regression.current * 1000:.2f}ms)"
+            )
+        if regressions:
+            raise Exit(1)
+
+
+@parser.command()
+def migrate() -> None:
+    """
+    Convert topics stored in older Redis layouts into the current one.
+    """
+    load_dotenv()
+    import asyncio
+
+    from redis.asyncio import Redis, RedisCluster
+
+    from app.core import config
+    from app.db.compression import Compressor
+    from app.db.migrate import migrate_blob_topics, migrate_key_layout
+    from app.service.topic_stats import count_vote_slots
+
+    async def run_migration() -> tuple[int, int]:
+        client = RedisCluster if config.REDIS.CLUSTER else Redis
+        redis = client.from_url(config.REDIS.URL)
+        try:
+            moved = await migrate_key_layout(redis)
+            migrated = await migrate_blob_topics(
+                redis,
+                Compressor.from_settings(config.REDIS),
+                count_slots=count_vote_slots,
+            )
+            return moved, migrated
+        finally:
+            await redis.aclose()
+
+    moved, migrated = asyncio.run(run_migration())
+    print(f"Moved {moved} keys to hash-tagged names, migrated {migrated} topics.")
+
+
 @contextmanager
 def init_app_dependencies() -> Generator[None, None, None]:
     with RedisContainer("redis:alpine") as redis:
@@ -84,6 +196,24 @@ def init_app_dependencies() -> Generator[None, None, None]:
         yield
 
 
+@contextmanager
+def init_cluster_dependencies() -> Generator[None, None, None]:
+    """Starts a 3 primary, 3 replica cluster announcing host-mapped ports."""
+    ports = range(CLUSTER_FIRST_PORT, CLUSTER_FIRST_PORT + 6)
+    cluster = DockerContainer(CLUSTER_IMAGE).with_env("IP", "0.0.0.0")
+    cluster.with_env("INITIAL_PORT", str(CLUSTER_FIRST_PORT))
+    for port in ports:
+        cluster.with_bind_ports(port, port)
+    with cluster:
+        wait_for_logs(cluster, "Cluster state changed: ok")
+        os.environ["MEET_GRID__REDIS__HOST"] = "127.0.0.1"
+        os.environ["MEET_GRID__REDIS__PORT"] = str(CLUSTER_FIRST_PORT)
+        os.environ["MEET_GRID__REDIS__PASSWORD"] = ""
+        os.environ["MEET_GRID__REDIS__DB"] = "0"
+        os.environ["MEET_GRID__REDIS__CLUSTER"] = "true"
+        yield
+
+
 def export_redis_container_credentials(redis: RedisContainer) -> None:
     redis_host = redis.get_container_host_ip()
     redis_port = redis.get_exposed_port(6379)
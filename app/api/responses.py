@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from functools import cache
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+class ModelResponse(JSONResponse):
+    """
+    JSON response serialized once, by pydantic-core straight to bytes.
+
+    Handlers return it instead of a model, so FastAPI does not validate and
+    encode the result against `response_model` again; that one is kept for
+    the schema. Prepared bytes are sent as is, collections need an adapter.
+    """
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: Mapping[str, str] | None = None,
+        *,
+        adapter: TypeAdapter[Any] | None = None,
+    ) -> None:
+        self.adapter = adapter
+        super().__init__(content, status_code, headers)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        adapter = self.adapter or _adapter(type(content))
+        return adapter.dump_json(content)
+
+
+@cache
+def _adapter(model: type) -> TypeAdapter[Any]:
+    return TypeAdapter(model)
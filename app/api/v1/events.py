@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator
+from contextlib import aclosing
+from typing import Final
+
+from fastapi import APIRouter, Header, Query, WebSocket, status
+from fastapi.responses import StreamingResponse
+
+from app.core import config
+from app.core.exceptions import TopicNotFoundError
+from app.service import get_topic_version, watch_topic
+from app.service.topic_events import TopicUpdate
+
+HEARTBEAT_EVENT: Final[bytes] = b": heartbeat\n\n"
+STREAM_HEADERS: Final[dict[str, str]] = {
+    "Cache-Control": "no-cache",
+    # Proxies such as nginx would otherwise hold events back in their buffers.
+    "X-Accel-Buffering": "no",
+}
+
+router = APIRouter(prefix="/topic", tags=["Topics"])
+
+
+@router.get(
+    "/{topic_id}/events",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def topic_events_v1(
+    topic_id: str,
+    last_event_id: int = Header(0, ge=0, description="Topic version already seen."),
+) -> StreamingResponse:
+    """
+    Streams topic snapshots as server-sent events, the current one first.
+
+    Event ids are topic versions, so reconnecting clients skip what they have.
+    """
+    if not await get_topic_version(topic_id):
+        raise TopicNotFoundError
+    updates = _watch(topic_id, last_event_id)
+    return StreamingResponse(
+        _server_sent_events(updates),
+        media_type="text/event-stream",
+        headers=STREAM_HEADERS,
+    )
+
+
+@router.websocket("/{topic_id}/ws")
+async def topic_updates_ws_v1(
+    websocket: WebSocket, topic_id: str, since: int = Query(0, ge=0)
+) -> None:
+    """Sends the same snapshots as `/events` as JSON text messages."""
+    if not await get_topic_version(topic_id):
+        await websocket.close(status.WS_1008_POLICY_VIOLATION)
+        return
+    await websocket.accept()
+
+    forwarding = asyncio.create_task(_forward(websocket, _watch(topic_id, since)))
+    receiving = asyncio.create_task(_wait_disconnect(websocket))
+    done, pending = await asyncio.wait(
+        (forwarding, receiving), return_when=asyncio.FIRST_COMPLETED
+    )
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if forwarding in done:
+        failed = forwarding.exception() is not None
+        await websocket.close(
+            status.WS_1011_INTERNAL_ERROR if failed else status.WS_1000_NORMAL_CLOSURE
+        )
+
+
+def _watch(topic_id: str, since: int) -> AsyncGenerator[TopicUpdate | None, None]:
+    return watch_topic(
+        topic_id,
+        since=since,
+        heartbeat_seconds=config.EVENTS.HEARTBEAT_SECONDS,
+        idle_seconds=config.EVENTS.IDLE_SECONDS,
+    )
+
+
+async def _server_sent_events(
+    updates: AsyncGenerator[TopicUpdate | None, None],
+) -> AsyncIterator[bytes]:
+    # Closed explicitly, a cancelled stream would keep its listener until GC.
+    async with aclosing(updates):
+        async for update in updates:
+            if update is None:
+                yield HEARTBEAT_EVENT
+                continue
+            version, body = update
+            yield b"id: %d\nevent: snapshot\ndata: %s\n\n" % (version, body)
+
+
+async def _forward(
+    websocket: WebSocket, updates: AsyncGenerator[TopicUpdate | None, None]
+) -> None:
+    # Idle connections are kept alive by the server's protocol level pings.
+    async with aclosing(updates):
+        async for update in updates:
+            if update is not None:
+                await websocket.send_text(update[1].decode())
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
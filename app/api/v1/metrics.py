@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+
+from app.api.responses import ModelResponse
+from app.service import collect_metrics
+
+router = APIRouter(prefix="/metrics", tags=["Service"])
+
+
+@router.get("", response_model=dict[str, dict[str, float]])
+async def get_metrics_v1() -> Response:
+    """Returns counters of the worker serving the request."""
+    return ModelResponse(collect_metrics())
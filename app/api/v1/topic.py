@@ -1,10 +1,17 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, status
+from datetime import datetime
+from typing import Final
 
+from fastapi import APIRouter, Header, Query, Response, status
+from pydantic import TypeAdapter
+
+from app.api.responses import ModelResponse
 from app.models import (
+    BestWindows,
     ConstraintsPayload,
     CreatedTopic,
+    SlotVoters,
     TopicCreate,
     TopicResponse,
     VotePayload,
@@ -12,41 +19,140 @@ from app.models import (
 from app.service import (
     build_invite_link,
     create_topic,
-    get_topic_with_stats,
+    get_best_windows,
+    get_range_voters,
+    get_slot_voters,
+    get_topic_body,
+    get_topic_version,
     overwrite_constraints,
     replace_vote,
 )
 
-router = APIRouter(prefix="/topic", tags=["Topics"])
+MAX_WINDOW_MINUTES: Final[int] = 7 * 24 * 60
+MAX_WINDOWS: Final[int] = 50
+VERSION_HEADER: Final[str] = "X-Topic-Version"
+"""Topic version a response reflects, sent back by clients to read their writes."""
+TOPIC_CACHE_CONTROL: Final[str] = "public, no-cache"
+"""Shared caches may keep topics, but revalidate them by ETag on every request."""
+
+SLOT_VOTERS_ADAPTER: Final = TypeAdapter(list[SlotVoters])
+
+router = APIRouter(
+    prefix="/topic", tags=["Topics"], default_response_class=ModelResponse
+)
 
 
 @router.post("", response_model=CreatedTopic, status_code=status.HTTP_201_CREATED)
-async def create_topic_v1(username: str, payload: TopicCreate) -> CreatedTopic:
+async def create_topic_v1(username: str, payload: TopicCreate) -> Response:
     """Creates a topic record and returns invite link."""
-    topic = await create_topic(username, payload)
-    return CreatedTopic(invite_link=build_invite_link(topic.topic_id), topic=topic)
+    topic, version = await create_topic(username, payload)
+    created = CreatedTopic(invite_link=build_invite_link(topic.topic_id), topic=topic)
+    response = ModelResponse(created, status.HTTP_201_CREATED)
+    _set_version_headers(response, version)
+    return response
+
+
+@router.get(
+    "/{topic_id}",
+    response_model=TopicResponse,
+    responses={status.HTTP_304_NOT_MODIFIED: {"description": "ETag still matches."}},
+)
+async def get_topic_v1(
+    topic_id: str,
+    username: str | None = None,
+    x_topic_version: int = Header(0, ge=0, description="Last seen topic version."),
+    if_none_match: str | None = Header(None),
+) -> Response:
+    """
+    Returns topic with stats; username kept for parity with frontend API.
+
+    A matching `If-None-Match` is answered with 304 after a version lookup,
+    otherwise the body stored for the current version is sent as is.
+    """
+    if if_none_match is not None:
+        version = await get_topic_version(topic_id, min_version=x_topic_version)
+        if version and _etag_matches(if_none_match, _etag(version)):
+            not_modified = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+            _set_read_headers(not_modified, version)
+            return not_modified
+
+    body, version = await get_topic_body(topic_id, min_version=x_topic_version)
+    response = ModelResponse(body)
+    _set_read_headers(response, version)
+    return response
+
+
+@router.get("/{topic_id}/best", response_model=BestWindows)
+async def get_best_windows_v1(
+    topic_id: str,
+    duration: int = Query(
+        60,
+        gt=0,
+        le=MAX_WINDOW_MINUTES,
+        description="Minutes, a multiple of the topic slot size.",
+    ),
+    k: int = Query(5, gt=0, le=MAX_WINDOWS),
+    x_topic_version: int = Header(0, ge=0, description="Last seen topic version."),
+) -> Response:
+    """Returns top non-overlapping windows most voters can fully attend."""
+    return ModelResponse(
+        await get_best_windows(topic_id, duration, k, min_version=x_topic_version)
+    )
 
 
-@router.get("/{topic_id}", response_model=TopicResponse)
-async def get_topic_v1(topic_id: str, username: str | None = None) -> TopicResponse:
-    """Returns topic with stats; username kept for parity with frontend API."""
-    topic, stats = await get_topic_with_stats(topic_id)
-    return TopicResponse(topic=topic, stats=stats)
+@router.get("/{topic_id}/slots/voters", response_model=list[SlotVoters])
+async def get_range_voters_v1(
+    topic_id: str, start: datetime, end: datetime
+) -> Response:
+    """Returns voters of every covered slot in the range, at most a week."""
+    voters = await get_range_voters(topic_id, start, end)
+    return ModelResponse(voters, adapter=SLOT_VOTERS_ADAPTER)
+
+
+@router.get("/{topic_id}/slots/{slot}/voters", response_model=SlotVoters)
+async def get_slot_voters_v1(topic_id: str, slot: datetime) -> Response:
+    """Returns voters available in the slot containing the given moment."""
+    return ModelResponse(await get_slot_voters(topic_id, slot))
 
 
 @router.put("/{topic_id}/pick", response_model=TopicResponse)
 async def pick_intervals_v1(
     topic_id: str, username: str, payload: VotePayload
-) -> TopicResponse:
+) -> Response:
     """Saves caller vote and returns latest topic snapshot."""
-    topic, stats = await replace_vote(topic_id, username, payload)
-    return TopicResponse(topic=topic, stats=stats)
+    body, version = await replace_vote(topic_id, username, payload)
+    response = ModelResponse(body)
+    _set_version_headers(response, version)
+    return response
 
 
 @router.put("/{topic_id}/constraints", response_model=TopicResponse)
 async def update_constraints_v1(
     topic_id: str, username: str, payload: ConstraintsPayload
-) -> TopicResponse:
+) -> Response:
     """Allows admin to overwrite constraint windows."""
-    topic, stats = await overwrite_constraints(topic_id, username, payload)
-    return TopicResponse(topic=topic, stats=stats)
+    body, version = await overwrite_constraints(topic_id, username, payload)
+    response = ModelResponse(body)
+    _set_version_headers(response, version)
+    return response
+
+
+def _etag(version: int) -> str:
+    # Versions grow with every write and stats are derived from the topic.
+    return f'"{version}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of RFC 9110, the one `If-None-Match` uses."""
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _set_version_headers(response: Response, version: int) -> None:
+    response.headers[VERSION_HEADER] = str(version)
+    response.headers["ETag"] = _etag(version)
+
+
+def _set_read_headers(response: Response, version: int) -> None:
+    _set_version_headers(response, version)
+    response.headers["Cache-Control"] = TOPIC_CACHE_CONTROL
@@ -0,0 +1,27 @@
+from app.bench.runner import (
+    FULL_MATRIX,
+    QUICK_MATRIX,
+    BenchCase,
+    BenchReport,
+    BenchResult,
+    Regression,
+    compare_reports,
+    iter_cases,
+    run_case,
+    run_matrix,
+)
+from app.bench.synthetic import synthetic_topic
+
+__all__ = [
+    "FULL_MATRIX",
+    "QUICK_MATRIX",
+    "BenchCase",
+    "BenchReport",
+    "BenchResult",
+    "Regression",
+    "compare_reports",
+    "iter_cases",
+    "run_case",
+    "run_matrix",
+    "synthetic_topic",
+]
@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import json
+import platform
+import tracemalloc
+from collections.abc import Callable, Iterable
+from datetime import UTC, datetime
+from itertools import product
+from statistics import median
+from time import perf_counter
+from typing import Any
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from app.core import config
+from app.models import CompactTopic, Topic, TopicResponse
+from app.service import topic_stats
+from app.service.topic_stats import build_topic_stats
+from app.service.topics import TOPIC_RESPONSE_ADAPTER
+
+FULL_MATRIX: dict[str, list[Any]] = {
+    "voters": [10, 100, 1_000, 5_000],
+    "horizon_days": [1, 7, 30, 60],
+    "intervals_per_vote": [1, 4],
+    "constrained": [False, True],
+}
+QUICK_MATRIX: dict[str, list[Any]] = {
+    "voters": [10, 500],
+    "horizon_days": [1, 14],
+    "intervals_per_vote": [2],
+    "constrained": [False, True],
+}
+
+
+class BenchCase(BaseModel):
+    """Single point of the benchmark matrix."""
+
+    voters: int
+    horizon_days: int
+    intervals_per_vote: int
+    constrained: bool
+
+    @property
+    def name(self) -> str:
+        suffix = "c" if self.constrained else "u"
+        return (
+            f"v{self.voters}-d{self.horizon_days}-i{self.intervals_per_vote}-{suffix}"
+        )
+
+
+class BenchResult(BaseModel):
+    """Median stage timings in seconds and peak traced memory of one case."""
+
+    case: BenchCase
+    slots: int
+    timings: dict[str, float]
+    peak_memory_bytes: int
+
+
+class BenchReport(BaseModel):
+    """Benchmark run persisted as JSON to compare runs across commits."""
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
+    python: str = Field(default_factory=platform.python_version)
+    backend: str
+    repeat: int
+    results: list[BenchResult]
+
+
+class Regression(BaseModel):
+    """Stage that became slower than the baseline beyond the threshold."""
+
+    case: str
+    stage: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline
+
+
+def iter_cases(matrix: dict[str, list[Any]]) -> Iterable[BenchCase]:
+    keys = list(matrix)
+    for values in product(*(matrix[key] for key in keys)):
+        yield BenchCase(**dict(zip(keys, values)))
+
+
+def run_matrix(
+    cases: Iterable[BenchCase],
+    make_topic: Callable[[BenchCase], Topic],
+    *,
+    repeat: int = 3,
+    on_result: Callable[[BenchResult], None] | None = None,
+) -> BenchReport:
+    """Times the stats pipeline and its stages for every case."""
+    results = []
+    for case in cases:
+        result = run_case(make_topic(case), case, repeat=repeat)
+        if on_result is not None:
+            on_result(result)
+        results.append(result)
+    return BenchReport(backend=config.STATS.BACKEND, repeat=repeat, results=results)
+
+
+def run_case(topic: Topic, case: BenchCase, *, repeat: int = 3) -> BenchResult:
+    compact = CompactTopic.from_topic(topic)
+    constraints = compact.constraints if compact.constrained else None
+    counts = topic_stats._count_buckets(constraints, compact.votes.values())
+    ratios = [ratio for ratio, _ in topic_stats.RATIO_CONFIG]
+    ranges = topic_stats._compute_people_ranges(max(counts.values(), default=0), ratios)
+    labels = topic_stats._classify_slots_by_ratio(counts, ranges)
+
+    def build_blocks() -> None:
+        for ratio in ratios:
+            topic_stats._build_blocks(
+                compact.grid, counts, labels, ratio, ranges.get(ratio, (0, 0))
+            )
+
+    response = TopicResponse(topic=topic, stats=build_topic_stats(topic))
+
+    stages: dict[str, Callable[[], object]] = {
+        "build_topic_stats": lambda: build_topic_stats(topic),
+        "compact": lambda: CompactTopic.from_topic(topic),
+        "_count_buckets": lambda: topic_stats._count_buckets(
+            constraints, compact.votes.values()
+        ),
+        "_classify_slots_by_ratio": lambda: topic_stats._classify_slots_by_ratio(
+            counts, ranges
+        ),
+        "_build_blocks": build_blocks,
+        "response_model": lambda: _serialize_response_model(response),
+        "response_once": lambda: TOPIC_RESPONSE_ADAPTER.dump_json(response),
+    }
+    timings = {name: _time(stage, repeat) for name, stage in stages.items()}
+    return BenchResult(
+        case=case,
+        slots=len(counts),
+        timings=timings,
+        peak_memory_bytes=_peak_memory(lambda: build_topic_stats(topic)),
+    )
+
+
+def compare_reports(
+    baseline: BenchReport, current: BenchReport, *, threshold: float
+) -> list[Regression]:
+    """Returns stages slower than the baseline by more than `threshold` (0.1=10%)."""
+    previous = {result.case.name: result for result in baseline.results}
+    regressions = []
+    for result in current.results:
+        if (reference := previous.get(result.case.name)) is None:
+            continue
+        for stage, seconds in result.timings.items():
+            before = reference.timings.get(stage)
+            if before and seconds > before * (1 + threshold):
+                regressions.append(
+                    Regression(
+                        case=result.case.name,
+                        stage=stage,
+                        baseline=before,
+                        current=seconds,
+                    )
+                )
+    return regressions
+
+
+def _serialize_response_model(
+    response: TopicResponse,
+    adapter: TypeAdapter[TopicResponse] = TOPIC_RESPONSE_ADAPTER,
+) -> bytes:
+    """Mirrors FastAPI returning a model: dump, validate, dump again, json.dumps."""
+    validated = adapter.validate_python(response.model_dump(by_alias=True))
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode()
+
+
+def _time(stage: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(max(1, repeat)):
+        started = perf_counter()
+        stage()
+        samples.append(perf_counter() - started)
+    return median(samples)
+
+
+def _peak_memory(stage: Callable[[], object]) -> int:
+    tracemalloc.start()
+    try:
+        stage()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
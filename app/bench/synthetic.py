@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+from app.core import config
+from app.models import Interval, Topic
+
+BENCH_EPOCH = datetime(2025, 1, 6, 0, 0)
+WORKDAY_HOURS = (9, 21)
+MAX_VOTE_SLOTS = 16
+
+
+def synthetic_topic(
+    voters: int,
+    horizon_days: int,
+    intervals_per_vote: int,
+    *,
+    constrained: bool,
+    seed: int = 0,
+) -> Topic:
+    """
+    Generates a reproducible topic for benchmarks.
+
+    Votes are slot-aligned windows of up to four hours spread over the horizon.
+    Constraints, when enabled, allow a daily working-hours window.
+    """
+    rng = random.Random(seed)
+    slot = timedelta(minutes=config.GRID.SLOT_MINUTES_SIZE)
+    horizon_slots = horizon_days * (timedelta(days=1) // slot)
+
+    votes: dict[str, list[Interval]] = {}
+    for voter in range(voters):
+        intervals = []
+        for _ in range(intervals_per_vote):
+            start = rng.randrange(horizon_slots)
+            length = rng.randint(1, MAX_VOTE_SLOTS)
+            intervals.append(
+                Interval(
+                    start=BENCH_EPOCH + start * slot,
+                    end=BENCH_EPOCH + min(start + length, horizon_slots) * slot,
+                )
+            )
+        votes[f"voter{voter}"] = intervals
+
+    constraints = []
+    if constrained:
+        first, last = WORKDAY_HOURS
+        for day in range(horizon_days):
+            midnight = BENCH_EPOCH + timedelta(days=day)
+            constraints.append(
+                Interval(
+                    start=midnight + timedelta(hours=first),
+                    end=midnight + timedelta(hours=last),
+                )
+            )
+
+    return Topic(
+        topic_id=f"bench-{voters}-{horizon_days}-{intervals_per_vote}",
+        topic_name="Benchmark",
+        admin_name="bench",
+        constraints=constraints,
+        votes=votes,
+        created_at=BENCH_EPOCH,
+    )
@@ -1,19 +1,37 @@
 from functools import cached_property
+from typing import Literal
 
 from pydantic import BaseModel, computed_field
 
+CompressionAlgorithm = Literal["none", "zlib", "lzma"]
+
 
 class RedisSettings(BaseModel):
-    HOST: str
-    PORT: int
-    DB: int
+    HOST: str = "localhost"
+    PORT: int = 6379
+    DB: int = 0
 
     PASSWORD: str | None = None
     USE_TLS: bool = False
+    CLUSTER: bool = False
+    REPLICA_URLS: list[str] = []
+    REPLICA_CHECK_INTERVAL_SECONDS: float = 5
 
     TTL_DAYS: int
     MAX_RETRY: int
 
+    COMPRESSION: CompressionAlgorithm = "none"
+    COMPRESSION_LEVEL: int = 6
+    COMPRESSION_MIN_BYTES: int = 4096
+
+    CLIENT_CACHE: bool = False
+    CLIENT_CACHE_MAX_ENTRIES: int = 1024
+    CLIENT_CACHE_MAX_BYTES: int = 67_108_864
+    CLIENT_CACHE_RECONNECT_SECONDS: float = 1
+
+    VOTE_BATCH_WINDOW_SECONDS: float = 0
+    VOTE_BATCH_MAX_SIZE: int = 64
+
     @computed_field
     @cached_property
     def URL(self) -> str:
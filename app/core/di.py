@@ -1,12 +1,97 @@
 import inject
-from redis.asyncio import Redis
+from redis.asyncio import Redis, RedisCluster
 
 from app.core import config
+from app.db.compression import Compressor
+from app.db.memory import MemoryStorage
+from app.db.replicas import ReplicaPool
+from app.db.storage import RedisStorage, TopicStorage
+from app.db.tracking import TopicCache
+from app.service.best_windows import BestWindowsCache
+from app.service.stats_cache import StatsCache
+from app.service.stats_executor import StatsExecutor
+from app.service.topic_events import TopicEvents
+from app.service.topics import render_topic
+from app.service.vote_batcher import VoteBatcher
+from app.service.voter_index import VoterIndexCache
 
 
 def _bind_redis(binder: inject.Binder) -> None:
+    if config.REDIS.CLUSTER:
+        # Cluster client speaks the same commands, topic keys share a hash slot.
+        binder.bind(Redis, RedisCluster.from_url(config.REDIS.URL))
+        return
     binder.bind(Redis, Redis.from_url(config.REDIS.URL))
 
 
+def _bind_replicas(binder: inject.Binder) -> None:
+    binder.bind(ReplicaPool, ReplicaPool.from_settings(config.REDIS))
+
+
+def _bind_storage(binder: inject.Binder) -> None:
+    if config.STORAGE_BACKEND == "memory":
+        binder.bind(TopicStorage, MemoryStorage(config.REDIS.TTL_SECONDS))
+        return
+    binder.bind_to_constructor(
+        TopicStorage, lambda: RedisStorage(inject.instance(Redis))
+    )
+
+
+def _bind_compressor(binder: inject.Binder) -> None:
+    binder.bind(Compressor, Compressor.from_settings(config.REDIS))
+
+
+def _bind_topic_cache(binder: inject.Binder) -> None:
+    binder.bind(TopicCache, TopicCache.from_settings(config.REDIS))
+
+
+def _bind_stats_cache(binder: inject.Binder) -> None:
+    binder.bind(StatsCache, StatsCache.from_settings(config.STATS))
+
+
+def _bind_stats_executor(binder: inject.Binder) -> None:
+    binder.bind(StatsExecutor, StatsExecutor.from_settings(config.STATS))
+
+
+def _bind_voter_indexes(binder: inject.Binder) -> None:
+    binder.bind(VoterIndexCache, VoterIndexCache.from_settings(config.STATS))
+
+
+def _bind_best_windows(binder: inject.Binder) -> None:
+    binder.bind(BestWindowsCache, BestWindowsCache.from_settings(config.STATS))
+
+
+def _bind_vote_batcher(binder: inject.Binder) -> None:
+    binder.bind_to_constructor(
+        VoteBatcher,
+        lambda: VoteBatcher.from_settings(
+            config.REDIS,
+            inject.instance(TopicStorage),
+            inject.instance(TopicEvents),
+            render_topic,
+        ),
+    )
+
+
+def _bind_topic_events(binder: inject.Binder) -> None:
+    # The in-memory storage serves a single worker, updates stay in-process.
+    url = None if config.STORAGE_BACKEND == "memory" else config.REDIS.URL
+    binder.bind(TopicEvents, TopicEvents.from_settings(config.EVENTS, url))
+
+
+def _bind_all(binder: inject.Binder) -> None:
+    _bind_redis(binder)
+    _bind_replicas(binder)
+    _bind_storage(binder)
+    _bind_compressor(binder)
+    _bind_topic_cache(binder)
+    _bind_stats_cache(binder)
+    _bind_stats_executor(binder)
+    _bind_voter_indexes(binder)
+    _bind_best_windows(binder)
+    _bind_vote_batcher(binder)
+    _bind_topic_events(binder)
+
+
 def configure_di() -> None:
-    inject.configure(_bind_redis)
+    inject.configure(_bind_all)
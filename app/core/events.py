@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class EventsSettings(BaseModel):
+    HEARTBEAT_SECONDS: float = 15
+    IDLE_SECONDS: float = 600
+    RECONNECT_SECONDS: float = 1
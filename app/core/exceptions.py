@@ -35,5 +35,35 @@ class ForbiddenActionError(ServiceError):
     status_code: Final[int] = 403
 
 
+class InvalidRangeError(ServiceError):
+    """Range must end after it starts, both bounds with or without timezone."""
+
+    status_code: Final[int] = 422
+
+
+class RangeTooWideError(ServiceError):
+    """Requested time range is too wide."""
+
+    status_code: Final[int] = 422
+
+
+class DurationNotAlignedError(ServiceError):
+    """Duration must be a whole number of topic slots."""
+
+    status_code: Final[int] = 422
+
+
+class StatsOverloadedError(ServiceError):
+    """Stats are being computed for too many large topics, try again later."""
+
+    status_code: Final[int] = 503
+
+
+class StatsTimeoutError(ServiceError):
+    """Stats computation took too long, try again later."""
+
+    status_code: Final[int] = 503
+
+
 def exception_handler(request: Request, exc: ServiceError) -> JSONResponse:
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
@@ -1,6 +1,21 @@
-from pydantic import BaseModel
+from typing import Final, Literal, get_args
+
+from pydantic import BaseModel, field_validator
+
+SlotMinutes = Literal[5, 10, 15, 30, 60]
+
+LEGACY_SLOT_MINUTES: Final[SlotMinutes] = 15
+"""Slot size of topics stored before it was configurable, their counts use it."""
 
 
 class GridSettings(BaseModel):
     SLOT_MINUTES_SIZE: int
     TOPIC_ID_LENGTH: int
+
+    @field_validator("SLOT_MINUTES_SIZE")
+    @classmethod
+    def check_slot_minutes(cls, value: int) -> int:
+        # Checked after the int cast, env overrides arrive as strings.
+        if value not in get_args(SlotMinutes):
+            raise ValueError(f"must be one of {get_args(SlotMinutes)}")
+        return value
@@ -1,10 +1,13 @@
 from pathlib import Path
+from typing import Literal
 
 from pydantic import computed_field
 from pydantic_config import SettingsConfig, SettingsModel
 
 from .db import RedisSettings
+from .events import EventsSettings
 from .grid import GridSettings
+from .stats import StatsSettings
 
 PUBLIC_CONFIG_PATH = Path("config.yaml")
 
@@ -17,8 +20,12 @@ class Settings(SettingsModel):
     ALLOW_ORIGINS: str
     SITE_BASE_URL: str
 
+    STORAGE_BACKEND: Literal["redis", "memory"] = "redis"
+
     REDIS: RedisSettings
     GRID: GridSettings
+    STATS: StatsSettings
+    EVENTS: EventsSettings
 
     @computed_field
     @property
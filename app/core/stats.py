@@ -0,0 +1,18 @@
+from typing import Literal
+
+from pydantic import BaseModel
+
+
+class StatsSettings(BaseModel):
+    BACKEND: Literal["python", "numpy", "bitset"] = "python"
+
+    CACHE_MAX_ENTRIES: int = 0
+    CACHE_MAX_BYTES: int = 0
+    CACHE_TTL_SECONDS: float = 0
+    INDEX_MAX_ENTRIES: int = 0
+    WINDOWS_MAX_ENTRIES: int = 0
+
+    EXECUTOR_WORKERS: int = 0
+    EXECUTOR_INLINE_BUDGET: int = 500_000
+    EXECUTOR_TIMEOUT_SECONDS: float = 10
+    EXECUTOR_MAX_PENDING: int = 4
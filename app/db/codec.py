@@ -0,0 +1,145 @@
+"""
+Versioned binary codec for stored topics.
+
+Votes are packed as microsecond offsets from the Unix epoch instead of
+ISO-8601 strings. Metadata stays JSON, since scripts edit it in place.
+Values that still hold legacy JSON are decoded transparently and replaced
+with the binary form the next time they are written.
+"""
+
+import struct
+from array import array
+from datetime import UTC, datetime, timedelta, timezone, tzinfo
+
+from pydantic import TypeAdapter
+
+from app.models import Interval, SlotCounts, StatsSnapshot, Topic, TopicStats
+
+FORMAT_VERSION = 1
+
+VOTE_ADAPTER = TypeAdapter(list[Interval])
+
+type RawSnapshot = tuple[bytes, int, bytes | None]
+"""Packed topic, its version and raw stats snapshot."""
+
+type CountsSnapshot = tuple[Topic, int, SlotCounts | None]
+"""Topic metadata without votes, its version and stored voters per slot."""
+
+_VOTE_HEADER = struct.Struct("<Bi")
+"""Format version and UTC offset in seconds shared by every bound."""
+
+_TOPIC_HEADER = struct.Struct("<BI")
+"""Format version and metadata length of a packed topic."""
+
+_ENTRY_HEADER = struct.Struct("<HI")
+"""Username and vote lengths of a packed topic entry."""
+
+_NAIVE = -(2**31)
+_MICROSECOND = timedelta(microseconds=1)
+_NAIVE_EPOCH = datetime(1970, 1, 1)
+_AWARE_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def encode_vote(intervals: list[Interval]) -> bytes:
+    """
+    Packs intervals into a version byte, a UTC offset and int64 bounds.
+
+    Intervals mixing offsets cannot share the header and are kept as JSON.
+    """
+    offsets = {
+        moment.utcoffset()
+        for window in intervals
+        for moment in (window.start, window.end)
+    }
+    if len(offsets) > 1:
+        return VOTE_ADAPTER.dump_json(intervals)
+
+    offset = next(iter(offsets), None)
+    epoch = _NAIVE_EPOCH if offset is None else _AWARE_EPOCH
+    bounds = array(
+        "q",
+        (
+            (moment - epoch) // _MICROSECOND
+            for window in intervals
+            for moment in (window.start, window.end)
+        ),
+    )
+    header = _VOTE_HEADER.pack(
+        FORMAT_VERSION, _NAIVE if offset is None else offset // timedelta(seconds=1)
+    )
+    return header + bounds.tobytes()
+
+
+def decode_vote(data: bytes) -> list[Interval]:
+    """Unpacks a vote written by `encode_vote` or by the legacy JSON layout."""
+    if data[:1] != bytes((FORMAT_VERSION,)):
+        return VOTE_ADAPTER.validate_json(data)
+
+    _, offset = _VOTE_HEADER.unpack_from(data)
+    bounds = array("q")
+    bounds.frombytes(data[_VOTE_HEADER.size :])
+    epoch = _epoch(offset)
+    moments = [epoch + value * _MICROSECOND for value in bounds]
+    return [
+        Interval.model_construct(start=start, end=end)
+        for start, end in zip(moments[0::2], moments[1::2])
+    ]
+
+
+def encode_meta(topic: Topic) -> str:
+    return topic.model_dump_json(exclude={"votes"})
+
+
+def pack_topic(meta: bytes, votes: dict[bytes, bytes]) -> bytes:
+    """
+    Frames raw metadata and votes into one byte string, sorted by voter.
+
+    Equal topics pack into equal bytes, so the result doubles as a cache key.
+    """
+    parts = [_TOPIC_HEADER.pack(FORMAT_VERSION, len(meta)), meta]
+    for user in sorted(votes):
+        vote = votes[user]
+        parts.extend((_ENTRY_HEADER.pack(len(user), len(vote)), user, vote))
+    return b"".join(parts)
+
+
+def decode_topic(data: bytes) -> Topic:
+    """Decodes a topic packed by `pack_topic`."""
+    _, size = _TOPIC_HEADER.unpack_from(data)
+    position = _TOPIC_HEADER.size + size
+    meta = data[_TOPIC_HEADER.size : position]
+
+    votes: dict[bytes, bytes] = {}
+    while position < len(data):
+        user_size, vote_size = _ENTRY_HEADER.unpack_from(data, position)
+        position += _ENTRY_HEADER.size
+        user = data[position : position + user_size]
+        position += user_size
+        votes[user] = data[position : position + vote_size]
+        position += vote_size
+    return topic_from_parts(meta, votes)
+
+
+def topic_from_parts(meta: bytes, votes: dict[bytes, bytes]) -> Topic:
+    """Builds a topic from metadata JSON and its raw votes hash."""
+    topic = Topic.model_validate_json(meta)
+    topic.votes = {user.decode(): decode_vote(votes[user]) for user in sorted(votes)}
+    return topic
+
+
+def decode_stats(snapshot: bytes | None, version: int) -> TopicStats | None:
+    """Returns materialized stats if they were built for the given version."""
+    if snapshot is None:
+        return None
+    stored = StatsSnapshot.model_validate_json(snapshot)
+    return stored.stats if stored.version == version else None
+
+
+def _epoch(offset: int) -> datetime:
+    if offset == _NAIVE:
+        return _NAIVE_EPOCH
+    return _AWARE_EPOCH.astimezone(_timezone(offset))
+
+
+def _timezone(offset: int) -> tzinfo:
+    return UTC if offset == 0 else timezone(timedelta(seconds=offset))
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import lzma
+import zlib
+from time import perf_counter
+
+from app.core.db import CompressionAlgorithm, RedisSettings
+
+MARKER = b"\xfe"
+"""Prefix of compressed values, neither JSON nor binary votes start with it."""
+
+_ALGORITHMS = {b"z": "zlib", b"x": "lzma"}
+
+
+class Compressor:
+    """
+    Compresses stored values above a size threshold.
+
+    Compressed values carry a marker and an algorithm byte, so they coexist
+    with plain ones and stay readable after the settings change.
+    """
+
+    def __init__(
+        self, algorithm: CompressionAlgorithm, level: int, min_bytes: int
+    ) -> None:
+        self.algorithm = algorithm
+        self.level = level
+        self.min_bytes = min_bytes
+
+        self.compressed = 0
+        self.raw_bytes = 0
+        self.stored_bytes = 0
+        self.compress_seconds = 0.0
+        self.decompress_seconds = 0.0
+
+    @classmethod
+    def from_settings(cls, settings: RedisSettings) -> Compressor:
+        return cls(
+            algorithm=settings.COMPRESSION,
+            level=settings.COMPRESSION_LEVEL,
+            min_bytes=settings.COMPRESSION_MIN_BYTES,
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        """Returns compressed data if it is large enough and actually shrinks."""
+        if self.algorithm == "none" or len(data) < self.min_bytes:
+            return data
+
+        started = perf_counter()
+        if self.algorithm == "zlib":
+            packed = b"z" + zlib.compress(data, self.level)
+        else:
+            packed = b"x" + lzma.compress(data, preset=self.level)
+        self.compress_seconds += perf_counter() - started
+        if len(packed) + len(MARKER) >= len(data):
+            return data
+
+        self.compressed += 1
+        self.raw_bytes += len(data)
+        self.stored_bytes += len(packed) + len(MARKER)
+        return MARKER + packed
+
+    def decompress(self, data: bytes) -> bytes:
+        """Restores a value written by `compress`, plain values pass through."""
+        if not data.startswith(MARKER):
+            return data
+
+        started = perf_counter()
+        payload = data[len(MARKER) + 1 :]
+        if _ALGORITHMS[data[1:2]] == "zlib":
+            plain = zlib.decompress(payload)
+        else:
+            plain = lzma.decompress(payload)
+        self.decompress_seconds += perf_counter() - started
+        return plain
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "compressed": self.compressed,
+            "raw_bytes": self.raw_bytes,
+            "stored_bytes": self.stored_bytes,
+            "ratio": self.raw_bytes / self.stored_bytes if self.stored_bytes else 1.0,
+            "compress_seconds": self.compress_seconds,
+            "decompress_seconds": self.decompress_seconds,
+        }
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable
+from dataclasses import dataclass
+from time import monotonic
+
+from app.core.exceptions import ForbiddenActionError, TopicNotFoundError
+from app.db.codec import (
+    CountsSnapshot,
+    RawSnapshot,
+    decode_vote,
+    encode_meta,
+    encode_vote,
+    pack_topic,
+    topic_from_parts,
+)
+from app.db.storage import VotesCommit
+from app.models import (
+    Interval,
+    SlotCounts,
+    SlotGrid,
+    SlotRuns,
+    StatsSnapshot,
+    Topic,
+    TopicStats,
+)
+
+PURGE_INTERVAL_SECONDS = 60
+
+
+@dataclass(slots=True)
+class _Record:
+    meta: bytes
+    votes: dict[bytes, bytes]
+    version: int
+    expires_at: float
+    stats: bytes | None = None
+    body: tuple[int, bytes] | None = None
+
+
+class MemoryStorage:
+    """
+    In-process storage for tests, benchmarks and single-node deployments.
+
+    Records keep the encoded form used in Redis, so reads behave the same way.
+    No method awaits while holding a record, which makes every write atomic
+    on the event loop, stats and rendered bodies are still only kept for the
+    version they match.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._records: dict[str, _Record] = {}
+        self._purge_at = 0.0
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    async def save_topic(
+        self,
+        topic: Topic,
+        *,
+        refresh_ttl: bool = False,
+        stats: TopicStats | None = None,
+    ) -> int:
+        self._purge()
+        previous = self._live(topic.topic_id)
+        expires_at = monotonic() + self.ttl_seconds
+        if previous is not None and not refresh_ttl:
+            expires_at = previous.expires_at
+
+        record = _Record(
+            meta=encode_meta(topic).encode(),
+            votes=_encode_votes(topic),
+            version=1 if previous is None else previous.version + 1,
+            expires_at=expires_at,
+        )
+        if stats is not None:
+            record.stats = _encode_snapshot(record.version, stats)
+        self._records[topic.topic_id] = record
+        return record.version
+
+    async def get_topic_version(self, topic_id: str, *, min_version: int = 0) -> int:
+        record = self._live(topic_id)
+        return 0 if record is None else record.version
+
+    async def get_raw_topic_snapshot(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> RawSnapshot:
+        record = self._get(topic_id)
+        return pack_topic(record.meta, record.votes), record.version, record.stats
+
+    async def get_slot_counts(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> CountsSnapshot:
+        # Counts are not kept here, callers count the votes instead.
+        record = self._get(topic_id)
+        return Topic.model_validate_json(record.meta), record.version, None
+
+    async def save_stats(self, topic_id: str, version: int, stats: TopicStats) -> bool:
+        record = self._live(topic_id)
+        if record is None or record.version != version:
+            return False
+        record.stats = _encode_snapshot(version, stats)
+        return True
+
+    async def save_body(self, topic_id: str, version: int, body: bytes) -> bool:
+        record = self._live(topic_id)
+        if record is None or record.version != version:
+            return False
+        record.body = version, body
+        return True
+
+    async def get_body(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> tuple[int, bytes | None]:
+        record = self._live(topic_id)
+        if record is None:
+            return 0, None
+        if record.body is None or record.body[0] != record.version:
+            return record.version, None
+        return record.body
+
+    async def delete_topic(self, topic_id: str) -> None:
+        self._records.pop(topic_id, None)
+
+    async def set_votes(
+        self,
+        topic_id: str,
+        votes: list[tuple[str, list[Interval]]],
+        *,
+        count_slots: Callable[[Topic], SlotCounts],
+        summarize: Callable[[Topic, SlotCounts], TopicStats],
+    ) -> VotesCommit:
+        record = self._get(topic_id)
+        grid = SlotGrid.for_topic(Topic.model_validate_json(record.meta))
+
+        previous: list[SlotRuns] = []
+        for username, intervals in votes:
+            user = username.encode()
+            before = record.votes.get(user)
+            previous.append(
+                array("q") if before is None else grid.to_runs(decode_vote(before))
+            )
+            record.votes[user] = encode_vote(intervals)
+        record.version += len(votes)
+
+        topic = topic_from_parts(record.meta, record.votes)
+        stats = summarize(topic, count_slots(topic))
+        record.stats = _encode_snapshot(record.version, stats)
+        return topic, stats, record.version, previous
+
+    async def set_constraints(
+        self, topic_id: str, username: str, constraints: list[Interval]
+    ) -> tuple[Topic, int]:
+        record = self._get(topic_id)
+        topic = topic_from_parts(record.meta, record.votes)
+        if topic.admin_name != username:
+            raise ForbiddenActionError("Only topic admin can edit constraints.")
+
+        topic.constraints = constraints
+        record.meta = encode_meta(topic).encode()
+        record.version += 1
+        return topic, record.version
+
+    async def aclose(self) -> None:
+        self._records.clear()
+
+    def _get(self, topic_id: str) -> _Record:
+        record = self._live(topic_id)
+        if record is None:
+            raise TopicNotFoundError
+        return record
+
+    def _live(self, topic_id: str) -> _Record | None:
+        record = self._records.get(topic_id)
+        if record is not None and record.expires_at <= monotonic():
+            del self._records[topic_id]
+            return None
+        return record
+
+    def _purge(self) -> None:
+        """Drops expired records, at most once a minute."""
+        now = monotonic()
+        if now < self._purge_at:
+            return
+        self._purge_at = now + PURGE_INTERVAL_SECONDS
+        expired = [key for key, rec in self._records.items() if rec.expires_at <= now]
+        for topic_id in expired:
+            del self._records[topic_id]
+
+
+def _encode_votes(topic: Topic) -> dict[bytes, bytes]:
+    return {
+        user.encode(): encode_vote(intervals) for user, intervals in topic.votes.items()
+    }
+
+
+def _encode_snapshot(version: int, stats: TopicStats) -> bytes:
+    return StatsSnapshot(version=version, stats=stats).model_dump_json().encode()
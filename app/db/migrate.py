@@ -0,0 +1,108 @@
+from collections.abc import Callable
+
+import inject
+from redis.asyncio import Redis
+from redis.exceptions import WatchError
+
+from app.core import config
+from app.db.compression import Compressor
+from app.db.redis import (
+    _counts_key,
+    _runs_key,
+    _version_key,
+    _write_counts,
+    _write_topic,
+    _write_version,
+    topic_key,
+)
+from app.models import SlotCounts, Topic
+
+LEGACY_TOPIC_PATTERN = "topic:*"
+
+
+@inject.autoparams("redis")
+async def migrate_key_layout(redis: Redis, *, batch: int = 500) -> int:
+    """
+    Moves `topic:<id>:<suffix>` keys under hash-tagged `topic:{<id>}:<suffix>`.
+
+    Keys are copied with DUMP and RESTORE, which keeps the remaining TTL and
+    works across cluster nodes. Returns the number of moved keys.
+    """
+    moved = 0
+    async for key in redis.scan_iter(match=LEGACY_TOPIC_PATTERN, count=batch):
+        parts = key.decode().split(":")
+        if len(parts) != 3 or parts[1].startswith("{"):
+            continue
+        dump = await redis.dump(key)
+        if dump is None:
+            continue
+        ttl = await redis.pttl(key)
+        await redis.restore(
+            topic_key(parts[1], parts[2]), max(ttl, 0), dump, replace=True
+        )
+        await redis.delete(key)
+        moved += 1
+    return moved
+
+
+@inject.autoparams("redis", "compressor")
+async def migrate_blob_topics(
+    redis: Redis,
+    compressor: Compressor,
+    *,
+    count_slots: Callable[[Topic], SlotCounts],
+    batch: int = 500,
+) -> int:
+    """
+    Converts topics stored as a single JSON blob into metadata plus votes hash.
+
+    Voter runs and slot counts built by `count_slots` are written alongside.
+    Existing versions and materialized stats are kept, topics without one
+    start at version 1. The remaining TTL is preserved. Returns the number of converted topics; running it again is a no-op.
+    Blob keys do not share a hash slot with the new ones, so this has to run
+    before switching to Redis Cluster.
+    """
+    migrated = 0
+    async for key in redis.scan_iter(match=LEGACY_TOPIC_PATTERN, count=batch):
+        # Legacy keys are bare `topic:<id>`, the new layout only uses suffixed ones.
+        if key.count(b":") != 1:
+            continue
+        migrated += await _migrate_topic(redis, compressor, key.decode(), count_slots)
+    return migrated
+
+
+async def _migrate_topic(
+    redis: Redis,
+    compressor: Compressor,
+    key: str,
+    count_slots: Callable[[Topic], SlotCounts],
+    max_retries: int = config.REDIS.MAX_RETRY,
+) -> int:
+    for _ in range(max_retries):
+        async with redis.pipeline() as pipe:
+            try:
+                await pipe.watch(key)
+                data = await pipe.get(key)
+                if data is None:
+                    return 0
+                expire_at = await pipe.pexpiretime(key)
+                topic = Topic.model_validate_json(data)
+                topic_id = topic.topic_id
+                version_key = _version_key(topic_id)
+                await pipe.watch(version_key)
+                versioned = await pipe.exists(version_key)
+
+                pipe.multi()
+                _write_topic(pipe, topic, expire_at, compressor)
+                _write_counts(pipe, topic, count_slots(topic))
+                if not versioned:
+                    _write_version(pipe, topic_id, 1, None)
+                pipe.delete(key)
+                if expire_at > 0:
+                    for derived in (_runs_key, _counts_key, _version_key):
+                        pipe.pexpireat(derived(topic_id), expire_at)
+                await pipe.execute()
+                return 1
+            except WatchError:
+                continue
+    return 0
@@ -1,62 +1,531 @@
-from typing import Callable
+from array import array
+from collections import OrderedDict
+from collections.abc import Callable
+from operator import itemgetter
 
 import inject
-from pydantic import ValidationError
 from redis.asyncio import Redis
-from redis.exceptions import WatchError
+from redis.asyncio.client import Pipeline
 
 from app.core import config
-from app.core.exceptions import InconsistencyError, TopicNotFoundError
-from app.models import Topic
+from app.core.exceptions import (
+    ForbiddenActionError,
+    TopicNotFoundError,
+)
+from app.db import scripts
+from app.db.codec import (
+    VOTE_ADAPTER,
+    CountsSnapshot,
+    RawSnapshot,
+    encode_meta,
+    encode_vote,
+    pack_topic,
+    topic_from_parts,
+)
+from app.db.compression import Compressor
+from app.db.replicas import ReplicaPool
+from app.db.tracking import TopicCache
+from app.models import (
+    Interval,
+    SlotCounts,
+    SlotGrid,
+    SlotRuns,
+    StatsSnapshot,
+    Topic,
+    TopicStats,
+)
 
+COUNTS_READY_FIELD = "ready"
+"""Marks a counts hash built from all votes, hashes without it are rebuilt."""
 
-@inject.autoparams("redis")
-async def save_topic(topic: Topic, redis: Redis, *, refresh_ttl: bool = False) -> None:
-    await redis.set(
-        f"topic:{topic.topic_id}",
-        topic.model_dump_json(),
-        ex=config.REDIS.TTL_SECONDS if refresh_ttl else None,
-        keepttl=not refresh_ttl,
+_SAVE_TOPIC = scripts.script(scripts.SAVE_TOPIC)
+_SET_VOTES = scripts.script(scripts.SET_VOTES)
+_REBUILD_COUNTS = scripts.script(scripts.REBUILD_COUNTS)
+_SET_CONSTRAINTS = scripts.script(scripts.SET_CONSTRAINTS)
+_SAVE_STATS = scripts.script(scripts.SAVE_STATS)
+_SAVE_BODY = scripts.script(scripts.SAVE_BODY)
+
+GRID_CACHE_SIZE = 4096
+"""Slot grids of recently voted topics kept per worker, grids never change."""
+
+_grids: OrderedDict[str, SlotGrid] = OrderedDict()
+
+
+@inject.autoparams("redis", "compressor", "cache")
+async def save_topic(
+    topic: Topic,
+    redis: Redis,
+    compressor: Compressor,
+    cache: TopicCache,
+    *,
+    refresh_ttl: bool = False,
+    stats: TopicStats | None = None,
+) -> int:
+    """Overwrites topic, bumps its version and returns the new one."""
+    votes = [
+        field
+        for user, intervals in topic.votes.items()
+        for field in (user, compressor.compress(encode_vote(intervals)))
+    ]
+    version = await _SAVE_TOPIC(
+        keys=[
+            _meta_key(topic.topic_id),
+            _votes_key(topic.topic_id),
+            _runs_key(topic.topic_id),
+            _counts_key(topic.topic_id),
+            _version_key(topic.topic_id),
+            _stats_key(topic.topic_id),
+        ],
+        args=[
+            encode_meta(topic),
+            config.REDIS.TTL_SECONDS,
+            int(refresh_ttl),
+            "" if stats is None else stats.model_dump_json(),
+            *votes,
+        ],
+        client=redis,
     )
+    cache.invalidate(topic.topic_id)
+    return version
 
 
-@inject.autoparams("redis")
-async def get_topic(topic_id: str, redis: Redis) -> Topic:
-    data = await redis.get(f"topic:{topic_id}")
-    if data is not None:
-        return Topic.model_validate_json(data)
-    raise TopicNotFoundError
+@inject.autoparams("redis", "replicas")
+async def get_topic_version(
+    topic_id: str, redis: Redis, replicas: ReplicaPool, *, min_version: int = 0
+) -> int:
+    """
+    Returns current topic version, 0 if it is unknown.
 
+    A replica that caught up to `min_version` answers first, like for reads.
+    """
+    if replicas:
+        version = await replicas.read(
+            lambda replica: _load_version(topic_id, replica),
+            min_version,
+            version_of=int,
+        )
+        if version is not None:
+            return version
+    return int(await redis.get(_version_key(topic_id)) or 0)
 
-@inject.autoparams("redis")
-async def delete_topic(topic_id: str, redis: Redis) -> None:
-    await redis.delete(f"topic:{topic_id}")
+
+async def _load_version(topic_id: str, redis: Redis) -> int:
+    version = int(await redis.get(_version_key(topic_id)) or 0)
+    if not version:
+        # The replica may not have the topic yet, the primary decides.
+        raise TopicNotFoundError
+    return version
+
+
+@inject.autoparams("redis", "compressor", "cache", "replicas")
+async def get_raw_topic_snapshot(
+    topic_id: str,
+    redis: Redis,
+    compressor: Compressor,
+    cache: TopicCache,
+    replicas: ReplicaPool,
+    *,
+    min_version: int = 0,
+) -> RawSnapshot:
+    """
+    Loads packed topic, its version and undecoded stats in one round trip.
+
+    Served from the tracked per-worker cache when client caching is enabled,
+    otherwise from a replica, either way only if it caught up to `min_version`.
+    The primary is read when neither can serve it.
+    """
+    if not cache.connected and replicas:
+        snapshot = await replicas.read(
+            lambda replica: _load_raw_snapshot(topic_id, replica, compressor),
+            min_version,
+            version_of=itemgetter(1),
+        )
+        if snapshot is not None:
+            return snapshot
+    return await cache.get(
+        topic_id, lambda: _load_raw_snapshot(topic_id, redis, compressor), min_version
+    )
+
+
+async def _load_raw_snapshot(
+    topic_id: str, redis: Redis, compressor: Compressor
+) -> RawSnapshot:
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.get(_meta_key(topic_id))
+        pipe.hgetall(_votes_key(topic_id))
+        pipe.get(_version_key(topic_id))
+        pipe.get(_stats_key(topic_id))
+        meta, votes, version, snapshot = await pipe.execute()
+
+    if meta is None:
+        raise TopicNotFoundError
+    votes = _decompress_votes(compressor, votes)
+    return pack_topic(meta, votes), int(version or 0), snapshot
+
+
+@inject.autoparams("redis", "replicas")
+async def get_slot_counts(
+    topic_id: str, redis: Redis, replicas: ReplicaPool, *, min_version: int = 0
+) -> CountsSnapshot:
+    """
+    Returns topic metadata, its version and stored voters per slot.
+
+    Votes are not read. Counts are None until a vote rebuilds them after they
+    expired. A replica that caught up to `min_version` answers first.
+    """
+    if replicas:
+        loaded = await replicas.read(
+            lambda replica: _load_slot_counts(topic_id, replica),
+            min_version,
+            version_of=itemgetter(1),
+        )
+        if loaded is not None:
+            return loaded
+    return await _load_slot_counts(topic_id, redis)
+
+
+async def _load_slot_counts(topic_id: str, redis: Redis) -> CountsSnapshot:
+    async with redis.pipeline(transaction=True) as pipe:
+        pipe.get(_meta_key(topic_id))
+        pipe.get(_version_key(topic_id))
+        pipe.hgetall(_counts_key(topic_id))
+        meta, version, stored = await pipe.execute()
+
+    if meta is None:
+        raise TopicNotFoundError
+    ready = COUNTS_READY_FIELD.encode() in stored
+    counts = _decode_counts(stored) if ready else None
+    return Topic.model_validate_json(meta), int(version or 0), counts
+
+
+@inject.autoparams("redis", "cache")
+async def save_stats(
+    topic_id: str, version: int, stats: TopicStats, redis: Redis, cache: TopicCache
+) -> bool:
+    """Materializes stats unless the topic moved past the given version."""
+    saved = await _SAVE_STATS(
+        keys=[_meta_key(topic_id), _version_key(topic_id), _stats_key(topic_id)],
+        args=[version, stats.model_dump_json(), config.REDIS.TTL_SECONDS],
+        client=redis,
+    )
+    if saved:
+        cache.invalidate(topic_id)
+    return bool(saved)
 
 
 @inject.autoparams("redis")
-async def patch_topic(
+async def save_body(topic_id: str, version: int, body: bytes, redis: Redis) -> bool:
+    """Stores a rendered response unless the topic moved past the given version."""
+    saved = await _SAVE_BODY(
+        keys=[_meta_key(topic_id), _version_key(topic_id), _body_key(topic_id)],
+        args=[version, body, config.REDIS.TTL_SECONDS],
+        client=redis,
+    )
+    return bool(saved)
+
+
+@inject.autoparams("redis", "replicas")
+async def get_body(
+    topic_id: str, redis: Redis, replicas: ReplicaPool, *, min_version: int = 0
+) -> tuple[int, bytes | None]:
+    """
+    Returns current topic version and the response rendered for it, if any.
+
+    A replica is asked first and the primary only when it lacks the body.
+    """
+    if replicas:
+        loaded = await replicas.read(
+            lambda replica: _load_body(topic_id, replica),
+            min_version,
+            version_of=itemgetter(0),
+        )
+        if loaded is not None and loaded[1] is not None:
+            return loaded
+    return await _load_body(topic_id, redis)
+
+
+async def _load_body(topic_id: str, redis: Redis) -> tuple[int, bytes | None]:
+    version, stored = await redis.mget(_version_key(topic_id), _body_key(topic_id))
+    version = int(version or 0)
+    if stored is None:
+        return version, None
+    body_version, _, body = stored.partition(b":")
+    return version, body if int(body_version) == version else None
+
+
+@inject.autoparams("redis", "cache")
+async def delete_topic(topic_id: str, redis: Redis, cache: TopicCache) -> None:
+    await redis.delete(
+        _meta_key(topic_id),
+        _votes_key(topic_id),
+        _runs_key(topic_id),
+        _counts_key(topic_id),
+        _version_key(topic_id),
+        _stats_key(topic_id),
+        _body_key(topic_id),
+    )
+    _grids.pop(topic_id, None)
+    cache.invalidate(topic_id)
+
+
+@inject.autoparams("redis", "compressor", "cache")
+async def set_votes(
     topic_id: str,
-    mutation: Callable[[Topic], None],
+    votes: list[tuple[str, list[Interval]]],
     redis: Redis,
+    compressor: Compressor,
+    cache: TopicCache,
     *,
-    max_retries: int = config.REDIS.MAX_RETRY,
-) -> Topic:
-    key = f"topic:{topic_id}"
-    for _ in range(max_retries):
-        async with redis.pipeline() as pipe:
-            try:
-                await pipe.watch(key)
-                topic = Topic.model_validate_json(await pipe.get(key))
-
-                mutation(topic)
-
-                pipe.multi()
-                pipe.set(key, topic.model_dump_json())
-
-                if await pipe.execute():
-                    return topic
-            except WatchError:
-                continue
-            except ValidationError:
-                raise TopicNotFoundError
-    raise InconsistencyError
+    count_slots: Callable[[Topic], SlotCounts],
+    summarize: Callable[[Topic, SlotCounts], TopicStats],
+) -> tuple[Topic, TopicStats, int, list[SlotRuns] | None]:
+    """
+    Replaces votes in order within one atomic script call.
+
+    Every voter's slot runs are kept next to the votes, so the script applies
+    per-slot count changes itself, no optimistic locking is involved. Each vote
+    gets its own version, the last one is returned. Stats built by `summarize`
+    are materialized for it unless it is already stale. Also returns the
+    replaced runs of every vote, if they are known. Runs are built on a grid
+    remembered per worker, so meta is only read for the first vote on a topic.
+    """
+    grid = await _topic_grid(topic_id, redis)
+    result = await _SET_VOTES(
+        keys=[
+            _meta_key(topic_id),
+            _votes_key(topic_id),
+            _runs_key(topic_id),
+            _counts_key(topic_id),
+            _version_key(topic_id),
+        ],
+        args=[
+            config.REDIS.TTL_SECONDS,
+            *(
+                field
+                for username, intervals in votes
+                for field in (
+                    username,
+                    compressor.compress(encode_vote(intervals)),
+                    _encode_runs(grid.to_runs(intervals)),
+                )
+            ),
+        ],
+        client=redis,
+    )
+    if result is None:
+        _grids.pop(topic_id, None)
+        raise TopicNotFoundError
+    version, meta, stored_votes, stored, ready, previous = result
+    cache.invalidate(topic_id)
+
+    topic = topic_from_parts(meta, _decompress_votes(compressor, _pairs(stored_votes)))
+    # A reused id starts without counts, runs built on a stale grid are rebuilt.
+    _remember_grid(topic_id, SlotGrid.for_topic(topic))
+    if ready:
+        counts = _decode_counts(_pairs(stored))
+    else:
+        counts = count_slots(topic)
+        await _rebuild_counts(redis, topic, version, counts)
+
+    stats = summarize(topic, counts)
+    await save_stats(topic_id, version, stats, redis, cache)
+    return topic, stats, version, list(map(_decode_runs, previous)) if ready else None
+
+
+@inject.autoparams("redis", "compressor", "cache")
+async def set_constraints(
+    topic_id: str,
+    username: str,
+    constraints: list[Interval],
+    redis: Redis,
+    compressor: Compressor,
+    cache: TopicCache,
+) -> tuple[Topic, int]:
+    """Replaces constraints on behalf of the admin, returns topic and version."""
+    result = await _SET_CONSTRAINTS(
+        keys=[_meta_key(topic_id), _votes_key(topic_id), _version_key(topic_id)],
+        args=[username, VOTE_ADAPTER.dump_json(constraints)],
+        client=redis,
+    )
+    if result is None:
+        raise TopicNotFoundError
+    if result == 0:
+        raise ForbiddenActionError("Only topic admin can edit constraints.")
+    version, meta, votes = result
+    cache.invalidate(topic_id)
+    votes = _decompress_votes(compressor, _pairs(votes))
+    return topic_from_parts(meta, votes), version
+
+
+async def _topic_grid(topic_id: str, redis: Redis) -> SlotGrid:
+    """Returns the grid the topic was created with, reading meta on a miss."""
+    grid = _grids.get(topic_id)
+    if grid is not None:
+        _grids.move_to_end(topic_id)
+        return grid
+    meta = await redis.get(_meta_key(topic_id))
+    if meta is None:
+        raise TopicNotFoundError
+    return _remember_grid(topic_id, SlotGrid.for_topic(Topic.model_validate_json(meta)))
+
+
+def _remember_grid(topic_id: str, grid: SlotGrid) -> SlotGrid:
+    _grids[topic_id] = grid
+    _grids.move_to_end(topic_id)
+    if len(_grids) > GRID_CACHE_SIZE:
+        _grids.popitem(last=False)
+    return grid
+
+
+async def _rebuild_counts(
+    redis: Redis, topic: Topic, version: int, counts: SlotCounts
+) -> None:
+    """Stores counts with every voter's runs, unless the topic moved on."""
+    grid = SlotGrid.for_topic(topic)
+    runs = [
+        field
+        for user, intervals in topic.votes.items()
+        for field in (user, _encode_runs(grid.to_runs(intervals)))
+    ]
+    await _REBUILD_COUNTS(
+        keys=[
+            _meta_key(topic.topic_id),
+            _runs_key(topic.topic_id),
+            _counts_key(topic.topic_id),
+            _version_key(topic.topic_id),
+        ],
+        args=[
+            version,
+            config.REDIS.TTL_SECONDS,
+            len(topic.votes),
+            *runs,
+            *(field for item in counts.items() for field in item),
+        ],
+        client=redis,
+    )
+
+
+def _write_topic(
+    pipe: Pipeline, topic: Topic, expire_at: int | None, compressor: Compressor
+) -> None:
+    """Rewrites meta and votes, keeping `expire_at` or starting a fresh TTL."""
+    meta_key, votes_key = _meta_key(topic.topic_id), _votes_key(topic.topic_id)
+    pipe.set(meta_key, encode_meta(topic), ex=config.REDIS.TTL_SECONDS)
+    pipe.delete(votes_key)
+    if topic.votes:
+        pipe.hset(
+            votes_key,
+            mapping={
+                user: compressor.compress(encode_vote(intervals))
+                for user, intervals in topic.votes.items()
+            },
+        )
+        pipe.expire(votes_key, config.REDIS.TTL_SECONDS)
+    if expire_at is not None and expire_at > 0:
+        pipe.pexpireat(meta_key, expire_at)
+        pipe.pexpireat(votes_key, expire_at)
+
+
+def _write_counts(pipe: Pipeline, topic: Topic, counts: SlotCounts) -> None:
+    """Rewrites every voter's runs and the slot counts they add up to."""
+    grid = SlotGrid.for_topic(topic)
+    runs_key, counts_key = _runs_key(topic.topic_id), _counts_key(topic.topic_id)
+    pipe.delete(runs_key, counts_key)
+    if topic.votes:
+        pipe.hset(
+            runs_key,
+            mapping={
+                user: _encode_runs(grid.to_runs(intervals))
+                for user, intervals in topic.votes.items()
+            },
+        )
+        pipe.expire(runs_key, config.REDIS.TTL_SECONDS)
+    pipe.hset(counts_key, mapping={COUNTS_READY_FIELD: 1, **counts})
+    pipe.expire(counts_key, config.REDIS.TTL_SECONDS)
+
+
+def _write_version(
+    pipe: Pipeline, topic_id: str, version: int, stats: TopicStats | None
+) -> None:
+    pipe.set(_version_key(topic_id), version, ex=config.REDIS.TTL_SECONDS)
+    if stats is None:
+        # Readers rebuild the snapshot through the recovery path.
+        pipe.delete(_stats_key(topic_id))
+        return
+    _write_snapshot(pipe, topic_id, version, stats)
+
+
+def _write_snapshot(
+    pipe: Pipeline, topic_id: str, version: int, stats: TopicStats
+) -> None:
+    pipe.set(
+        _stats_key(topic_id),
+        StatsSnapshot(version=version, stats=stats).model_dump_json(),
+        ex=config.REDIS.TTL_SECONDS,
+    )
+
+
+def _decode_counts(stored: dict[bytes, bytes]) -> SlotCounts:
+    ready = COUNTS_READY_FIELD.encode()
+    return {
+        int(slot): int(count)
+        for slot, count in stored.items()
+        if slot != ready and int(count) > 0
+    }
+
+
+def _encode_runs(runs: SlotRuns) -> str:
+    return ",".join(map(str, runs))
+
+
+def _decode_runs(data: bytes) -> SlotRuns:
+    return array("q", map(int, data.split(b","))) if data else array("q")
+
+
+def _decompress_votes(
+    compressor: Compressor, votes: dict[bytes, bytes]
+) -> dict[bytes, bytes]:
+    return {user: compressor.decompress(vote) for user, vote in votes.items()}
+
+
+def _pairs(flat: list[bytes]) -> dict[bytes, bytes]:
+    """Folds a flat HGETALL reply returned by a script into a dict."""
+    return dict(zip(flat[0::2], flat[1::2]))
+
+
+def topic_key(topic_id: str, suffix: str) -> str:
+    """
+    Returns a key of the topic, the id is a hash tag.
+
+    All keys of one topic land in the same cluster slot, so scripts and
+    transactions touching several of them keep working under Redis Cluster.
+    """
+    return f"topic:{{{topic_id}}}:{suffix}"
+
+
+def _meta_key(topic_id: str) -> str:
+    return topic_key(topic_id, "meta")
+
+
+def _votes_key(topic_id: str) -> str:
+    return topic_key(topic_id, "votes")
+
+
+def _runs_key(topic_id: str) -> str:
+    return topic_key(topic_id, "runs")
+
+
+def _counts_key(topic_id: str) -> str:
+    return topic_key(topic_id, "slot_counts")
+
+
+def _version_key(topic_id: str) -> str:
+    return topic_key(topic_id, "version")
+
+
+def _stats_key(topic_id: str) -> str:
+    return topic_key(topic_id, "stats")
+
+
+def _body_key(topic_id: str) -> str:
+    return topic_key(topic_id, "body")
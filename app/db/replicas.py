@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.db import RedisSettings
+from app.core.exceptions import TopicNotFoundError
+
+
+class ReplicaPool:
+    """
+    Round robin over read replicas that passed the last health check.
+
+    Replicas lag behind the primary, so a read carries the lowest version the
+    caller has already seen. Older results, topics the replica does not know
+    yet and failed reads are reported as misses, the caller then reads from
+    the primary. A failing replica is skipped until it passes a health check.
+    """
+
+    def __init__(self, replicas: list[Redis], check_interval_seconds: float) -> None:
+        self.replicas = replicas
+        self.check_interval_seconds = check_interval_seconds
+
+        self.reads = 0
+        self.lagging = 0
+        self.failures = 0
+
+        self._healthy = [True] * len(replicas)
+        self._next = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: RedisSettings) -> ReplicaPool:
+        # Cluster clients route by slot on their own, replicas are ignored there.
+        urls = [] if settings.CLUSTER else settings.REPLICA_URLS
+        return cls(
+            replicas=[Redis.from_url(url) for url in urls],
+            check_interval_seconds=settings.REPLICA_CHECK_INTERVAL_SECONDS,
+        )
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    def start(self) -> None:
+        """Starts health checks in the background, a no-op without replicas."""
+        if self.replicas and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def aclose(self) -> None:
+        await self.stop()
+        for replica in self.replicas:
+            await replica.aclose()
+
+    def pick(self) -> int | None:
+        """Returns index of the next healthy replica, None when all are down."""
+        for _ in range(len(self.replicas)):
+            index = self._next
+            self._next = (self._next + 1) % len(self.replicas)
+            if self._healthy[index]:
+                return index
+        return None
+
+    async def read[T](
+        self,
+        load: Callable[[Redis], Awaitable[T]],
+        min_version: int,
+        *,
+        version_of: Callable[[T], int],
+    ) -> T | None:
+        """Loads a result at least `min_version` new, None on a miss."""
+        index = self.pick()
+        if index is None:
+            return None
+        try:
+            loaded = await load(self.replicas[index])
+        except TopicNotFoundError:
+            self.lagging += 1
+            return None
+        except (RedisError, OSError):
+            self.failures += 1
+            self._healthy[index] = False
+            return None
+
+        self.reads += 1
+        if version_of(loaded) < min_version:
+            self.lagging += 1
+            return None
+        return loaded
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "reads": self.reads,
+            "lagging": self.lagging,
+            "failures": self.failures,
+            "healthy": sum(self._healthy),
+            "replicas": len(self.replicas),
+        }
+
+    async def check(self) -> None:
+        """Marks replicas linked to a live primary healthy, the rest down."""
+        for index, replica in enumerate(self.replicas):
+            try:
+                info = await asyncio.wait_for(
+                    self._replication_info(replica), self.check_interval_seconds
+                )
+            except (RedisError, OSError, TimeoutError):
+                self._healthy[index] = False
+                continue
+            # Standalone servers used in tests have no link to report.
+            self._healthy[index] = info.get("master_link_status", "up") == "up"
+
+    @staticmethod
+    async def _replication_info(replica: Redis) -> dict:
+        await replica.ping()
+        try:
+            return await replica.info("replication")
+        except ResponseError:
+            # INFO may be renamed or disabled on managed servers.
+            return {}
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval_seconds)
+            await self.check()
@@ -0,0 +1,198 @@
+"""
+Lua sources of atomic topic writes.
+
+Scripts are created once by `script` and run on the client passed to each
+call, through EVALSHA that loads the source again on NOSCRIPT.
+"""
+
+from redis.commands.core import AsyncScript
+
+
+def script(source: str) -> AsyncScript:
+    """Returns a script bound to no client, callers pass theirs to every call."""
+    # Hashed from bytes, which unlike text needs no client's encoder.
+    return AsyncScript(None, source.encode())  # type: ignore[arg-type]
+
+
+_EXPIRE_LIKE_META = """
+local function expire_like_meta(expire_at, ttl, ...)
+  for _, key in ipairs({...}) do
+    if expire_at > 0 then
+      redis.call('PEXPIREAT', key, expire_at, 'NX')
+    else
+      redis.call('EXPIRE', key, ttl, 'NX')
+    end
+  end
+end
+"""
+
+_ADD_RUNS = """
+local function add_runs(delta, runs, sign)
+  local edges = {}
+  for edge in string.gmatch(runs, '-?%d+') do
+    edges[#edges + 1] = tonumber(edge)
+  end
+  for i = 1, #edges, 2 do
+    for slot = edges[i], edges[i + 1] - 1 do
+      delta[slot] = (delta[slot] or 0) + sign
+    end
+  end
+end
+"""
+
+SAVE_TOPIC = (
+    _EXPIRE_LIKE_META
+    + """
+-- KEYS: meta, votes, runs, counts, version, stats
+-- ARGV: meta, ttl, refresh ttl (0/1), stats or '', username, vote, ...
+local expire_at = -1
+if ARGV[3] == '0' then
+  expire_at = redis.call('PEXPIRETIME', KEYS[1])
+end
+redis.call('DEL', KEYS[2], KEYS[3], KEYS[4])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+for i = 5, #ARGV, 2 do
+  redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+local version = redis.call('INCR', KEYS[5])
+redis.call('PERSIST', KEYS[5])
+if ARGV[4] == '' then
+  redis.call('DEL', KEYS[6])
+else
+  local snapshot = '{"version":' .. version .. ',"stats":' .. ARGV[4] .. '}'
+  redis.call('SET', KEYS[6], snapshot)
+end
+if expire_at > 0 then
+  redis.call('PEXPIREAT', KEYS[1], expire_at)
+end
+expire_like_meta(expire_at, ARGV[2], KEYS[2], KEYS[5], KEYS[6])
+return version
+"""
+)
+
+SET_VOTES = (
+    _EXPIRE_LIKE_META
+    + _ADD_RUNS
+    + """
+-- KEYS: meta, votes, runs, counts, version
+-- ARGV: ttl, username, vote, vote slot runs, ...
+local meta = redis.call('GET', KEYS[1])
+if not meta then
+  return false
+end
+local expire_at = redis.call('PEXPIRETIME', KEYS[1])
+local ready = redis.call('HEXISTS', KEYS[4], 'ready')
+local delta = {}
+local previous = {}
+for i = 2, #ARGV, 3 do
+  local before = redis.call('HGET', KEYS[3], ARGV[i]) or ''
+  previous[#previous + 1] = before
+  redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+  redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 2])
+  if ready == 1 then
+    add_runs(delta, before, -1)
+    add_runs(delta, ARGV[i + 2], 1)
+  end
+end
+
+local counts = {}
+if ready == 1 then
+  for slot, change in pairs(delta) do
+    if change ~= 0 then
+      local field = string.format('%d', slot)
+      if redis.call('HINCRBY', KEYS[4], field, change) <= 0 then
+        redis.call('HDEL', KEYS[4], field)
+      end
+    end
+  end
+  counts = redis.call('HGETALL', KEYS[4])
+end
+
+-- Every vote gets its own version, the last one is returned.
+local version = redis.call('INCRBY', KEYS[5], #previous)
+expire_like_meta(expire_at, ARGV[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5])
+return {version, meta, redis.call('HGETALL', KEYS[2]), counts, ready, previous}
+"""
+)
+
+REBUILD_COUNTS = (
+    _EXPIRE_LIKE_META
+    + """
+-- KEYS: meta, runs, counts, version
+-- ARGV: version, ttl, voters, username, runs, ..., slot, count, ...
+if redis.call('GET', KEYS[4]) ~= ARGV[1] then
+  return 0
+end
+local expire_at = redis.call('PEXPIRETIME', KEYS[1])
+if expire_at == -2 then
+  return 0
+end
+redis.call('DEL', KEYS[2], KEYS[3])
+local runs_end = 3 + 2 * tonumber(ARGV[3])
+for i = 4, runs_end, 2 do
+  redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+end
+redis.call('HSET', KEYS[3], 'ready', 1)
+for i = runs_end + 1, #ARGV, 2 do
+  redis.call('HSET', KEYS[3], ARGV[i], ARGV[i + 1])
+end
+expire_like_meta(expire_at, ARGV[2], KEYS[2], KEYS[3])
+return 1
+"""
+)
+
+SET_CONSTRAINTS = """
+-- KEYS: meta, votes, version
+-- ARGV: username, constraints
+local meta = redis.call('GET', KEYS[1])
+if not meta then
+  return false
+end
+local topic = cjson.decode(meta)
+if topic.admin_name ~= ARGV[1] then
+  return 0
+end
+-- cjson turns empty arrays into objects, so constraints are spliced raw.
+topic.constraints = nil
+meta = '{"constraints":' .. ARGV[2] .. ',' .. string.sub(cjson.encode(topic), 2)
+redis.call('SET', KEYS[1], meta, 'KEEPTTL')
+local version = redis.call('INCR', KEYS[3])
+return {version, meta, redis.call('HGETALL', KEYS[2])}
+"""
+
+SAVE_STATS = (
+    _EXPIRE_LIKE_META
+    + """
+-- KEYS: meta, version, stats
+-- ARGV: version, stats, ttl
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+  return 0
+end
+local expire_at = redis.call('PEXPIRETIME', KEYS[1])
+if expire_at == -2 then
+  return 0
+end
+local snapshot = '{"version":' .. ARGV[1] .. ',"stats":' .. ARGV[2] .. '}'
+redis.call('SET', KEYS[3], snapshot)
+expire_like_meta(expire_at, ARGV[3], KEYS[3])
+return 1
+"""
+)
+
+SAVE_BODY = (
+    _EXPIRE_LIKE_META
+    + """
+-- KEYS: meta, version, body
+-- ARGV: version, body, ttl
+if redis.call('GET', KEYS[2]) ~= ARGV[1] then
+  return 0
+end
+local expire_at = redis.call('PEXPIRETIME', KEYS[1])
+if expire_at == -2 then
+  return 0
+end
+redis.call('SET', KEYS[3], ARGV[1] .. ':' .. ARGV[2])
+expire_like_meta(expire_at, ARGV[3], KEYS[3])
+return 1
+"""
+)
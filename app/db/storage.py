@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Protocol
+
+from redis.asyncio import Redis
+
+from app.db import redis as redis_db
+from app.db.codec import CountsSnapshot, RawSnapshot
+from app.models import Interval, SlotCounts, SlotRuns, Topic, TopicStats
+
+type VotesCommit = tuple[Topic, TopicStats, int, list[SlotRuns] | None]
+"""Topic and stats after the votes, the last version and every replaced vote."""
+
+
+class TopicStorage(Protocol):
+    """Persistence of topics, their versions and materialized stats."""
+
+    async def save_topic(
+        self,
+        topic: Topic,
+        *,
+        refresh_ttl: bool = False,
+        stats: TopicStats | None = None,
+    ) -> int:
+        """Overwrites topic, bumps its version and returns the new one."""
+        ...
+
+    async def get_topic_version(self, topic_id: str, *, min_version: int = 0) -> int:
+        """Returns current topic version, 0 if it is unknown."""
+        ...
+
+    async def get_raw_topic_snapshot(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> RawSnapshot:
+        """
+        Returns packed topic, its version and undecoded stats snapshot.
+
+        The version is at least `min_version` unless the topic is gone.
+        """
+        ...
+
+    async def get_slot_counts(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> CountsSnapshot:
+        """
+        Returns topic metadata, its version and voters per slot, without votes.
+
+        Counts ignore constraints, None when the storage cannot serve them.
+        """
+        ...
+
+    async def save_stats(self, topic_id: str, version: int, stats: TopicStats) -> bool:
+        """Materializes stats unless the topic moved past the given version."""
+        ...
+
+    async def save_body(self, topic_id: str, version: int, body: bytes) -> bool:
+        """Stores a rendered response unless the topic moved past the version."""
+        ...
+
+    async def get_body(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> tuple[int, bytes | None]:
+        """Returns current version and the response rendered for it, if any."""
+        ...
+
+    async def delete_topic(self, topic_id: str) -> None: ...
+
+    async def set_votes(
+        self,
+        topic_id: str,
+        votes: list[tuple[str, list[Interval]]],
+        *,
+        count_slots: Callable[[Topic], SlotCounts],
+        summarize: Callable[[Topic, SlotCounts], TopicStats],
+    ) -> VotesCommit:
+        """Replaces votes in order, each one getting its own version."""
+        ...
+
+    async def set_constraints(
+        self, topic_id: str, username: str, constraints: list[Interval]
+    ) -> tuple[Topic, int]:
+        """Replaces constraints on behalf of the admin, returns topic and version."""
+        ...
+
+    async def aclose(self) -> None: ...
+
+
+class RedisStorage:
+    """Storage backed by the Redis layout of `app.db.redis`."""
+
+    def __init__(self, redis: Redis) -> None:
+        self.redis = redis
+
+    async def save_topic(
+        self,
+        topic: Topic,
+        *,
+        refresh_ttl: bool = False,
+        stats: TopicStats | None = None,
+    ) -> int:
+        return await redis_db.save_topic(
+            topic, self.redis, refresh_ttl=refresh_ttl, stats=stats
+        )
+
+    async def get_topic_version(self, topic_id: str, *, min_version: int = 0) -> int:
+        return await redis_db.get_topic_version(
+            topic_id, self.redis, min_version=min_version
+        )
+
+    async def get_raw_topic_snapshot(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> RawSnapshot:
+        return await redis_db.get_raw_topic_snapshot(
+            topic_id, self.redis, min_version=min_version
+        )
+
+    async def get_slot_counts(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> CountsSnapshot:
+        return await redis_db.get_slot_counts(
+            topic_id, self.redis, min_version=min_version
+        )
+
+    async def save_stats(self, topic_id: str, version: int, stats: TopicStats) -> bool:
+        return await redis_db.save_stats(topic_id, version, stats, self.redis)
+
+    async def save_body(self, topic_id: str, version: int, body: bytes) -> bool:
+        return await redis_db.save_body(topic_id, version, body, self.redis)
+
+    async def get_body(
+        self, topic_id: str, *, min_version: int = 0
+    ) -> tuple[int, bytes | None]:
+        return await redis_db.get_body(topic_id, self.redis, min_version=min_version)
+
+    async def delete_topic(self, topic_id: str) -> None:
+        await redis_db.delete_topic(topic_id, self.redis)
+
+    async def set_votes(
+        self,
+        topic_id: str,
+        votes: list[tuple[str, list[Interval]]],
+        *,
+        count_slots: Callable[[Topic], SlotCounts],
+        summarize: Callable[[Topic, SlotCounts], TopicStats],
+    ) -> VotesCommit:
+        return await redis_db.set_votes(
+            topic_id, votes, self.redis, count_slots=count_slots, summarize=summarize
+        )
+
+    async def set_constraints(
+        self, topic_id: str, username: str, constraints: list[Interval]
+    ) -> tuple[Topic, int]:
+        return await redis_db.set_constraints(
+            topic_id, username, constraints, self.redis
+        )
+
+    async def aclose(self) -> None:
+        await self.redis.aclose()
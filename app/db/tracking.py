@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError, ResponseError
+
+from app.core.db import RedisSettings
+from app.db.codec import RawSnapshot
+
+INVALIDATE_CHANNEL = "__redis__:invalidate"
+TRACKED_PREFIX = "topic:"
+
+
+class TopicCache:
+    """
+    Per-worker cache of raw topic snapshots kept fresh by Redis key tracking.
+
+    A dedicated connection enables broadcast tracking of topic keys, redirecting
+    invalidations to a second one subscribed to them. While either connection
+    is down, invalidations may be missed, so the cache is emptied and reads go
+    straight to Redis until tracking is restored.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_entries: int,
+        max_bytes: int,
+        reconnect_seconds: float,
+    ) -> None:
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.reconnect_seconds = reconnect_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+        self.disconnects = 0
+
+        self._entries: OrderedDict[str, tuple[int, RawSnapshot]] = OrderedDict()
+        self._size = 0
+        self._tickets: dict[str, int] = {}
+        self._ticket = 0
+        self._connected = False
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: RedisSettings) -> TopicCache:
+        return cls(
+            # Tracking follows a single node, cluster keys are spread over many.
+            enabled=settings.CLIENT_CACHE and not settings.CLUSTER,
+            max_entries=settings.CLIENT_CACHE_MAX_ENTRIES,
+            max_bytes=settings.CLIENT_CACHE_MAX_BYTES,
+            reconnect_seconds=settings.CLIENT_CACHE_RECONNECT_SECONDS,
+        )
+
+    @property
+    def connected(self) -> bool:
+        """Whether invalidations are delivered and cached entries can be served."""
+        return self._connected
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self, url: str) -> None:
+        """Starts tracking in the background, a no-op when caching is disabled."""
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._listen(url))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+    async def get(
+        self,
+        topic_id: str,
+        load: Callable[[], Awaitable[RawSnapshot]],
+        min_version: int = 0,
+    ) -> RawSnapshot:
+        """
+        Returns a cached snapshot, loading and caching it on a miss.
+
+        Entries older than `min_version` count as misses, the invalidation of
+        a write made through another worker may still be on its way.
+        """
+        if not self._connected:
+            return await load()
+
+        entry = self._entries.get(topic_id)
+        if entry is not None and entry[1][1] >= min_version:
+            self._entries.move_to_end(topic_id)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            self.invalidate(topic_id)
+
+        self.misses += 1
+        self._ticket += 1
+        ticket = self._tickets[topic_id] = self._ticket
+        try:
+            snapshot = await load()
+        finally:
+            # Invalidations drop the ticket, a result loaded meanwhile may be stale.
+            fresh = self._tickets.get(topic_id) == ticket
+            if fresh:
+                del self._tickets[topic_id]
+
+        if fresh and self._connected:
+            self._store(topic_id, snapshot)
+        return snapshot
+
+    def invalidate(self, topic_id: str) -> None:
+        self._tickets.pop(topic_id, None)
+        entry = self._entries.pop(topic_id, None)
+        if entry is not None:
+            self._size -= entry[0]
+            self.invalidations += 1
+
+    def invalidate_keys(self, keys: list[bytes] | None) -> None:
+        """Handles a tracking message, None means every key was flushed."""
+        if keys is None:
+            self.clear()
+            return
+        for key in keys:
+            # Keys look like `topic:{<id>}:<suffix>`. Untagged legacy keys, seen
+            # while `migrate` rewrites them, never back a cached snapshot.
+            _, tagged, rest = key.partition(b"{")
+            topic_id, closed, _ = rest.partition(b"}")
+            if tagged and closed:
+                self.invalidate(topic_id.decode(errors="replace"))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tickets.clear()
+        self._size = 0
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "disconnects": self.disconnects,
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "connected": int(self._connected),
+        }
+
+    def _store(self, topic_id: str, snapshot: RawSnapshot) -> None:
+        data, _, stats = snapshot
+        cost = len(data) + len(stats or b"")
+        if self.max_entries <= 0 or cost > self.max_bytes:
+            return
+
+        self._entries[topic_id] = (cost, snapshot)
+        self._size += cost
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self._size -= evicted
+            self.evictions += 1
+
+    async def _listen(self, url: str) -> None:
+        while True:
+            try:
+                await self._track(url)
+            except ResponseError:
+                # Tracking is not supported by the server, keep reading directly.
+                return
+            except (RedisError, OSError):
+                self.disconnects += 1
+            finally:
+                self._connected = False
+                self.clear()
+            await asyncio.sleep(self.reconnect_seconds)
+
+    async def _track(self, url: str) -> None:
+        listener = Redis.from_url(url)
+        tracker = Redis.from_url(url, single_connection_client=True)
+        pubsub = listener.pubsub()
+        try:
+            await pubsub.execute_command("CLIENT", "ID")
+            client_id = await pubsub.parse_response(block=True)
+            await pubsub.subscribe(INVALIDATE_CHANNEL)
+            await tracker.client_tracking_on(
+                clientid=client_id, prefix=[TRACKED_PREFIX], bcast=True
+            )
+            self._connected = True
+
+            while True:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.reconnect_seconds
+                )
+                if message is None:
+                    # Tracking silently stops with its connection, so probe it.
+                    await tracker.ping()
+                    continue
+                self.invalidate_keys(message["data"])
+        finally:
+            await pubsub.aclose()
+            await tracker.aclose()
+            await listener.aclose()
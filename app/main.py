@@ -3,12 +3,17 @@ from contextlib import asynccontextmanager
 import inject
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from redis.asyncio import Redis
 
 from app.api import api_router, docs_router
+from app.api.v1.topic import VERSION_HEADER
 from app.core import config
 from app.core.di import configure_di
 from app.core.exceptions import ServiceError, exception_handler
+from app.db.replicas import ReplicaPool
+from app.db.storage import TopicStorage
+from app.db.tracking import TopicCache
+from app.service.stats_executor import StatsExecutor
+from app.service.topic_events import TopicEvents
 
 
 @asynccontextmanager
@@ -16,10 +21,17 @@ async def lifespan(app: FastAPI):
     app.include_router(api_router)
     app.include_router(docs_router)
     configure_di()
+    if config.STORAGE_BACKEND == "redis":
+        inject.instance(TopicCache).start(config.REDIS.URL)
+        inject.instance(ReplicaPool).start()
 
     yield
 
-    await inject.instance(Redis).aclose()
+    await inject.instance(TopicEvents).aclose()
+    await inject.instance(TopicCache).stop()
+    await inject.instance(ReplicaPool).aclose()
+    inject.instance(StatsExecutor).shutdown()
+    await inject.instance(TopicStorage).aclose()
 
 
 app = FastAPI(title=config.APP_NAME, lifespan=lifespan)
@@ -31,5 +43,6 @@ app.add_middleware(
     allow_origins=config.ALLOW_ORIGINS_LIST,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", VERSION_HEADER],
     allow_credentials=True,
 )
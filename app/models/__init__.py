@@ -1,5 +1,13 @@
 from app.models.interval import Interval
-from app.models.stats import StatsInterval, TopicStats
+from app.models.slots import CompactTopic, SlotGrid, SlotRuns
+from app.models.stats import (
+    BestWindows,
+    SlotCounts,
+    SlotVoters,
+    StatsInterval,
+    StatsSnapshot,
+    TopicStats,
+)
 from app.models.topic import (
     ConstraintsPayload,
     CreatedTopic,
@@ -10,8 +18,15 @@ from app.models.topic import (
 )
 
 __all__ = [
+    "BestWindows",
+    "CompactTopic",
     "Interval",
+    "SlotGrid",
+    "SlotRuns",
+    "SlotCounts",
+    "SlotVoters",
     "StatsInterval",
+    "StatsSnapshot",
     "TopicStats",
     "Topic",
     "TopicCreate",
@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta, tzinfo
+
+from app.models.interval import Interval
+from app.models.topic import Topic
+
+UNIX_EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+type SlotRuns = array[int]
+"""Sorted disjoint half-open slot runs, flattened as [start0, end0, start1, ...]."""
+
+
+@dataclass(frozen=True, slots=True)
+class SlotGrid:
+    """
+    Maps datetimes to integer slot offsets from a topic epoch.
+
+    Naive datetimes are treated as UTC, aware ones by their absolute instant.
+    Slots are converted back in `tz`, so responses keep the caller's offsets.
+    """
+
+    epoch_us: int
+    slot_us: int
+    tz: tzinfo | None = None
+
+    @classmethod
+    def for_topic(cls, topic: Topic) -> SlotGrid:
+        slot_us = topic.slot_minutes * 60 * 1_000_000
+        created_us = _to_microseconds(topic.created_at)
+        return cls(
+            epoch_us=created_us - created_us % slot_us,
+            slot_us=slot_us,
+            tz=_reference_tz(topic),
+        )
+
+    def ceil(self, moment: datetime) -> int:
+        """Returns the first slot starting at or after the moment."""
+        return -((self.epoch_us - _to_microseconds(moment)) // self.slot_us)
+
+    def floor(self, moment: datetime) -> int:
+        """Returns the slot containing the moment."""
+        return (_to_microseconds(moment) - self.epoch_us) // self.slot_us
+
+    def to_datetime(self, slot: int) -> datetime:
+        moment = UNIX_EPOCH + (self.epoch_us + slot * self.slot_us) * MICROSECOND
+        if self.tz is None:
+            return moment
+        return moment.replace(tzinfo=UTC).astimezone(self.tz)
+
+    def to_runs(self, intervals: Iterable[Interval]) -> SlotRuns:
+        """Converts intervals into merged runs of slots they fully cover."""
+        bounds = sorted(
+            (start, end)
+            for window in intervals
+            if (start := self.ceil(window.start)) < (end := self.floor(window.end))
+        )
+        runs: SlotRuns = array("q")
+        for start, end in bounds:
+            if runs and start <= runs[-1]:
+                runs[-1] = max(runs[-1], end)
+                continue
+            runs.extend((start, end))
+        return runs
+
+    def to_intervals(self, runs: SlotRuns) -> list[Interval]:
+        """Converts slot runs back into public intervals."""
+        return [
+            Interval(start=self.to_datetime(start), end=self.to_datetime(end))
+            for start, end in zip(runs[0::2], runs[1::2])
+        ]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactTopic:
+    """
+    Integer slot view of a topic used by stats engines.
+
+    Derived from `Topic` when needed rather than stored: runs keep only whole
+    slots and merge overlaps, so votes would not round trip through them.
+    """
+
+    grid: SlotGrid
+    constrained: bool
+    constraints: SlotRuns
+    votes: dict[str, SlotRuns]
+
+    @property
+    def span(self) -> int:
+        """Number of slots between the earliest and the latest run edge."""
+        runs = [runs for runs in self.votes.values() if runs]
+        if self.constraints:
+            runs.append(self.constraints)
+        if not runs:
+            return 0
+        return max(r[-1] for r in runs) - min(r[0] for r in runs)
+
+    @classmethod
+    def from_topic(cls, topic: Topic) -> CompactTopic:
+        grid = SlotGrid.for_topic(topic)
+        return cls(
+            grid=grid,
+            constrained=bool(topic.constraints),
+            constraints=grid.to_runs(topic.constraints),
+            votes={user: grid.to_runs(votes) for user, votes in topic.votes.items()},
+        )
+
+
+def _to_microseconds(moment: datetime) -> int:
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(UTC).replace(tzinfo=None)
+    return (moment - UNIX_EPOCH) // MICROSECOND
+
+
+def _reference_tz(topic: Topic) -> tzinfo | None:
+    for window in topic.constraints:
+        return window.start.tzinfo
+    for user_intervals in topic.votes.values():
+        for window in user_intervals:
+            return window.start.tzinfo
+    return None
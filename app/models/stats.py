@@ -4,9 +4,11 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+type SlotCounts = dict[int, int]
+
 
 class StatsInterval(BaseModel):
-    """Represents a merged 15-minute block for ladder cards."""
+    """Represents a merged block of slots for ladder cards."""
 
     start: datetime
     end: datetime
@@ -21,3 +23,25 @@ class TopicStats(BaseModel):
     blocks_70: list[StatsInterval] = Field(default_factory=list)
     blocks_50: list[StatsInterval] = Field(default_factory=list)
     vote_count: int = Field(default=0, ge=0)
+
+
+class SlotVoters(BaseModel):
+    """Voters available for the whole slot."""
+
+    start: datetime
+    end: datetime
+    voters: list[str] = Field(default_factory=list)
+
+
+class BestWindows(BaseModel):
+    """Top non-overlapping windows of a requested duration."""
+
+    duration_minutes: int = Field(gt=0)
+    windows: list[StatsInterval] = Field(default_factory=list)
+
+
+class StatsSnapshot(BaseModel):
+    """Materialized stats valid for a single topic version."""
+
+    version: int = Field(ge=0)
+    stats: TopicStats
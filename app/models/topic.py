@@ -4,6 +4,7 @@ from datetime import datetime
 
 from pydantic import BaseModel, Field
 
+from app.core.grid import LEGACY_SLOT_MINUTES, SlotMinutes
 from app.models.interval import Interval
 from app.models.stats import TopicStats
 
@@ -18,6 +19,8 @@ class Topic(BaseModel):
     constraints: list[Interval] = Field(default_factory=list)
     votes: dict[str, list[Interval]] = Field(default_factory=dict)
     created_at: datetime
+    # New topics always store their size, only legacy ones fall back.
+    slot_minutes: SlotMinutes = LEGACY_SLOT_MINUTES
 
 
 class TopicCreate(BaseModel):
@@ -26,6 +29,7 @@ class TopicCreate(BaseModel):
     topic_name: str
     description: str | None = None
     constraints: list[Interval] = Field(default_factory=list)
+    slot_minutes: SlotMinutes | None = None
 
 
 class VotePayload(BaseModel):
@@ -1,17 +1,31 @@
 from app.service.links import build_invite_link
+from app.service.metrics import collect_metrics
 from app.service.topic_stats import build_topic_stats
 from app.service.topics import (
     create_topic,
+    get_best_windows,
+    get_range_voters,
+    get_slot_voters,
+    get_topic_body,
+    get_topic_version,
     get_topic_with_stats,
     overwrite_constraints,
     replace_vote,
+    watch_topic,
 )
 
 __all__ = [
     "build_topic_stats",
     "build_invite_link",
+    "collect_metrics",
     "create_topic",
+    "get_best_windows",
+    "get_range_voters",
+    "get_slot_voters",
+    "get_topic_body",
+    "get_topic_version",
     "get_topic_with_stats",
     "replace_vote",
     "overwrite_constraints",
+    "watch_topic",
 ]
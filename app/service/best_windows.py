@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from collections.abc import Iterable
+
+from app.core.exceptions import DurationNotAlignedError
+from app.core.stats import StatsSettings
+from app.models import CompactTopic, SlotCounts, SlotGrid, StatsInterval, Topic
+from app.service.topic_stats import _allowed_counts, _count_buckets
+
+type Window = tuple[int, int, int, int]
+"""Window as (first slot, end slot, people min, people max)."""
+
+
+def find_best_windows(
+    topic: Topic, duration_minutes: int, k: int
+) -> list[StatsInterval]:
+    """
+    Returns up to `k` non-overlapping windows most people can fully attend.
+
+    Windows lie inside constraints and are ranked by the number of voters
+    available for the whole duration, earlier windows first on ties. The
+    duration has to be a whole number of the topic's slots.
+    """
+    return find_compact_windows(CompactTopic.from_topic(topic), duration_minutes, k)
+
+
+def find_compact_windows(
+    compact: CompactTopic, duration_minutes: int, k: int
+) -> list[StatsInterval]:
+    """Same as `find_best_windows`, picklable for the stats process pool."""
+    constraints = compact.constraints if compact.constrained else None
+    counts = _count_buckets(constraints, compact.votes.values())
+    width = window_width(compact.grid, duration_minutes)
+    return _to_intervals(compact.grid, _top_windows(counts, width, k))
+
+
+def find_windows_from_counts(
+    topic: Topic, slot_counts: SlotCounts, duration_minutes: int, k: int
+) -> list[StatsInterval]:
+    """Same as `find_best_windows` on stored counts, without expanding votes."""
+    grid = SlotGrid.for_topic(topic)
+    counts = _allowed_counts(grid, topic.constraints, slot_counts)
+    width = window_width(grid, duration_minutes)
+    return _to_intervals(grid, _top_windows(counts, width, k))
+
+
+def window_width(grid: SlotGrid, duration_minutes: int) -> int:
+    """Returns the duration in slots, rejecting one that splits a slot."""
+    width, rest = divmod(duration_minutes * 60_000_000, grid.slot_us)
+    if rest:
+        raise DurationNotAlignedError
+    return width
+
+
+class BestWindowsCache:
+    """
+    Bounded per-worker LRU of best windows keyed by topic version.
+
+    Each topic keeps the windows of every asked duration and count for its
+    latest version only, a new version drops them all.
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[
+            str, tuple[int, dict[tuple[int, int], list[StatsInterval]]]
+        ] = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings: StatsSettings) -> BestWindowsCache:
+        return cls(max_entries=settings.WINDOWS_MAX_ENTRIES)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, topic_id: str, version: int, duration_minutes: int, k: int
+    ) -> list[StatsInterval] | None:
+        entry = self._entries.get(topic_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(topic_id)
+        return entry[1].get((duration_minutes, k))
+
+    def put(
+        self,
+        topic_id: str,
+        version: int,
+        duration_minutes: int,
+        k: int,
+        windows: list[StatsInterval],
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        entry = self._entries.get(topic_id)
+        if entry is None or entry[0] != version:
+            entry = self._entries[topic_id] = (version, {})
+        entry[1][duration_minutes, k] = windows
+        self._entries.move_to_end(topic_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+def _to_intervals(grid: SlotGrid, windows: list[Window]) -> list[StatsInterval]:
+    return [
+        StatsInterval(
+            start=grid.to_datetime(start),
+            end=grid.to_datetime(end),
+            people_min=people_min,
+            people_max=people_max,
+        )
+        for start, end, people_min, people_max in windows
+    ]
+
+
+def _top_windows(counts: dict[int, int], width: int, k: int) -> list[Window]:
+    """Selects the best `k` non-overlapping windows greedily by attendance."""
+    heap = [
+        (-people_min, start, people_max)
+        for start, people_min, people_max in _sliding_extremes(counts, width)
+        if people_min > 0
+    ]
+    heapq.heapify(heap)
+
+    taken: list[int] = []
+    windows: list[Window] = []
+    while heap and len(windows) < k:
+        people_min, start, people_max = heapq.heappop(heap)
+        # Taken windows are disjoint and equally wide, so only neighbours clash.
+        idx = bisect_left(taken, start)
+        if idx < len(taken) and taken[idx] < start + width:
+            continue
+        if idx > 0 and taken[idx - 1] + width > start:
+            continue
+        taken.insert(idx, start)
+        windows.append((start, start + width, -people_min, people_max))
+    return windows
+
+
+def _sliding_extremes(
+    counts: dict[int, int], width: int
+) -> Iterable[tuple[int, int, int]]:
+    """
+    Yields (start, min, max) of every window of consecutive counted slots.
+
+    Monotonic deques keep the whole scan linear in the number of slots.
+    """
+    lows: deque[int] = deque()
+    highs: deque[int] = deque()
+    run_start = None
+    previous = None
+    for slot in sorted(counts):
+        if previous is None or slot != previous + 1:
+            lows.clear()
+            highs.clear()
+            run_start = slot
+        previous = slot
+
+        count = counts[slot]
+        while lows and counts[lows[-1]] >= count:
+            lows.pop()
+        lows.append(slot)
+        while highs and counts[highs[-1]] <= count:
+            highs.pop()
+        highs.append(slot)
+
+        start = slot - width + 1
+        if start < run_start:
+            continue
+        if lows[0] < start:
+            lows.popleft()
+        if highs[0] < start:
+            highs.popleft()
+        yield start, counts[lows[0]], counts[highs[0]]
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import inject
+
+from app.db.compression import Compressor
+from app.db.replicas import ReplicaPool
+from app.db.tracking import TopicCache
+from app.service.stats_cache import StatsCache
+from app.service.stats_executor import StatsExecutor
+from app.service.topic_events import TopicEvents
+from app.service.vote_batcher import VoteBatcher
+
+type Metrics = dict[str, dict[str, float]]
+"""Counters of every per-worker component, keyed by component."""
+
+
+@inject.autoparams(
+    "compressor", "topics", "replicas", "stats", "executor", "batcher", "events"
+)
+def collect_metrics(
+    compressor: Compressor,
+    topics: TopicCache,
+    replicas: ReplicaPool,
+    stats: StatsCache,
+    executor: StatsExecutor,
+    batcher: VoteBatcher,
+    events: TopicEvents,
+) -> Metrics:
+    """Returns counters of this worker since it started."""
+    return {
+        "compression": compressor.counters(),
+        "topic_cache": topics.counters(),
+        "replicas": replicas.counters(),
+        "stats_cache": stats.counters(),
+        "stats_executor": executor.counters(),
+        "vote_batcher": batcher.counters(),
+        "events": events.counters(),
+    }
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import blake2b
+from time import monotonic
+
+from app.core.stats import StatsSettings
+from app.models import Topic, TopicStats
+
+
+class StatsCache:
+    """Bounded per-worker LRU of parsed topics with their stats."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._entries: OrderedDict[bytes, tuple[float, int, Topic, TopicStats]] = (
+            OrderedDict()
+        )
+        self._size = 0
+
+    @classmethod
+    def from_settings(cls, settings: StatsSettings) -> StatsCache:
+        return cls(
+            max_entries=settings.CACHE_MAX_ENTRIES,
+            max_bytes=settings.CACHE_MAX_BYTES,
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+        )
+
+    @staticmethod
+    def fingerprint(data: bytes) -> bytes:
+        """Returns a short content hash of raw topic bytes."""
+        return blake2b(data, digest_size=16).digest()
+
+    @property
+    def size(self) -> int:
+        """Approximate number of bytes held, measured on raw payloads."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> tuple[Topic, TopicStats] | None:
+        """Returns cached topic and stats, refreshing the entry recency."""
+        entry = self._entries.get(key)
+        if entry is None or monotonic() - entry[0] > self.ttl_seconds:
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2], entry[3]
+
+    def put(self, key: bytes, cost: int, topic: Topic, stats: TopicStats) -> None:
+        """Stores topic and stats, evicting least recently used entries."""
+        if self.max_entries <= 0 or cost > self.max_bytes:
+            return
+        if key in self._entries:
+            self._drop(key)
+
+        self._entries[key] = (monotonic(), cost, topic, stats)
+        self._size += cost
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self._size,
+        }
+
+    def _drop(self, key: bytes) -> None:
+        _, cost, _, _ = self._entries.pop(key)
+        self._size -= cost
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import suppress
+from time import monotonic
+
+from app.core import config
+from app.core.exceptions import StatsOverloadedError, StatsTimeoutError
+from app.core.stats import StatsSettings
+from app.models import CompactTopic, StatsInterval, Topic, TopicStats
+from app.service.best_windows import find_compact_windows
+from app.service.topic_stats import build_compact_stats
+
+
+class StatsExecutor:
+    """
+    Size-aware stats runner keeping the event loop responsive.
+
+    Topics whose voters x slots cost fits the inline budget are computed in the
+    calling worker. Larger ones are sent to a process pool as a `CompactTopic`,
+    which pickles as flat integer arrays instead of Pydantic models.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        inline_budget: int,
+        timeout_seconds: float,
+        max_pending: int,
+    ) -> None:
+        self.workers = workers
+        self.inline_budget = inline_budget
+        self.timeout_seconds = timeout_seconds
+        self.max_pending = max_pending
+
+        self.inline = 0
+        self.offloaded = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.offload_seconds = 0.0
+        self.offload_seconds_max = 0.0
+
+        self._pending = 0
+        self._pool: ProcessPoolExecutor | None = None
+
+    @classmethod
+    def from_settings(cls, settings: StatsSettings) -> StatsExecutor:
+        return cls(
+            workers=settings.EXECUTOR_WORKERS,
+            inline_budget=settings.EXECUTOR_INLINE_BUDGET,
+            timeout_seconds=settings.EXECUTOR_TIMEOUT_SECONDS,
+            max_pending=settings.EXECUTOR_MAX_PENDING,
+        )
+
+    @staticmethod
+    def cost(compact: CompactTopic) -> int:
+        """Estimated work of building stats, voters times covered slots."""
+        return max(1, len(compact.votes)) * compact.span
+
+    @property
+    def pending(self) -> int:
+        """Jobs submitted to the pool that have not finished yet."""
+        return self._pending
+
+    async def build(self, topic: Topic) -> TopicStats:
+        """Builds topic stats inline or in the pool depending on its size."""
+        compact = CompactTopic.from_topic(topic)
+        return await self._run(build_compact_stats, compact, config.STATS.BACKEND)
+
+    async def best_windows(
+        self, topic: Topic, duration_minutes: int, k: int
+    ) -> list[StatsInterval]:
+        """Finds best windows inline or in the pool, the same way as stats."""
+        compact = CompactTopic.from_topic(topic)
+        return await self._run(find_compact_windows, compact, duration_minutes, k)
+
+    async def _run[T](
+        self, job: Callable[..., T], compact: CompactTopic, *args: object
+    ) -> T:
+        if self.workers <= 0 or self.cost(compact) <= self.inline_budget:
+            self.inline += 1
+            return job(compact, *args)
+
+        # Timed out jobs keep a worker busy, so they count until they finish.
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise StatsOverloadedError
+
+        loop = asyncio.get_running_loop()
+        started = monotonic()
+        try:
+            future = self._get_pool().submit(job, compact, *args)
+        except BrokenProcessPool:
+            self._pool = None
+            raise StatsOverloadedError
+        self._pending += 1
+        self.offloaded += 1
+        future.add_done_callback(lambda _: self._notify(loop, started))
+        try:
+            return await asyncio.wait_for(
+                asyncio.wrap_future(future), self.timeout_seconds
+            )
+        except TimeoutError:
+            self.timeouts += 1
+            raise StatsTimeoutError
+        except BrokenProcessPool:
+            self._pool = None
+            raise StatsOverloadedError
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "inline": self.inline,
+            "offloaded": self.offloaded,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "pending": self._pending,
+            "offload_seconds": self.offload_seconds,
+            "offload_seconds_max": self.offload_seconds_max,
+        }
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # Forking a threaded server may deadlock, workers start clean instead.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def _notify(self, loop: asyncio.AbstractEventLoop, started: float) -> None:
+        # Runs in the pool management thread, counters are owned by the loop.
+        with suppress(RuntimeError):
+            loop.call_soon_threadsafe(self._release, started)
+
+    def _release(self, started: float) -> None:
+        elapsed = monotonic() - started
+        self._pending -= 1
+        self.offload_seconds += elapsed
+        self.offload_seconds_max = max(self.offload_seconds_max, elapsed)
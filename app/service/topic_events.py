@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager, suppress
+
+from redis.asyncio import Redis
+from redis.asyncio.client import PubSub
+from redis.exceptions import RedisError
+
+from app.core.events import EventsSettings
+
+CHANNEL_PREFIX = "events:"
+
+type TopicUpdate = tuple[int, bytes]
+"""Topic version and its rendered `TopicResponse`."""
+
+
+class TopicListener:
+    """
+    Mailbox of one live stream, holding only the newest undelivered update.
+
+    Updates are full snapshots, so a slow consumer skips the ones it could
+    not keep up with instead of buffering them.
+    """
+
+    def __init__(self, topic_id: str, version: int = 0) -> None:
+        self.topic_id = topic_id
+        self.version = version
+        self.skipped = 0
+        self.closed = False
+
+        self._pending: TopicUpdate | None = None
+        self._ready = asyncio.Event()
+
+    def offer(self, version: int, body: bytes) -> None:
+        """Queues an update unless the listener already saw a newer one."""
+        if version <= self.version:
+            return
+        if self._pending is not None:
+            if version <= self._pending[0]:
+                return
+            self.skipped += 1
+        self._pending = (version, body)
+        self._ready.set()
+
+    def close(self) -> None:
+        self.closed = True
+        self._ready.set()
+
+    async def next(self, timeout: float) -> TopicUpdate | None:
+        """Waits for the next update, None on timeout or once closed."""
+        with suppress(TimeoutError):
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        self._ready.clear()
+        update, self._pending = self._pending, None
+        if update is not None:
+            self.version = update[0]
+        return update
+
+
+class TopicEvents:
+    """
+    Per-worker fan-out of committed topic snapshots to live streams.
+
+    Updates are published to Redis so every worker sees them, each worker
+    keeps one connection subscribed to the topics its streams watch. Without
+    Redis, with the in-memory storage, updates are delivered in-process.
+    Listeners are closed when the subscription breaks, since updates may be
+    lost meanwhile; clients reconnect and start from a fresh snapshot.
+    """
+
+    def __init__(self, url: str | None, reconnect_seconds: float) -> None:
+        self.url = url
+        self.reconnect_seconds = reconnect_seconds
+
+        self.published = 0
+        self.delivered = 0
+        self.disconnects = 0
+
+        self._listeners: dict[str, set[TopicListener]] = {}
+        self._subscribed: set[str] = set()
+        self._subscribing = asyncio.Lock()
+        self._redis: Redis | None = None
+        self._pubsub: PubSub | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    @classmethod
+    def from_settings(cls, settings: EventsSettings, url: str | None) -> TopicEvents:
+        return cls(url=url, reconnect_seconds=settings.RECONNECT_SECONDS)
+
+    def __len__(self) -> int:
+        return sum(map(len, self._listeners.values()))
+
+    @asynccontextmanager
+    async def listen(
+        self, topic_id: str, since: int = 0
+    ) -> AsyncIterator[TopicListener]:
+        """Registers a listener of updates newer than `since` within the block."""
+        listener = TopicListener(topic_id, since)
+        self._listeners.setdefault(topic_id, set()).add(listener)
+        try:
+            await self._sync(topic_id)
+            yield listener
+        finally:
+            listeners = self._listeners[topic_id]
+            listeners.discard(listener)
+            if not listeners:
+                del self._listeners[topic_id]
+            # Streams end by cancellation, which must not leak the channel.
+            await asyncio.shield(self._sync(topic_id))
+
+    async def publish(self, topic_id: str, version: int, body: bytes) -> None:
+        self.published += 1
+        if self.url is None:
+            self._deliver(topic_id, version, body)
+            return
+        await self._client().publish(_channel(topic_id), f"{version}:".encode() + body)
+
+    def counters(self) -> dict[str, int]:
+        return {
+            "published": self.published,
+            "delivered": self.delivered,
+            "disconnects": self.disconnects,
+            "topics": len(self._listeners),
+            "listeners": len(self),
+        }
+
+    async def aclose(self) -> None:
+        self._close_all()
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self._subscribed.clear()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def _client(self) -> Redis:
+        if self._redis is None:
+            assert self.url is not None
+            self._redis = Redis.from_url(self.url)
+        return self._redis
+
+    async def _sync(self, topic_id: str) -> None:
+        """
+        Subscribes to the topic while it has listeners, unsubscribes after.
+
+        Listeners come and go during the commands, so the wanted state is read
+        under the lock, after the previous command for the topic finished.
+        """
+        if self.url is None:
+            return
+        async with self._subscribing:
+            wanted = topic_id in self._listeners
+            if wanted == (topic_id in self._subscribed):
+                return
+            if wanted:
+                await self._subscribe(topic_id)
+            else:
+                await self._unsubscribe(topic_id)
+
+    async def _subscribe(self, topic_id: str) -> None:
+        if self._pubsub is None:
+            self._pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(_channel(topic_id))
+        self._subscribed.add(topic_id)
+        if self._task is None:
+            self._task = asyncio.create_task(self._read())
+
+    async def _unsubscribe(self, topic_id: str) -> None:
+        self._subscribed.discard(topic_id)
+        if self._pubsub is None:
+            return
+        with suppress(RedisError, OSError):
+            await self._pubsub.unsubscribe(_channel(topic_id))
+
+    async def _read(self) -> None:
+        assert self._pubsub is not None
+        while True:
+            try:
+                message = await self._pubsub.get_message(timeout=None)
+            except (RedisError, OSError):
+                self.disconnects += 1
+                self._close_all()
+                await asyncio.sleep(self.reconnect_seconds)
+                continue
+            if message is None or message["type"] != "message":
+                continue
+            topic_id = message["channel"].decode().removeprefix(CHANNEL_PREFIX)
+            version, _, body = message["data"].partition(b":")
+            self._deliver(topic_id, int(version), body)
+
+    def _deliver(self, topic_id: str, version: int, body: bytes) -> None:
+        for listener in self._listeners.get(topic_id, ()):
+            listener.offer(version, body)
+            self.delivered += 1
+
+    def _close_all(self) -> None:
+        for listeners in self._listeners.values():
+            for listener in listeners:
+                listener.close()
+
+
+def _channel(topic_id: str) -> str:
+    return f"{CHANNEL_PREFIX}{topic_id}"
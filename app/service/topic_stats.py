@@ -1,14 +1,25 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from datetime import datetime, timedelta
+from collections.abc import Iterable, Sequence
+from datetime import UTC, datetime, timedelta
+from itertools import pairwise
 from math import ceil
 from typing import Final
 
 from app.core import config
-from app.models import Interval, StatsInterval, Topic, TopicStats
+from app.models import (
+    CompactTopic,
+    Interval,
+    SlotCounts,
+    SlotGrid,
+    SlotRuns,
+    StatsInterval,
+    Topic,
+    TopicStats,
+)
 
-SLOT = timedelta(minutes=config.GRID.SLOT_MINUTES_SIZE)
+UNIX_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+MICROSECOND = timedelta(microseconds=1)
 RATIO_CONFIG: Final[list[tuple[float, str]]] = [
     (0.9, "blocks_90"),
     (0.7, "blocks_70"),
@@ -18,9 +29,69 @@ RATIO_CONFIG: Final[list[tuple[float, str]]] = [
 
 def build_topic_stats(topic: Topic) -> TopicStats:
     """Returns TopicStats with mutually exclusive percentile ladders."""
-    bucket_counts = _count_buckets(topic.constraints, topic.votes.values())
+    return build_compact_stats(CompactTopic.from_topic(topic))
+
+
+def build_compact_stats(
+    compact: CompactTopic, backend: str | None = None
+) -> TopicStats:
+    """Same as `build_topic_stats` on an already compacted topic."""
+    backend = backend or config.STATS.BACKEND
+    stats: TopicStats | None = None
+    if backend == "numpy":
+        from app.service import topic_stats_numpy
+
+        if topic_stats_numpy.is_available():
+            stats = topic_stats_numpy.build_topic_stats(compact)
+    elif backend == "bitset":
+        from app.service import topic_stats_bitset
+
+        stats = topic_stats_bitset.build_topic_stats(compact)
+    return stats if stats is not None else _build_topic_stats_python(compact)
+
+
+def build_stats_from_counts(topic: Topic, slot_counts: SlotCounts) -> TopicStats:
+    """Classifies stored unconstrained slot counts without expanding votes."""
+    grid = SlotGrid.for_topic(topic)
+    bucket_counts = _allowed_counts(grid, topic.constraints, slot_counts)
+    return _stats_from_buckets(grid, bucket_counts, len(topic.votes))
+
+
+def _allowed_counts(
+    grid: SlotGrid, constraints: list[Interval], slot_counts: SlotCounts
+) -> dict[int, int]:
+    """Restricts stored counts to the buckets `_count_buckets` would count."""
+    if constraints:
+        allowed = _to_slots(grid.to_runs(constraints))
+        return {slot: slot_counts.get(slot, 0) for slot in allowed}
+    return {slot: count for slot, count in slot_counts.items() if count}
+
+
+def count_vote_slots(topic: Topic) -> SlotCounts:
+    """Counts voters per slot ignoring constraints, the shape kept in storage."""
+    return _count_buckets(None, CompactTopic.from_topic(topic).votes.values())
+
+
+def runs_delta(previous: SlotRuns, current: SlotRuns) -> SlotCounts:
+    """Returns per-slot count changes caused by replacing a single vote's runs."""
+    delta = dict.fromkeys(_to_slots(current), 1)
+    for slot in _to_slots(previous):
+        delta[slot] = delta.get(slot, 0) - 1
+    return {slot: change for slot, change in delta.items() if change}
+
+
+def _build_topic_stats_python(compact: CompactTopic) -> TopicStats:
+    """Runs the pure-Python pipeline over integer slot buckets."""
+    constraints = compact.constraints if compact.constrained else None
+    bucket_counts = _count_buckets(constraints, compact.votes.values())
+    return _stats_from_buckets(compact.grid, bucket_counts, len(compact.votes))
+
+
+def _stats_from_buckets(
+    grid: SlotGrid, bucket_counts: dict[int, int], vote_count: int
+) -> TopicStats:
+    """Builds ladders from already counted allowed buckets."""
     max_people = max(bucket_counts.values(), default=0)
-    vote_count = len(topic.votes)
     if max_people == 0:
         return TopicStats(vote_count=vote_count)
 
@@ -31,6 +102,7 @@ def build_topic_stats(topic: Topic) -> TopicStats:
     blocks: dict[str, list[StatsInterval]] = {}
     for ratio, field in RATIO_CONFIG:
         blocks[field] = _build_blocks(
+            grid,
             bucket_counts,
             slot_labels,
             ratio,
@@ -40,50 +112,88 @@ def build_topic_stats(topic: Topic) -> TopicStats:
 
 
 def _count_buckets(
-    constraints: Iterable[Interval], votes: Iterable[list[Interval]]
+    constraints: SlotRuns | None, votes: Iterable[SlotRuns]
+) -> dict[int, int]:
+    """Counts how many voters cover each allowed bucket via a sweep line."""
+    events: dict[int, int] = {}
+    for runs in votes:
+        for run_start, run_end in zip(runs[0::2], runs[1::2]):
+            events[run_start] = events.get(run_start, 0) + 1
+            events[run_end] = events.get(run_end, 0) - 1
+    boundaries = sorted(events)
+
+    counts: dict[int, int] = {}
+    if constraints is None:
+        coverage = 0
+        for current, following in pairwise(boundaries):
+            coverage += events[current]
+            if coverage > 0:
+                counts.update(dict.fromkeys(range(current, following), coverage))
+        return counts
+
+    coverage = 0
+    cursor = 0
+    for slot in _to_slots(constraints):
+        # Apply every boundary event that happened at or before this bucket.
+        while cursor < len(boundaries) and boundaries[cursor] <= slot:
+            coverage += events[boundaries[cursor]]
+            cursor += 1
+        counts[slot] = coverage
+    return counts
+
+
+def _count_buckets_naive(
+    constraints: Iterable[Interval],
+    votes: Iterable[list[Interval]],
+    slot_minutes: int = config.GRID.SLOT_MINUTES_SIZE,
 ) -> dict[datetime, int]:
-    """Counts how many voters cover each allowed 15-minute bucket."""
+    """Reference bucket counter, checks every allowed bucket against every vote."""
+    slot = timedelta(minutes=slot_minutes)
     if not constraints:
         counts: dict[datetime, int] = {}
         for user_intervals in votes:
-            for slot in _to_slots(user_intervals):
-                counts[slot] = counts.get(slot, 0) + 1
+            for start in _to_slot_starts(user_intervals, slot):
+                counts[start] = counts.get(start, 0) + 1
         return counts
 
-    allowed_slots = _to_slots(constraints)
-    counts = {slot: 0 for slot in allowed_slots}
+    allowed_slots = _to_slot_starts(constraints, slot)
+    counts = {start: 0 for start in allowed_slots}
     for user_intervals in votes:
-        for slot in allowed_slots:
-            slot_end = slot + SLOT
+        for slot_start in allowed_slots:
+            slot_end = slot_start + slot
             if any(
-                interval.start <= slot and interval.end >= slot_end
+                interval.start <= slot_start and interval.end >= slot_end
                 for interval in user_intervals
             ):
-                counts[slot] += 1
+                counts[slot_start] += 1
     return counts
 
 
-def _to_slots(intervals: Iterable[Interval]) -> list[datetime]:
-    """Expands intervals into sorted bucket start times."""
+def _to_slots(runs: Sequence[int]) -> list[int]:
+    """Expands slot runs into sorted slot offsets."""
+    slots: list[int] = []
+    for run_start, run_end in zip(runs[0::2], runs[1::2]):
+        slots.extend(range(run_start, run_end))
+    return slots
+
+
+def _to_slot_starts(intervals: Iterable[Interval], slot: timedelta) -> list[datetime]:
+    """Expands intervals into sorted bucket start times for the reference counter."""
     slots: set[datetime] = set()
     for window in intervals:
-        slot_start = _ceil_to_slot(window.start)
-        while slot_start + SLOT <= window.end:
+        slot_start = _ceil_to_slot(window.start, slot)
+        while slot_start + slot <= window.end:
             slots.add(slot_start)
-            slot_start += SLOT
+            slot_start += slot
     return sorted(slots)
 
 
-def _ceil_to_slot(moment: datetime) -> datetime:
-    """Rounds a timestamp up to the next bucket boundary."""
-    trimmed = moment.replace(second=0, microsecond=0)
-    remainder = trimmed.minute % 15
-    if remainder == 0 and moment.second == 0 and moment.microsecond == 0:
-        return trimmed
-    delta_minutes = (15 - remainder) % 15
-    if delta_minutes == 0:
-        delta_minutes = 15
-    return trimmed + timedelta(minutes=delta_minutes)
+def _ceil_to_slot(moment: datetime, slot: timedelta) -> datetime:
+    """Rounds a timestamp up to the next slot boundary counted from Unix epoch."""
+    aware = moment if moment.tzinfo is not None else moment.replace(tzinfo=UTC)
+    slot_us = slot // MICROSECOND
+    elapsed_us = (aware - UNIX_EPOCH) // MICROSECOND
+    return moment + (-elapsed_us % slot_us) * MICROSECOND
 
 
 def _compute_people_ranges(
@@ -103,11 +213,11 @@ def _compute_people_ranges(
 
 
 def _classify_slots_by_ratio(
-    bucket_counts: dict[datetime, int],
+    bucket_counts: dict[int, int],
     people_ranges: dict[float, tuple[int, int]],
-) -> dict[datetime, float | None]:
+) -> dict[int, float | None]:
     """Assigns each bucket to the highest ratio whose range contains it."""
-    labels: dict[datetime, float | None] = {}
+    labels: dict[int, float | None] = {}
     ordered = sorted(people_ranges.keys(), reverse=True)
     for slot, count in bucket_counts.items():
         labels[slot] = None
@@ -122,8 +232,9 @@ def _classify_slots_by_ratio(
 
 
 def _build_blocks(
-    bucket_counts: dict[datetime, int],
-    slot_labels: dict[datetime, float | None],
+    grid: SlotGrid,
+    bucket_counts: dict[int, int],
+    slot_labels: dict[int, float | None],
     ratio: float,
     people_range: tuple[int, int],
 ) -> list[StatsInterval]:
@@ -132,22 +243,22 @@ def _build_blocks(
         return []
     slots = sorted(bucket_counts)
     blocks: list[StatsInterval] = []
-    current_start: datetime | None = None
+    current_start: int | None = None
     current_min: int | None = None
     current_max: int | None = None
-    current_end: datetime | None = None
+    current_end: int | None = None
 
     for slot in slots:
         # Close the current block when there is a gap to keep intervals disjoint.
         if (
             current_start is not None
             and current_end is not None
-            and slot != current_end + SLOT
+            and slot != current_end + 1
         ):
             blocks.append(
                 StatsInterval(
-                    start=current_start,
-                    end=(current_end or current_start) + SLOT,
+                    start=grid.to_datetime(current_start),
+                    end=grid.to_datetime(current_end + 1),
                     people_min=current_min or people_range[0],
                     people_max=current_max or people_range[1],
                 )
@@ -161,8 +272,8 @@ def _build_blocks(
                 continue
             blocks.append(
                 StatsInterval(
-                    start=current_start,
-                    end=(current_end or current_start) + SLOT,
+                    start=grid.to_datetime(current_start),
+                    end=grid.to_datetime(current_end + 1),
                     people_min=current_min or people_range[0],
                     people_max=current_max or people_range[1],
                 )
@@ -185,8 +296,8 @@ def _build_blocks(
     if current_start is not None:
         blocks.append(
             StatsInterval(
-                start=current_start,
-                end=(current_end or current_start) + SLOT,
+                start=grid.to_datetime(current_start),
+                end=grid.to_datetime(current_end + 1),
                 people_min=current_min or people_range[0],
                 people_max=current_max or people_range[1],
             )
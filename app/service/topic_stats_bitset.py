@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import sys
+from array import array
+from collections.abc import Iterable, Sequence
+from functools import cache
+from typing import Final
+
+from app.models import CompactTopic, SlotRuns, StatsInterval, TopicStats
+from app.service.topic_stats import RATIO_CONFIG, _compute_people_ranges
+
+MAX_HORIZON_SLOTS: Final[int] = 200_000
+
+
+class AvailabilityBitsets:
+    """
+    Availability of every voter as an integer bitset over the slot horizon.
+
+    Bit `i` stands for slot `base + i`. Coverage is kept bit-sliced: plane `b`
+    holds bit `b` of the per-slot voter count, so counting and thresholds are
+    whole-horizon bitwise operations instead of per-slot loops.
+    """
+
+    def __init__(self, compact: CompactTopic, base: int, size: int) -> None:
+        self.base = base
+        self.size = size
+        self.full = (1 << size) - 1
+        self.voters = {
+            user: self._from_runs(runs) for user, runs in compact.votes.items()
+        }
+        self.allowed = (
+            self._from_runs(compact.constraints) if compact.constrained else None
+        )
+        self.planes = _bit_sliced_sum(self.voters.values())
+
+    @classmethod
+    def from_compact(cls, compact: CompactTopic) -> AvailabilityBitsets | None:
+        """Returns bitsets for the topic, None if its horizon is too wide."""
+        edges = [edge for runs in compact.votes.values() for edge in runs]
+        edges.extend(compact.constraints)
+        if not edges:
+            return cls(compact, 0, 0)
+        base = min(edges)
+        if max(edges) - base > MAX_HORIZON_SLOTS:
+            return None
+        return cls(compact, base, max(edges) - base)
+
+    @property
+    def covered(self) -> int:
+        """Slots taken into account: constraints, or anything someone voted for."""
+        if self.allowed is not None:
+            return self.allowed
+        covered = 0
+        for plane in self.planes:
+            covered |= plane
+        return covered
+
+    def all_free(self, usernames: Iterable[str]) -> int:
+        """Returns allowed slots where every given voter is available."""
+        mask = self.full if self.allowed is None else self.allowed
+        for user in usernames:
+            mask &= self.voters.get(user, 0)
+        return mask
+
+    def at_least(self, people: int) -> int:
+        """Returns slots covered by at least `people` voters."""
+        if people <= 0:
+            return self.full
+        if people.bit_length() > len(self.planes):
+            return 0
+        greater, equal = 0, self.full
+        for bit in reversed(range(len(self.planes))):
+            plane = self.planes[bit]
+            if people >> bit & 1:
+                equal &= plane
+            else:
+                greater |= equal & plane
+                equal &= ~plane
+        return greater | equal
+
+    def counts(self) -> Sequence[int]:
+        """
+        Returns voter count of every slot over the horizon.
+
+        Each plane is spread to one fixed-width lane per slot through a byte
+        table, shifted into its bit of the lane and merged, so the whole
+        horizon is converted at once instead of slot by slot.
+        """
+        width = _lane_width(len(self.planes))
+        size = (self.size + 7) // 8
+        lanes = 0
+        for bit, plane in enumerate(self.planes):
+            lanes |= int.from_bytes(_spread(plane, size, width), "little") << bit
+        counts = array(_LANE_TYPECODES[width])
+        counts.frombytes(lanes.to_bytes(size * 8 * width, "little"))
+        if sys.byteorder == "big":
+            counts.byteswap()
+        return counts[: self.size]
+
+    def to_runs(self, mask: int) -> SlotRuns:
+        """Converts a bitset into slot runs relative to the topic epoch."""
+        runs: SlotRuns = array("q")
+        for start, end in _set_bit_runs(mask):
+            runs.extend((self.base + start, self.base + end))
+        return runs
+
+    def _from_runs(self, runs: SlotRuns) -> int:
+        mask = 0
+        for start, end in zip(runs[0::2], runs[1::2]):
+            mask |= ((1 << (end - start)) - 1) << (start - self.base)
+        return mask
+
+
+def build_topic_stats(compact: CompactTopic) -> TopicStats | None:
+    """Builds TopicStats with bitwise thresholds, None if the horizon is too wide."""
+    bitsets = AvailabilityBitsets.from_compact(compact)
+    if bitsets is None:
+        return None
+
+    vote_count = len(compact.votes)
+    covered = bitsets.covered
+    max_people = 0
+    for bit in reversed(range(len(bitsets.planes))):
+        candidate = max_people | 1 << bit
+        if bitsets.at_least(candidate) & covered:
+            max_people = candidate
+    if max_people == 0:
+        return TopicStats(vote_count=vote_count)
+
+    ratios = [c[0] for c in RATIO_CONFIG]
+    people_ranges = _compute_people_ranges(max_people, ratios)
+
+    counts = bitsets.counts()
+    blocks: dict[str, list[StatsInterval]] = {}
+    for ratio, field in RATIO_CONFIG:
+        lower, upper = people_ranges.get(ratio, (0, 0))
+        if (lower, upper) == (0, 0):
+            blocks[field] = []
+            continue
+        mask = covered & bitsets.at_least(lower) & ~bitsets.at_least(upper + 1)
+        blocks[field] = _build_blocks(compact, bitsets, mask, counts)
+    return TopicStats(**blocks, vote_count=vote_count)
+
+
+def _build_blocks(
+    compact: CompactTopic,
+    bitsets: AvailabilityBitsets,
+    mask: int,
+    counts: Sequence[int],
+) -> list[StatsInterval]:
+    blocks: list[StatsInterval] = []
+    for start, end in _set_bit_runs(mask):
+        run = counts[start:end]
+        blocks.append(
+            StatsInterval(
+                start=compact.grid.to_datetime(bitsets.base + start),
+                end=compact.grid.to_datetime(bitsets.base + end),
+                people_min=min(run),
+                people_max=max(run),
+            )
+        )
+    return blocks
+
+
+_LANE_TYPECODES: Final[dict[int, str]] = {1: "B", 2: "H", 4: "I"}
+
+
+def _lane_width(planes: int) -> int:
+    """Returns bytes per slot needed for counts of the given bit width."""
+    return next(width for width in (1, 2, 4) if planes <= 8 * width)
+
+
+def _spread(mask: int, size: int, width: int) -> bytes:
+    """Returns the lowest `size` bytes of the mask with a `width` lane per bit."""
+    return b"".join(
+        map(_spread_table(width).__getitem__, mask.to_bytes(size, "little"))
+    )
+
+
+@cache
+def _spread_table(width: int) -> list[bytes]:
+    """Maps a byte to its eight bits, lowest first, each in a `width` lane."""
+    return [
+        b"".join((byte >> bit & 1).to_bytes(width, "little") for bit in range(8))
+        for byte in range(256)
+    ]
+
+
+def _bit_sliced_sum(masks: Iterable[int]) -> list[int]:
+    """Adds bitsets column-wise, returning the sum as little-endian bit planes."""
+    planes: list[int] = []
+    for carry in masks:
+        for bit, plane in enumerate(planes):
+            planes[bit], carry = plane ^ carry, plane & carry
+            if not carry:
+                break
+        if carry:
+            planes.append(carry)
+    return planes
+
+
+def _set_bit_runs(mask: int) -> Iterable[tuple[int, int]]:
+    """Yields half-open bit ranges of consecutive ones, lowest first."""
+    # Bits that differ from their lower neighbour alternate run starts and ends.
+    edges = mask ^ mask << 1
+    flags = _spread(edges, (edges.bit_length() + 7) // 8, 1)
+    find = flags.find
+    start = find(1)
+    while start >= 0:
+        end = find(1, start + 1)
+        yield start, end
+        start = find(1, end + 1)
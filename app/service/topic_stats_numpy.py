@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Final
+
+from app.models import CompactTopic, SlotGrid, StatsInterval, TopicStats
+from app.service.topic_stats import RATIO_CONFIG, _compute_people_ranges
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+MAX_HORIZON_SLOTS: Final[int] = 1_000_000
+
+
+def is_available() -> bool:
+    """Tells whether the optional numpy dependency is installed."""
+    return np is not None
+
+
+def build_topic_stats(compact: CompactTopic) -> TopicStats | None:
+    """Builds TopicStats over a contiguous slot horizon, None if it is too wide."""
+    vote_count = len(compact.votes)
+    vote_runs = np.concatenate(
+        [np.frombuffer(runs, dtype=np.int64) for runs in compact.votes.values()]
+        or [np.empty(0, dtype=np.int64)]
+    )
+    constraint_runs = np.frombuffer(compact.constraints, dtype=np.int64)
+    edges = np.concatenate((vote_runs, constraint_runs))
+    if edges.size == 0:
+        return TopicStats(vote_count=vote_count)
+
+    base = int(edges.min())
+    size = int(edges.max()) - base
+    if size > MAX_HORIZON_SLOTS:
+        return None
+
+    counts = _coverage(vote_runs - base, size)
+    if compact.constrained:
+        present = _coverage(constraint_runs - base, size) > 0
+    else:
+        present = counts > 0
+
+    max_people = int(counts.max(where=present, initial=0))
+    if max_people == 0:
+        return TopicStats(vote_count=vote_count)
+
+    ratios = [c[0] for c in RATIO_CONFIG]
+    people_ranges = _compute_people_ranges(max_people, ratios)
+    labels = _classify_slots_by_ratio(counts, people_ranges, ratios)
+
+    blocks: dict[str, list[StatsInterval]] = {}
+    for index, (_, field) in enumerate(RATIO_CONFIG):
+        blocks[field] = _build_blocks(
+            compact.grid, counts, present & (labels == index), base
+        )
+    return TopicStats(**blocks, vote_count=vote_count)
+
+
+def _coverage(offsets: np.ndarray, size: int) -> np.ndarray:
+    """Accumulates flattened runs into per-slot counts with a difference array."""
+    diff = np.zeros(size + 1, dtype=np.int64)
+    np.add.at(diff, offsets[0::2], 1)
+    np.add.at(diff, offsets[1::2], -1)
+    return np.cumsum(diff[:-1])
+
+
+def _classify_slots_by_ratio(
+    counts: np.ndarray,
+    people_ranges: dict[float, tuple[int, int]],
+    ratios: Sequence[float],
+) -> np.ndarray:
+    """Returns ratio index per slot (-1 for none) using a sorted bin lookup."""
+    bins = sorted(
+        (lower, upper, index)
+        for index, ratio in enumerate(ratios)
+        for lower, upper in [people_ranges.get(ratio, (0, 0))]
+        if (lower, upper) != (0, 0)
+    )
+    lowers = np.array([b[0] for b in bins])
+    uppers = np.array([b[1] for b in bins])
+    indices = np.array([b[2] for b in bins])
+
+    position = np.searchsorted(lowers, counts, side="right") - 1
+    clipped = np.clip(position, 0, len(bins) - 1)
+    matched = (position >= 0) & (counts <= uppers[clipped])
+    return np.where(matched, indices[clipped], -1)
+
+
+def _build_blocks(
+    grid: SlotGrid, counts: np.ndarray, mask: np.ndarray, base: int
+) -> list[StatsInterval]:
+    """Turns runs of tagged slots into blocks with per-run min and max counts."""
+    edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if starts.size == 0:
+        return []
+
+    values = counts[mask]
+    segments = np.concatenate(([0], np.cumsum(ends - starts)[:-1]))
+    minimums = np.minimum.reduceat(values, segments)
+    maximums = np.maximum.reduceat(values, segments)
+    return [
+        StatsInterval(
+            start=grid.to_datetime(base + int(start)),
+            end=grid.to_datetime(base + int(end)),
+            people_min=int(low),
+            people_max=int(high),
+        )
+        for start, end, low, high in zip(starts, ends, minimums, maximums)
+    ]
@@ -1,27 +1,51 @@
 from __future__ import annotations
 
-from datetime import datetime
+import asyncio
+from collections.abc import AsyncGenerator
+from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
+import inject
 from nanoid import generate
+from pydantic import TypeAdapter
 
 from app.core import config
-from app.core.exceptions import ForbiddenActionError
-from app.db.redis import get_topic, patch_topic, save_topic
+from app.core.exceptions import InvalidRangeError, RangeTooWideError
+from app.db.codec import decode_stats, decode_topic
+from app.db.storage import TopicStorage
 from app.models import (
+    BestWindows,
     ConstraintsPayload,
+    SlotGrid,
+    SlotVoters,
     Topic,
     TopicCreate,
+    TopicResponse,
     TopicStats,
     VotePayload,
 )
-from app.service.topic_stats import build_topic_stats
+from app.service.best_windows import (
+    BestWindowsCache,
+    find_windows_from_counts,
+    window_width,
+)
+from app.service.stats_cache import StatsCache
+from app.service.stats_executor import StatsExecutor
+from app.service.topic_events import TopicEvents, TopicUpdate
+from app.service.topic_stats import build_topic_stats, runs_delta
+from app.service.vote_batcher import VoteBatcher
+from app.service.voter_index import SlotVoterIndex, VoterIndexCache
 
 MOSCOW_TZ = ZoneInfo("Europe/Moscow")
+MAX_VOTERS_RANGE = timedelta(days=7)
+TOPIC_RESPONSE_ADAPTER = TypeAdapter(TopicResponse)
 
 
-async def create_topic(admin_name: str, payload: TopicCreate) -> Topic:
-    """Persists a freshly created topic and returns it."""
+@inject.autoparams("storage")
+async def create_topic(
+    admin_name: str, payload: TopicCreate, storage: TopicStorage
+) -> tuple[Topic, int]:
+    """Persists a freshly created topic, returns it and its version."""
     topic = Topic(
         topic_id=generate(size=config.GRID.TOPIC_ID_LENGTH),
         topic_name=payload.topic_name,
@@ -30,39 +54,233 @@ async def create_topic(admin_name: str, payload: TopicCreate) -> Topic:
         constraints=list(payload.constraints),
         votes={},
         created_at=_now_moscow(),
+        slot_minutes=payload.slot_minutes or config.GRID.SLOT_MINUTES_SIZE,
     )
-    await save_topic(topic, refresh_ttl=True)
-    return topic
+    stats = build_topic_stats(topic)
+    version = await storage.save_topic(topic, refresh_ttl=True, stats=stats)
+    await storage.save_body(topic.topic_id, version, render_topic(topic, stats))
+    return topic, version
+
 
+@inject.autoparams("cache", "executor", "storage")
+async def get_topic_with_stats(
+    topic_id: str,
+    cache: StatsCache,
+    executor: StatsExecutor,
+    storage: TopicStorage,
+    *,
+    min_version: int = 0,
+) -> tuple[Topic, TopicStats, int]:
+    """
+    Loads topic with its materialized stats and version, rebuilding stale stats.
 
-async def get_topic_with_stats(topic_id: str) -> tuple[Topic, TopicStats]:
-    """Loads topic and builds ladder stats for responses."""
-    topic = await get_topic(topic_id)
-    return topic, build_topic_stats(topic)
+    The version is at least `min_version`, the one the caller already saw.
+    Unchanged topics are served from the per-worker cache without decoding,
+    so the returned objects are shared and must not be mutated.
+    """
+    data, version, snapshot = await storage.get_raw_topic_snapshot(
+        topic_id, min_version=min_version
+    )
+    fingerprint = cache.fingerprint(data)
+    if (cached := cache.get(fingerprint)) is not None:
+        return *cached, version
 
+    topic = decode_topic(data)
+    stats = decode_stats(snapshot, version)
+    if stats is None:
+        stats = await executor.build(topic)
+        await storage.save_stats(topic_id, version, stats)
+    cache.put(fingerprint, len(data), topic, stats)
+    return topic, stats, version
 
-async def replace_vote(
-    topic_id: str, username: str, payload: VotePayload
-) -> tuple[Topic, TopicStats]:
-    """Overwrites user vote and returns updated snapshot."""
 
-    def assign_vote(topic: Topic) -> None:
-        topic.votes[username] = payload.intervals
+@inject.autoparams("storage")
+async def get_topic_body(
+    topic_id: str, storage: TopicStorage, *, min_version: int = 0
+) -> tuple[bytes, int]:
+    """
+    Returns rendered `TopicResponse` of the current version and the version.
+
+    Bodies are stored on every write, a missing one is rendered and stored.
+    """
+    version, body = await storage.get_body(topic_id, min_version=min_version)
+    if body is not None:
+        return body, version
+
+    topic, stats, version = await get_topic_with_stats(
+        topic_id, min_version=min_version
+    )
+    body = render_topic(topic, stats)
+    await storage.save_body(topic_id, version, body)
+    return body, version
+
+
+def render_topic(topic: Topic, stats: TopicStats) -> bytes:
+    """Serializes the topic the way the API returns it."""
+    return TOPIC_RESPONSE_ADAPTER.dump_json(TopicResponse(topic=topic, stats=stats))
+
+
+@inject.autoparams("storage")
+async def get_topic_version(
+    topic_id: str, storage: TopicStorage, *, min_version: int = 0
+) -> int:
+    """Returns current topic version without loading it, 0 if it is unknown."""
+    return await storage.get_topic_version(topic_id, min_version=min_version)
+
+
+@inject.autoparams("windows", "executor", "storage")
+async def get_best_windows(
+    topic_id: str,
+    duration_minutes: int,
+    k: int,
+    windows: BestWindowsCache,
+    executor: StatsExecutor,
+    storage: TopicStorage,
+    *,
+    min_version: int = 0,
+) -> BestWindows:
+    """
+    Finds top `k` windows of the duration most voters can attend.
+
+    Windows come from stored slot counts, votes are only counted, off the
+    event loop when large, if the storage has no counts for the topic.
+    """
+    version = await storage.get_topic_version(topic_id, min_version=min_version)
+    found = windows.get(topic_id, version, duration_minutes, k)
+    if found is None:
+        meta, version, counts = await storage.get_slot_counts(
+            topic_id, min_version=version
+        )
+        window_width(SlotGrid.for_topic(meta), duration_minutes)
+        if counts is not None:
+            found = find_windows_from_counts(meta, counts, duration_minutes, k)
+        else:
+            data, version, _ = await storage.get_raw_topic_snapshot(
+                topic_id, min_version=version
+            )
+            found = await executor.best_windows(decode_topic(data), duration_minutes, k)
+        windows.put(topic_id, version, duration_minutes, k, found)
+    return BestWindows(duration_minutes=duration_minutes, windows=found)
+
 
-    topic = await patch_topic(topic_id, assign_vote)
-    return topic, build_topic_stats(topic)
+@inject.autoparams("indexes", "storage")
+async def get_voter_index(
+    topic_id: str, indexes: VoterIndexCache, storage: TopicStorage
+) -> SlotVoterIndex:
+    """Returns slot to voters index of the current topic version."""
+    version = await storage.get_topic_version(topic_id)
+    if version and (index := indexes.get(topic_id, version)) is not None:
+        return index
+
+    data, version, _ = await storage.get_raw_topic_snapshot(
+        topic_id, min_version=version
+    )
+    index = SlotVoterIndex.from_topic(decode_topic(data))
+    indexes.put(topic_id, version, index)
+    return index
+
+
+async def get_slot_voters(topic_id: str, moment: datetime) -> SlotVoters:
+    """Returns voters available in the slot containing the moment."""
+    index = await get_voter_index(topic_id)
+    return index.voters(index.grid.floor(moment))
 
 
+async def get_range_voters(
+    topic_id: str, start: datetime, end: datetime
+) -> list[SlotVoters]:
+    """Returns voters of every slot touching [start, end) that anyone covers."""
+    # Naive and aware bounds can not be compared, both must be alike.
+    if (start.utcoffset() is None) != (end.utcoffset() is None) or end <= start:
+        raise InvalidRangeError
+    if end - start > MAX_VOTERS_RANGE:
+        raise RangeTooWideError
+    index = await get_voter_index(topic_id)
+    return index.voters_between(index.grid.floor(start), index.grid.ceil(end))
+
+
+@inject.autoparams("indexes", "batcher")
+async def replace_vote(
+    topic_id: str,
+    username: str,
+    payload: VotePayload,
+    indexes: VoterIndexCache,
+    batcher: VoteBatcher,
+) -> tuple[bytes, int]:
+    """Overwrites user vote, returns rendered snapshot and the vote version."""
+    topic, body, version, previous = await batcher.submit(
+        topic_id, username, payload.intervals
+    )
+    delta = None
+    if previous is not None:
+        current = SlotGrid.for_topic(topic).to_runs(payload.intervals)
+        delta = runs_delta(previous, current)
+    indexes.advance(topic_id, version, username, delta)
+    return body, version
+
+
+@inject.autoparams("storage")
 async def overwrite_constraints(
-    topic_id: str, username: str, payload: ConstraintsPayload
-) -> tuple[Topic, TopicStats]:
-    """Allows admin to replace constraints and get updated stats."""
-    topic = await get_topic(topic_id)
-    if topic.admin_name != username:
-        raise ForbiddenActionError("Only topic admin can edit constraints.")
-    topic.constraints = list(payload.constraints)
-    await save_topic(topic)
-    return topic, build_topic_stats(topic)
+    topic_id: str,
+    username: str,
+    payload: ConstraintsPayload,
+    storage: TopicStorage,
+) -> tuple[bytes, int]:
+    """Allows admin to replace constraints, returns rendered snapshot and version."""
+    topic, version = await storage.set_constraints(
+        topic_id, username, list(payload.constraints)
+    )
+    # Shielded, a disconnecting admin must not hold the update back from streams.
+    body = await asyncio.shield(_publish_snapshot(topic, version))
+    return body, version
+
+
+@inject.autoparams("executor", "storage", "events")
+async def _publish_snapshot(
+    topic: Topic,
+    version: int,
+    executor: StatsExecutor,
+    storage: TopicStorage,
+    events: TopicEvents,
+) -> bytes:
+    """Materializes stats and body of a committed version and publishes it."""
+    stats = await executor.build(topic)
+    await storage.save_stats(topic.topic_id, version, stats)
+    body = render_topic(topic, stats)
+    if await storage.save_body(topic.topic_id, version, body):
+        await events.publish(topic.topic_id, version, body)
+    return body
+
+
+@inject.autoparams("events")
+async def watch_topic(
+    topic_id: str,
+    events: TopicEvents,
+    *,
+    since: int,
+    heartbeat_seconds: float,
+    idle_seconds: float,
+) -> AsyncGenerator[TopicUpdate | None, None]:
+    """
+    Yields the current snapshot unless `since` is its version, then every
+    committed one. None is yielded after `heartbeat_seconds` without updates,
+    the stream ends after `idle_seconds` of them or when the listener closes.
+    """
+    async with events.listen(topic_id, since) as listener:
+        # Subscribed first, so nothing committed after the snapshot is missed.
+        body, version = await get_topic_body(topic_id, min_version=since)
+        listener.offer(version, body)
+        idle = 0.0
+        while not listener.closed:
+            update = await listener.next(heartbeat_seconds)
+            if update is not None:
+                idle = 0.0
+                yield update
+                continue
+            idle += heartbeat_seconds
+            if listener.closed or idle >= idle_seconds:
+                return
+            yield None
 
 
 def _now_moscow() -> datetime:
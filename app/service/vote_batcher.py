@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from contextlib import suppress
+
+from redis.exceptions import RedisError
+
+from app.core.db import RedisSettings
+from app.db.storage import TopicStorage
+from app.models import Interval, SlotRuns, Topic, TopicStats
+from app.service.topic_events import TopicEvents
+from app.service.topic_stats import build_stats_from_counts, count_vote_slots
+
+type VoteCommit = tuple[Topic, bytes, int, SlotRuns | None]
+"""Topic after the batch, its rendering, the vote version and its replaced runs."""
+
+type _Pending = tuple[str, list[Interval], asyncio.Future[VoteCommit]]
+
+
+class VoteBatcher:
+    """
+    Per-worker group commit of votes on the same topic.
+
+    Votes queued within the window, or while the previous batch of the topic is
+    being written, are applied by one script call with a single stats rebuild.
+    Each caller gets the resulting snapshot together with its own version.
+    The snapshot of a batch is stored and published by the batcher itself, so
+    live streams get it even when the callers are gone.
+    """
+
+    def __init__(
+        self,
+        storage: TopicStorage,
+        events: TopicEvents,
+        render: Callable[[Topic, TopicStats], bytes],
+        window_seconds: float,
+        max_batch: int,
+    ) -> None:
+        self.storage = storage
+        self.events = events
+        self.render = render
+        self.window_seconds = window_seconds
+        self.max_batch = max_batch
+
+        self.batches = 0
+        self.votes = 0
+
+        self._queues: dict[str, list[_Pending]] = {}
+        self._drains: dict[str, asyncio.Task[None]] = {}
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: RedisSettings,
+        storage: TopicStorage,
+        events: TopicEvents,
+        render: Callable[[Topic, TopicStats], bytes],
+    ) -> VoteBatcher:
+        return cls(
+            storage=storage,
+            events=events,
+            render=render,
+            window_seconds=settings.VOTE_BATCH_WINDOW_SECONDS,
+            max_batch=settings.VOTE_BATCH_MAX_SIZE,
+        )
+
+    async def submit(
+        self, topic_id: str, username: str, intervals: list[Interval]
+    ) -> VoteCommit:
+        """Queues a vote replacement and waits until its batch is committed."""
+        future: asyncio.Future[VoteCommit] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(topic_id, []).append((username, intervals, future))
+        if topic_id not in self._drains:
+            self._drains[topic_id] = asyncio.create_task(self._drain(topic_id))
+        return await future
+
+    def counters(self) -> dict[str, float]:
+        return {
+            "batches": self.batches,
+            "votes": self.votes,
+            "votes_per_batch": self.votes / self.batches if self.batches else 0.0,
+            "queued": sum(map(len, self._queues.values())),
+        }
+
+    async def _drain(self, topic_id: str) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.window_seconds)
+                queue = self._queues[topic_id]
+                batch = queue[: self.max_batch]
+                del queue[: self.max_batch]
+                await self._commit(topic_id, batch)
+                if not queue:
+                    del self._queues[topic_id]
+                    return
+        finally:
+            del self._drains[topic_id]
+
+    async def _commit(self, topic_id: str, batch: list[_Pending]) -> None:
+        try:
+            topic, stats, version, previous = await self.storage.set_votes(
+                topic_id,
+                [(username, intervals) for username, intervals, _ in batch],
+                count_slots=count_vote_slots,
+                summarize=build_stats_from_counts,
+            )
+            body = self.render(topic, stats)
+        except Exception as error:  # noqa: BLE001 - re-raised by every waiting caller
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        # Votes are committed already, a lost body is rendered again on read.
+        with suppress(RedisError, OSError):
+            if await self.storage.save_body(topic_id, version, body):
+                await self.events.publish(topic_id, version, body)
+
+        self.batches += 1
+        self.votes += len(batch)
+        first = version - len(batch) + 1
+        for offset, (_, _, future) in enumerate(batch):
+            if not future.done():
+                runs = None if previous is None else previous[offset]
+                future.set_result((topic, body, first + offset, runs))
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+
+from app.core.stats import StatsSettings
+from app.models import CompactTopic, SlotCounts, SlotGrid, SlotVoters, Topic
+
+
+class SlotVoterIndex:
+    """Inverted index from a slot to the voters fully covering it."""
+
+    def __init__(self, grid: SlotGrid, slots: dict[int, set[str]]) -> None:
+        self.grid = grid
+        self._slots = slots
+
+    @classmethod
+    def from_topic(cls, topic: Topic) -> SlotVoterIndex:
+        compact = CompactTopic.from_topic(topic)
+        slots: dict[int, set[str]] = {}
+        for user, runs in compact.votes.items():
+            for start, end in zip(runs[0::2], runs[1::2]):
+                for slot in range(start, end):
+                    slots.setdefault(slot, set()).add(user)
+        return cls(compact.grid, slots)
+
+    def voters(self, slot: int) -> SlotVoters:
+        """Returns voters available in the slot, sorted by name."""
+        return SlotVoters(
+            start=self.grid.to_datetime(slot),
+            end=self.grid.to_datetime(slot + 1),
+            voters=sorted(self._slots.get(slot, ())),
+        )
+
+    def voters_between(self, start: int, end: int) -> list[SlotVoters]:
+        """Returns voters of every slot in [start, end) that anyone covers."""
+        return [self.voters(slot) for slot in range(start, end) if slot in self._slots]
+
+    def apply(self, username: str, delta: SlotCounts) -> None:
+        """Applies a single vote replacement given as per-slot count changes."""
+        for slot, change in delta.items():
+            if change > 0:
+                self._slots.setdefault(slot, set()).add(username)
+                continue
+            voters = self._slots.get(slot)
+            if voters is None:
+                continue
+            voters.discard(username)
+            if not voters:
+                del self._slots[slot]
+
+
+class VoterIndexCache:
+    """Bounded per-worker LRU of voter indexes keyed by topic version."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[int, SlotVoterIndex]] = OrderedDict()
+
+    @classmethod
+    def from_settings(cls, settings: StatsSettings) -> VoterIndexCache:
+        return cls(max_entries=settings.INDEX_MAX_ENTRIES)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, topic_id: str, version: int) -> SlotVoterIndex | None:
+        entry = self._entries.get(topic_id)
+        if entry is None or entry[0] != version:
+            return None
+        self._entries.move_to_end(topic_id)
+        return entry[1]
+
+    def put(self, topic_id: str, version: int, index: SlotVoterIndex) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[topic_id] = (version, index)
+        self._entries.move_to_end(topic_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def advance(
+        self, topic_id: str, version: int, username: str, delta: SlotCounts | None
+    ) -> None:
+        """Moves a cached index to `version` if it was built for the one before."""
+        entry = self._entries.get(topic_id)
+        if entry is None:
+            return
+        if entry[0] != version - 1 or delta is None:
+            # Another worker wrote in between, the index is rebuilt on next read.
+            del self._entries[topic_id]
+            return
+        entry[1].apply(username, delta)
+        self._entries[topic_id] = (version, entry[1])
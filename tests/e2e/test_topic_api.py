@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import pytest
 from fastapi.testclient import TestClient
 
 from app.core import config
@@ -159,3 +160,242 @@ def test_interval_continuity(client: TestClient) -> None:
             "people_max": 2,
         }
     ]
+
+
+def test_best_windows_rank_by_attendance(client: TestClient) -> None:
+    created = create_topic(client)
+    topic_id = created["topic"]["topic_id"]
+    for username, window in (("alice", interval(0, 60)), ("bob", interval(30, 60))):
+        client.put(
+            f"/api/v1/topic/{topic_id}/pick",
+            params={"username": username},
+            json={"intervals": [window]},
+        )
+
+    response = client.get(
+        f"/api/v1/topic/{topic_id}/best", params={"duration": 30, "k": 5}
+    )
+    body = response.json()
+
+    assert response.status_code == 200
+    assert body["duration_minutes"] == 30
+    assert [w["people_min"] for w in body["windows"]] == [2, 1]
+    assert body["windows"][0]["start"].endswith("09:30:00")
+
+
+def test_best_windows_reject_durations_splitting_a_slot(client: TestClient) -> None:
+    topic_id = create_topic(client)["topic"]["topic_id"]
+
+    response = client.get(
+        f"/api/v1/topic/{topic_id}/best", params={"duration": 20, "k": 5}
+    )
+
+    assert response.status_code == 422
+
+
+def test_slot_voters_lookup_follows_votes(client: TestClient) -> None:
+    created = create_topic(client)
+    topic_id = created["topic"]["topic_id"]
+    slot = interval(30, 45)["start"]
+
+    for username, window in (("bob", interval(0, 60)), ("alice", interval(30, 60))):
+        client.put(
+            f"/api/v1/topic/{topic_id}/pick",
+            params={"username": username},
+            json={"intervals": [window]},
+        )
+        response = client.get(f"/api/v1/topic/{topic_id}/slots/{slot}/voters")
+    assert response.json()["voters"] == ["alice", "bob"]
+
+    client.put(
+        f"/api/v1/topic/{topic_id}/pick",
+        params={"username": "bob"},
+        json={"intervals": []},
+    )
+    response = client.get(
+        f"/api/v1/topic/{topic_id}/slots/voters",
+        params={"start": interval(0, 0)["start"], "end": interval(0, 60)["end"]},
+    )
+    assert [entry["voters"] for entry in response.json()] == [["alice"], ["alice"]]
+
+
+@pytest.mark.parametrize(
+    ("start", "end"),
+    [
+        ("2025-01-01T10:00:00", "2025-01-01T10:00:00"),
+        ("2025-01-01T11:00:00", "2025-01-01T10:00:00"),
+        ("2025-01-01T09:00:00", "2025-01-01T10:00:00+03:00"),
+        ("2025-01-01T09:00:00", "2025-01-09T09:00:00"),
+    ],
+)
+def test_range_voters_reject_invalid_ranges(
+    client: TestClient, start: str, end: str
+) -> None:
+    topic_id = create_topic(client)["topic"]["topic_id"]
+
+    response = client.get(
+        f"/api/v1/topic/{topic_id}/slots/voters", params={"start": start, "end": end}
+    )
+
+    assert response.status_code == 422
+
+
+def test_topic_slot_size_is_chosen_at_creation(client: TestClient) -> None:
+    payload = {"topic_name": "Retro", "slot_minutes": 30}
+    response = client.post("/api/v1/topic", params={"username": "alice"}, json=payload)
+    topic_id = response.json()["topic"]["topic_id"]
+    assert response.json()["topic"]["slot_minutes"] == 30
+
+    response = client.put(
+        f"/api/v1/topic/{topic_id}/pick",
+        params={"username": "alice"},
+        json={"intervals": [interval(15, 90)]},
+    )
+    block = response.json()["stats"]["blocks_90"][0]
+    assert block["start"].endswith("09:30:00")
+    assert block["end"].endswith("10:30:00")
+
+    payload = {"topic_name": "Retro", "slot_minutes": 7}
+    response = client.post("/api/v1/topic", params={"username": "alice"}, json=payload)
+    assert response.status_code == 422
+
+
+def test_writes_return_version_for_reads(client: TestClient) -> None:
+    created = create_topic(client)
+    topic_id = created["topic"]["topic_id"]
+
+    response = client.put(
+        f"/api/v1/topic/{topic_id}/pick",
+        params={"username": "alice"},
+        json={"intervals": [interval(0, 60)]},
+    )
+    version = response.headers["X-Topic-Version"]
+    response = client.get(
+        f"/api/v1/topic/{topic_id}", headers={"X-Topic-Version": version}
+    )
+
+    assert version == "2"
+    assert response.headers["X-Topic-Version"] == version
+    assert response.json()["topic"]["votes"]["alice"]
+
+
+def test_unchanged_topic_is_not_modified(client: TestClient) -> None:
+    created = create_topic(client)
+    url = f"/api/v1/topic/{created['topic']['topic_id']}"
+
+    response = client.get(url)
+    etag = response.headers["ETag"]
+    not_modified = client.get(url, headers={"If-None-Match": f'W/{etag}, "0"'})
+    client.put(
+        f"{url}/pick",
+        params={"username": "bob"},
+        json={"intervals": [interval(0, 30)]},
+    )
+    modified = client.get(url, headers={"If-None-Match": etag})
+
+    assert response.headers["Cache-Control"] == "public, no-cache"
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["ETag"] == etag
+    assert modified.status_code == 200
+    assert modified.headers["ETag"] != etag
+    assert modified.json()["topic"]["votes"]["bob"]
+
+
+def test_first_poll_after_create_is_not_modified(client: TestClient) -> None:
+    payload = {"topic_name": "Retro", "constraints": [interval(0, 60)]}
+    created = client.post("/api/v1/topic", params={"username": "alice"}, json=payload)
+    url = f"/api/v1/topic/{created.json()['topic']['topic_id']}"
+
+    poll = client.get(
+        url,
+        headers={
+            "If-None-Match": created.headers["ETag"],
+            "X-Topic-Version": created.headers["X-Topic-Version"],
+        },
+    )
+
+    assert created.headers["X-Topic-Version"] == "1"
+    assert poll.status_code == 304
+
+
+def test_not_modified_needs_existing_topic(client: TestClient) -> None:
+    response = client.get("/api/v1/topic/missing", headers={"If-None-Match": "*"})
+
+    assert response.status_code == 404
+
+
+def test_stored_body_matches_vote_response(client: TestClient) -> None:
+    created = create_topic(client)
+    url = f"/api/v1/topic/{created['topic']['topic_id']}"
+
+    voted = client.put(
+        f"{url}/pick",
+        params={"username": "bob"},
+        json={"intervals": [interval(0, 45)]},
+    )
+    response = client.get(url)
+
+    assert response.headers["Content-Type"] == "application/json"
+    assert response.content == voted.content
+    assert response.json()["stats"]["vote_count"] == 1
+
+
+def test_events_stream_starts_with_snapshot(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(config.EVENTS, "HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(config.EVENTS, "IDLE_SECONDS", 0.03)
+    created = create_topic(client)
+    url = f"/api/v1/topic/{created['topic']['topic_id']}"
+
+    response = client.get(f"{url}/events")
+    caught_up = client.get(f"{url}/events", headers={"Last-Event-ID": "1"})
+
+    event, *heartbeats = response.text.split("\n\n")[:-1]
+    assert response.headers["Content-Type"].startswith("text/event-stream")
+    assert event.startswith("id: 1\nevent: snapshot\ndata: ")
+    assert heartbeats == [": heartbeat"] * len(heartbeats)
+    assert "snapshot" not in caught_up.text
+    assert client.get("/api/v1/topic/missing/events").status_code == 404
+
+
+def test_websocket_pushes_committed_votes(client: TestClient) -> None:
+    created = create_topic(client)
+    url = f"/api/v1/topic/{created['topic']['topic_id']}"
+
+    with client.websocket_connect(f"{url}/ws") as websocket:
+        initial = websocket.receive_json()
+        client.put(
+            f"{url}/pick",
+            params={"username": "bob"},
+            json={"intervals": [interval(0, 30)]},
+        )
+        pushed = websocket.receive_json()
+
+    assert initial["topic"]["votes"] == {}
+    assert pushed["topic"]["votes"]["bob"]
+    assert pushed["stats"]["vote_count"] == 1
+
+
+def test_metrics_count_committed_votes(client: TestClient) -> None:
+    created = create_topic(client)
+    before = client.get("/api/v1/metrics").json()
+
+    client.put(
+        f"/api/v1/topic/{created['topic']['topic_id']}/pick",
+        params={"username": "bob"},
+        json={"intervals": [interval(0, 30)]},
+    )
+    after = client.get("/api/v1/metrics").json()
+
+    assert set(after) == {
+        "compression",
+        "topic_cache",
+        "replicas",
+        "stats_cache",
+        "stats_executor",
+        "vote_batcher",
+        "events",
+    }
+    assert after["vote_batcher"]["votes"] == before["vote_batcher"]["votes"] + 1
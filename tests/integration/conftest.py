@@ -1,14 +1,15 @@
 from typing import AsyncIterator
 
 import pytest_asyncio
-from redis.asyncio import Redis
+from redis.asyncio import Redis, RedisCluster
 
 from app.core import config
 
 
 @pytest_asyncio.fixture
 async def redis_client() -> AsyncIterator[Redis]:
-    client = Redis.from_url(config.REDIS.URL)
+    client_class = RedisCluster if config.REDIS.CLUSTER else Redis
+    client = client_class.from_url(config.REDIS.URL)
 
     yield client
 
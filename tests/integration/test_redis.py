@@ -1,13 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime
 
 import pytest
 from redis.asyncio import Redis
 
-from app.core.exceptions import TopicNotFoundError
-from app.db.redis import delete_topic, get_topic, patch_topic, save_topic
-from app.models import Topic
+from app.core import config
+from app.core.exceptions import ForbiddenActionError, TopicNotFoundError
+from app.db.codec import VOTE_ADAPTER, decode_stats, decode_topic, encode_vote
+from app.db.compression import MARKER, Compressor
+from app.db.migrate import migrate_blob_topics, migrate_key_layout
+from app.db.redis import (
+    _decode_counts,
+    delete_topic,
+    get_body,
+    get_raw_topic_snapshot,
+    get_slot_counts,
+    get_topic_version,
+    save_body,
+    save_stats,
+    save_topic,
+    set_constraints,
+    set_votes,
+    topic_key,
+)
+from app.db.replicas import ReplicaPool
+from app.db.tracking import TopicCache
+from app.models import SlotCounts, Topic, TopicStats
+from app.service.topic_stats import (
+    build_stats_from_counts,
+    build_topic_stats,
+    count_vote_slots,
+)
 from tests.unit.util import make_interval
 
 
@@ -29,7 +54,7 @@ async def test_save_and_get_topic_roundtrip(redis_client: Redis) -> None:
     stored = _topic("topic-roundtrip")
 
     await save_topic(stored, redis_client)
-    loaded = await get_topic(stored.topic_id, redis_client)
+    loaded = await _get_topic(stored.topic_id, redis_client)
 
     assert loaded == stored
 
@@ -42,14 +67,14 @@ async def test_override_topic(redis_client: Redis) -> None:
     stored.topic_name = "New Name"
     await save_topic(stored, redis_client)
 
-    loaded = await get_topic(stored.topic_id, redis_client)
+    loaded = await _get_topic(stored.topic_id, redis_client)
     assert loaded.topic_name == stored.topic_name
 
 
 @pytest.mark.asyncio
 async def test_get_topic_missing_raises(redis_client: Redis) -> None:
     with pytest.raises(TopicNotFoundError):
-        await get_topic("missing-topic", redis_client)
+        await _get_topic("missing-topic", redis_client)
 
 
 @pytest.mark.asyncio
@@ -60,28 +85,351 @@ async def test_delete_topic_removes_data(redis_client: Redis) -> None:
     await delete_topic(stored.topic_id, redis_client)
 
     with pytest.raises(TopicNotFoundError):
-        await get_topic(stored.topic_id, redis_client)
+        await _get_topic(stored.topic_id, redis_client)
+
+
+async def _get_snapshot(
+    topic_id: str, redis: Redis
+) -> tuple[Topic, int, TopicStats | None]:
+    data, version, snapshot = await get_raw_topic_snapshot(topic_id, redis)
+    return decode_topic(data), version, decode_stats(snapshot, version)
+
+
+async def _get_topic(topic_id: str, redis: Redis) -> Topic:
+    return (await _get_snapshot(topic_id, redis))[0]
+
+
+async def _set_vote(
+    topic_id: str, username: str, vote: list, redis: Redis, summarize=None
+):
+    topic, stats, version, previous = await set_votes(
+        topic_id,
+        [(username, vote)],
+        redis,
+        count_slots=count_vote_slots,
+        summarize=summarize or build_stats_from_counts,
+    )
+    return topic, stats, version, None if previous is None else previous[0]
 
 
 @pytest.mark.asyncio
-async def test_patch_topic_updates_data(redis_client: Redis) -> None:
-    stored = _topic("topic-patch")
+async def test_set_vote_applies_vote_delta(redis_client: Redis) -> None:
+    stored = _topic("topic-counts")
     await save_topic(stored, redis_client)
+    vote = [make_interval(datetime(2025, 1, 1, 9, 0), minutes=(15, 45))]
+    seen: list[SlotCounts] = []
 
-    def change_topic_name(topic: Topic) -> None:
-        topic.topic_name = "New Name"
+    def summarize(topic: Topic, counts: SlotCounts) -> TopicStats:
+        seen.append(dict(counts))
+        return build_stats_from_counts(topic, counts)
 
-    await patch_topic(stored.topic_id, change_topic_name, redis_client)
+    # First vote rebuilds missing counts, the second one only applies the delta.
+    for version in (2, 3):
+        topic, stats, committed, previous = await _set_vote(
+            stored.topic_id, "bob", vote, redis_client, summarize
+        )
+        assert committed == version
+        assert (previous is None) == (version == 2)
+        assert topic.votes["bob"] == vote
+        assert seen[-1] == count_vote_slots(topic)
+        assert stats == build_topic_stats(topic)
 
-    loaded = await get_topic(stored.topic_id, redis_client)
-    assert loaded.topic_name == "New Name"
+    stored_counts = await redis_client.hgetall(
+        topic_key(stored.topic_id, "slot_counts")
+    )
+    assert _decode_counts(stored_counts) == seen[-1]
 
 
 @pytest.mark.asyncio
-async def test_patch_topic_raises_error_on_missing_topic(redis_client: Redis) -> None:
-    with pytest.raises(TopicNotFoundError):
-        await patch_topic(
-            "missing-topic",
-            lambda topic: None,
-            redis_client,
-        )
+async def test_vote_on_reused_id_rebuilds_counts(redis_client: Redis) -> None:
+    stored = _topic("topic-reused")
+    await save_topic(stored, redis_client)
+    vote = [make_interval(stored.created_at, minutes=(0, 60))]
+    await _set_vote(stored.topic_id, "eve", vote, redis_client)
+    await _set_vote(stored.topic_id, "eve", vote, redis_client)
+    # Removed behind the worker's back, it still remembers the old grid.
+    await redis_client.delete(*await redis_client.keys("topic:{topic-reused}:*"))
+    await save_topic(stored.model_copy(update={"slot_minutes": 30}), redis_client)
+
+    topic, _, _, previous = await _set_vote(stored.topic_id, "eve", vote, redis_client)
+
+    stored_counts = await redis_client.hgetall(
+        topic_key(stored.topic_id, "slot_counts")
+    )
+    assert previous is None
+    assert _decode_counts(stored_counts) == count_vote_slots(topic)
+
+
+@pytest.mark.asyncio
+async def test_slot_counts_are_read_without_votes(redis_client: Redis) -> None:
+    stored = _topic("topic-counted")
+    await save_topic(stored, redis_client)
+    vote = [make_interval(stored.created_at, minutes=(0, 60))]
+    topic, _, version, _ = await _set_vote(stored.topic_id, "eve", vote, redis_client)
+
+    meta, loaded_version, counts = await get_slot_counts(stored.topic_id, redis_client)
+    assert (meta.votes, meta.constraints) == ({}, stored.constraints)
+    assert (loaded_version, counts) == (version, count_vote_slots(topic))
+
+    await redis_client.delete(topic_key(stored.topic_id, "slot_counts"))
+    assert (await get_slot_counts(stored.topic_id, redis_client))[2] is None
+
+
+@pytest.mark.asyncio
+async def test_concurrent_votes_do_not_conflict(redis_client: Redis) -> None:
+    stored = _topic("topic-concurrent")
+    await save_topic(stored, redis_client)
+    base = datetime(2025, 1, 1, 9, 0)
+    await _set_vote(stored.topic_id, "bob", stored.votes["bob"], redis_client)
+
+    await asyncio.gather(
+        *(
+            _set_vote(
+                stored.topic_id,
+                f"user{idx}",
+                [make_interval(base, minutes=(15 * (idx % 4), 60))],
+                redis_client,
+            )
+            for idx in range(20)
+        ),
+        _set_vote(stored.topic_id, "bob", [], redis_client),
+        _set_vote(
+            stored.topic_id, "bob", [make_interval(base, hours=(0, 1))], redis_client
+        ),
+    )
+
+    topic, version, stats = await _get_snapshot(stored.topic_id, redis_client)
+    stored_counts = await redis_client.hgetall(
+        topic_key(stored.topic_id, "slot_counts")
+    )
+    assert len(topic.votes) == 21
+    assert version == 24
+    assert _decode_counts(stored_counts) == count_vote_slots(topic)
+    assert stats in (None, build_topic_stats(topic))
+
+
+@pytest.mark.asyncio
+async def test_set_constraints_keeps_votes(redis_client: Redis) -> None:
+    stored = _topic("topic-constraints")
+    await save_topic(stored, redis_client)
+
+    with pytest.raises(ForbiddenActionError):
+        await set_constraints(stored.topic_id, "bob", [], redis_client)
+    topic, version = await set_constraints(
+        stored.topic_id, stored.admin_name, [], redis_client
+    )
+
+    assert version == 2
+    assert topic == stored.model_copy(update={"constraints": []})
+    assert await _get_topic(stored.topic_id, redis_client) == topic
+
+
+@pytest.mark.asyncio
+async def test_legacy_json_votes_are_rewritten_on_vote(redis_client: Redis) -> None:
+    stored = _topic("topic-json-votes")
+    await save_topic(stored, redis_client)
+    votes_key = topic_key(stored.topic_id, "votes")
+    legacy = VOTE_ADAPTER.dump_json(stored.votes["bob"])
+    await redis_client.hset(votes_key, "bob", legacy)
+
+    assert await _get_topic(stored.topic_id, redis_client) == stored
+    await _set_vote(stored.topic_id, "bob", stored.votes["bob"], redis_client)
+
+    assert await redis_client.hget(votes_key, "bob") == encode_vote(stored.votes["bob"])
+    assert await _get_topic(stored.topic_id, redis_client) == stored
+
+
+@pytest.mark.asyncio
+async def test_compressed_and_plain_votes_coexist(redis_client: Redis) -> None:
+    stored = _topic("topic-compressed")
+    base = datetime(2025, 1, 1, 9, 0)
+    stored.votes["carol"] = [make_interval(base, (i, i + 1)) for i in range(0, 600, 2)]
+    compressor = Compressor("zlib", level=6, min_bytes=1024)
+
+    await save_topic(stored, redis_client, compressor)
+    await _set_vote(stored.topic_id, "dave", stored.votes["bob"], redis_client)
+    stored.votes["dave"] = stored.votes["bob"]
+
+    votes = await redis_client.hgetall(topic_key(stored.topic_id, "votes"))
+    assert votes[b"carol"].startswith(MARKER)
+    assert not votes[b"bob"].startswith(MARKER)
+    assert await _get_topic(stored.topic_id, redis_client) == stored
+    assert compressor.counters()["compressed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_topic_cache_falls_back_without_tracking(redis_client: Redis) -> None:
+    stored = _topic("topic-tracked")
+    await save_topic(stored, redis_client)
+    cache = TopicCache(
+        enabled=True, max_entries=8, max_bytes=1 << 20, reconnect_seconds=0.01
+    )
+
+    cache.start(config.REDIS.URL)
+    for _ in range(100):
+        if cache._task is not None and cache._task.done():
+            break
+        await asyncio.sleep(0.01)
+    snapshot = await get_raw_topic_snapshot(stored.topic_id, redis_client, cache=cache)
+    await cache.stop()
+
+    assert not cache.connected
+    assert decode_topic(snapshot[0]) == stored
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_body_follows_topic_version(redis_client: Redis) -> None:
+    stored = _topic("topic-body")
+    version = await save_topic(stored, redis_client)
+
+    assert not await save_body(stored.topic_id, version - 1, b"{}", redis_client)
+    assert await get_body(stored.topic_id, redis_client) == (version, None)
+    assert await save_body(stored.topic_id, version, b'{"a":1}', redis_client)
+    assert await get_body(stored.topic_id, redis_client) == (version, b'{"a":1}')
+
+    await _set_vote(stored.topic_id, "eve", [], redis_client)
+    assert await get_body(stored.topic_id, redis_client) == (version + 1, None)
+    await delete_topic(stored.topic_id, redis_client)
+    assert await redis_client.keys(f"topic:{{{stored.topic_id}}}:*") == []
+
+
+@pytest.mark.asyncio
+async def test_derived_keys_expire_with_meta(redis_client: Redis) -> None:
+    stored = _topic("topic-expiring")
+    await save_topic(stored, redis_client)
+    for suffix in ("meta", "version"):
+        await redis_client.expire(topic_key(stored.topic_id, suffix), 60)
+
+    _, stats, version, _ = await set_votes(
+        stored.topic_id,
+        [("eve", [make_interval(stored.created_at, minutes=(0, 60))])],
+        redis_client,
+        count_slots=count_vote_slots,
+        summarize=build_stats_from_counts,
+    )
+    assert await save_stats(stored.topic_id, version, stats, redis_client)
+    assert await save_body(stored.topic_id, version, b"{}", redis_client)
+
+    for suffix in ("version", "stats", "body"):
+        assert 0 < await redis_client.ttl(topic_key(stored.topic_id, suffix)) <= 60
+
+
+@pytest.mark.asyncio
+async def test_replica_reads_fall_back_to_primary(redis_client: Redis) -> None:
+    stored = _topic("topic-replicated")
+    await save_topic(stored, redis_client)
+    # The same server plays a replica that is always caught up.
+    replicas = ReplicaPool([Redis.from_url(config.REDIS.URL)], 1)
+
+    first = await get_raw_topic_snapshot(
+        stored.topic_id, redis_client, replicas=replicas, min_version=1
+    )
+    second = await get_raw_topic_snapshot(
+        stored.topic_id, redis_client, replicas=replicas, min_version=2
+    )
+    await replicas.aclose()
+
+    assert first == second
+    assert replicas.counters() == {
+        "reads": 2,
+        "lagging": 1,
+        "failures": 0,
+        "healthy": 1,
+        "replicas": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_replica_versions_fall_back_to_primary(redis_client: Redis) -> None:
+    stored = _topic("topic-replicated-version")
+    await save_topic(stored, redis_client)
+    replicas = ReplicaPool([Redis.from_url(config.REDIS.URL)], 1)
+
+    current = await get_topic_version(
+        stored.topic_id, redis_client, replicas=replicas, min_version=1
+    )
+    ahead = await get_topic_version(
+        stored.topic_id, redis_client, replicas=replicas, min_version=2
+    )
+    missing = await get_topic_version("topic-unknown", redis_client, replicas=replicas)
+    await replicas.aclose()
+
+    assert (current, ahead, missing) == (1, 1, 0)
+    assert (replicas.reads, replicas.lagging) == (2, 2)
+
+
+@pytest.mark.asyncio
+async def test_migrate_blob_topics(redis_client: Redis) -> None:
+    stored = _topic("topic-legacy")
+    await redis_client.set("topic:topic-legacy", stored.model_dump_json(), ex=60)
+    await redis_client.set("topic:topic-legacy:version", 3)
+
+    assert await migrate_key_layout(redis_client) == 1
+    assert await migrate_blob_topics(redis_client, count_slots=count_vote_slots) == 1
+    assert await migrate_blob_topics(redis_client, count_slots=count_vote_slots) == 0
+
+    assert await _get_topic(stored.topic_id, redis_client) == stored
+    assert await redis_client.exists("topic:topic-legacy") == 0
+    assert 0 < await redis_client.ttl(topic_key("topic-legacy", "meta")) <= 60
+    assert await _get_snapshot(stored.topic_id, redis_client) == (stored, 3, None)
+
+
+@pytest.mark.asyncio
+async def test_migrated_topic_without_version_starts_at_one(
+    redis_client: Redis,
+) -> None:
+    stored = _topic("topic-unversioned")
+    await redis_client.set("topic:topic-unversioned", stored.model_dump_json(), ex=60)
+
+    assert await migrate_blob_topics(redis_client, count_slots=count_vote_slots) == 1
+
+    assert await get_topic_version(stored.topic_id, redis_client) == 1
+    stored_counts = await redis_client.hgetall(
+        topic_key(stored.topic_id, "slot_counts")
+    )
+    assert _decode_counts(stored_counts) == count_vote_slots(stored)
+    assert await redis_client.hexists(topic_key(stored.topic_id, "runs"), "bob")
+    for suffix in ("version", "runs", "slot_counts"):
+        assert 0 < await redis_client.ttl(topic_key(stored.topic_id, suffix)) <= 60
+
+
+@pytest.mark.asyncio
+async def test_migrate_key_layout_keeps_ttl(redis_client: Redis) -> None:
+    await redis_client.set("topic:topic-old:version", 5, ex=60)
+    await redis_client.hset("topic:topic-old:votes", "bob", "[]")
+    await save_topic(_topic("topic-new"), redis_client)
+
+    assert await migrate_key_layout(redis_client) == 2
+    assert await migrate_key_layout(redis_client) == 0
+
+    assert await redis_client.exists("topic:topic-old:version") == 0
+    assert await redis_client.get(topic_key("topic-old", "version")) == b"5"
+    assert 0 < await redis_client.ttl(topic_key("topic-old", "version")) <= 60
+    assert await redis_client.ttl(topic_key("topic-old", "votes")) == -1
+    assert await _get_topic("topic-new", redis_client) == _topic("topic-new")
+
+
+@pytest.mark.asyncio
+async def test_every_write_bumps_version_and_snapshot(redis_client: Redis) -> None:
+    stored = _topic("topic-version")
+    stats = build_topic_stats(stored)
+
+    assert await save_topic(stored, redis_client, stats=stats) == 1
+    assert await _get_snapshot(stored.topic_id, redis_client) == (
+        stored,
+        1,
+        stats,
+    )
+
+    await save_topic(stored, redis_client)
+    assert await _get_snapshot(stored.topic_id, redis_client) == (
+        stored,
+        2,
+        None,
+    )
+
+    assert not await save_stats(stored.topic_id, 1, stats, redis_client)
+    assert await save_stats(stored.topic_id, 2, stats, redis_client)
+    _, version, snapshot = await _get_snapshot(stored.topic_id, redis_client)
+    assert (version, snapshot) == (2, stats)
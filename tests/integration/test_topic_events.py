@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from redis.asyncio import Redis
+
+from app.core import config
+from app.service.topic_events import TopicEvents
+
+
+@pytest.mark.asyncio
+async def test_updates_fan_out_across_workers(redis_client: Redis) -> None:
+    publisher = TopicEvents(config.REDIS.URL, reconnect_seconds=0.1)
+    worker = TopicEvents(config.REDIS.URL, reconnect_seconds=0.1)
+
+    async with (
+        worker.listen("topic-live") as first,
+        worker.listen("topic-live") as second,
+    ):
+        channels = await redis_client.pubsub_numsub("events:topic-live")
+        await publisher.publish("topic-live", 3, b'{"a":1}')
+
+        assert await first.next(timeout=1) == (3, b'{"a":1}')
+        assert await second.next(timeout=1) == (3, b'{"a":1}')
+
+    assert channels == [(b"events:topic-live", 1)]
+    assert await redis_client.pubsub_numsub("events:topic-live") == [
+        (b"events:topic-live", 0)
+    ]
+    await publisher.aclose()
+    await worker.aclose()
+
+
+@pytest.mark.asyncio
+async def test_listener_joining_during_unsubscribe_stays_subscribed(
+    redis_client: Redis,
+) -> None:
+    publisher = TopicEvents(config.REDIS.URL, reconnect_seconds=0.1)
+    worker = TopicEvents(config.REDIS.URL, reconnect_seconds=0.1)
+    first = worker.listen("topic-rejoin")
+    await first.__aenter__()
+
+    leaving = asyncio.create_task(first.__aexit__(None, None, None))
+    await asyncio.sleep(0)
+    async with worker.listen("topic-rejoin") as listener:
+        await leaving
+        await publisher.publish("topic-rejoin", 2, b"{}")
+
+        assert await listener.next(timeout=1) == (2, b"{}")
+
+    await publisher.aclose()
+    await worker.aclose()
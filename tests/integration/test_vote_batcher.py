@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from redis.asyncio import Redis
+
+from app.core.exceptions import TopicNotFoundError
+from app.db.codec import decode_stats, decode_topic
+from app.db.redis import get_raw_topic_snapshot, save_topic
+from app.db.storage import RedisStorage
+from app.models import Topic
+from app.service.topic_events import TopicEvents
+from app.service.topic_stats import build_topic_stats
+from app.service.topics import render_topic
+from app.service.vote_batcher import VoteBatcher
+from tests.unit.util import make_interval
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_votes_share_batches(redis_client: Redis) -> None:
+    stored = Topic(
+        topic_id="topic-batched",
+        topic_name="Standup",
+        admin_name="Alice",
+        created_at=BASE,
+    )
+    await save_topic(stored, redis_client)
+    batcher = _batcher(redis_client, window_seconds=0.01)
+
+    commits = await asyncio.gather(
+        *(
+            batcher.submit(
+                stored.topic_id,
+                f"user{idx % 15}",
+                [make_interval(BASE, minutes=(15 * (idx % 4), 60))],
+            )
+            for idx in range(20)
+        )
+    )
+
+    data, version, snapshot = await get_raw_topic_snapshot(
+        stored.topic_id, redis_client
+    )
+    topic, stats = decode_topic(data), decode_stats(snapshot, version)
+    assert len(topic.votes) == 15
+    assert sorted(commit[2] for commit in commits) == list(range(2, 22))
+    assert version == 21
+    assert stats == build_topic_stats(topic)
+    assert batcher.batches == 3
+    assert batcher.counters()["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_failure_reaches_every_caller(redis_client: Redis) -> None:
+    batcher = _batcher(redis_client, window_seconds=0)
+
+    results = await asyncio.gather(
+        batcher.submit("missing-topic", "bob", []),
+        batcher.submit("missing-topic", "eve", []),
+        return_exceptions=True,
+    )
+
+    assert all(isinstance(result, TopicNotFoundError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_published_when_its_callers_are_gone(
+    redis_client: Redis,
+) -> None:
+    stored = Topic(
+        topic_id="topic-abandoned",
+        topic_name="Standup",
+        admin_name="Alice",
+        created_at=BASE,
+    )
+    await save_topic(stored, redis_client)
+    events = TopicEvents(url=None, reconnect_seconds=1)
+    batcher = _batcher(redis_client, window_seconds=0.01, events=events)
+
+    async with events.listen(stored.topic_id, since=1) as listener:
+        vote = asyncio.create_task(
+            batcher.submit(stored.topic_id, "bob", [make_interval(BASE, (0, 60))])
+        )
+        await asyncio.sleep(0)
+        vote.cancel()
+
+        version, body = await listener.next(timeout=1)
+
+    data, _, _ = await get_raw_topic_snapshot(stored.topic_id, redis_client)
+    topic = decode_topic(data)
+    assert version == 2
+    assert body == render_topic(topic, build_topic_stats(topic))
+
+
+def _batcher(
+    redis_client: Redis, window_seconds: float, events: TopicEvents | None = None
+) -> VoteBatcher:
+    if events is None:
+        events = TopicEvents(url=None, reconnect_seconds=1)
+    return VoteBatcher(
+        RedisStorage(redis_client),
+        events,
+        render_topic,
+        window_seconds=window_seconds,
+        max_batch=8,
+    )
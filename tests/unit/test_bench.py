@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+
+from app.bench import (
+    BenchCase,
+    BenchReport,
+    BenchResult,
+    compare_reports,
+    iter_cases,
+    run_case,
+    synthetic_topic,
+)
+from app.bench.runner import _serialize_response_model
+from app.models import TopicResponse
+from app.service.topic_stats import build_topic_stats
+from app.service.topics import TOPIC_RESPONSE_ADAPTER
+
+CASE = BenchCase(voters=20, horizon_days=2, intervals_per_vote=2, constrained=True)
+
+
+def _report(**timings: float) -> BenchReport:
+    result = BenchResult(case=CASE, slots=1, timings=timings, peak_memory_bytes=0)
+    return BenchReport(backend="python", repeat=1, results=[result])
+
+
+def test_synthetic_topic_is_reproducible() -> None:
+    first = synthetic_topic(20, 2, 2, constrained=True, seed=7)
+    second = synthetic_topic(20, 2, 2, constrained=True, seed=7)
+
+    assert first == second
+    assert len(first.votes) == 20
+    assert len(first.constraints) == 2
+    assert all(len(intervals) == 2 for intervals in first.votes.values())
+
+
+def test_iter_cases_covers_matrix() -> None:
+    cases = list(
+        iter_cases(
+            {
+                "voters": [1, 2],
+                "horizon_days": [1],
+                "intervals_per_vote": [1, 3],
+                "constrained": [False],
+            }
+        )
+    )
+
+    assert len(cases) == 4
+    assert len({case.name for case in cases}) == 4
+
+
+def test_run_case_times_every_stage() -> None:
+    topic = synthetic_topic(20, 2, 2, constrained=True)
+
+    result = run_case(topic, CASE, repeat=1)
+
+    assert set(result.timings) == {
+        "build_topic_stats",
+        "compact",
+        "_count_buckets",
+        "_classify_slots_by_ratio",
+        "_build_blocks",
+        "response_model",
+        "response_once",
+    }
+    assert result.slots > 0
+    assert result.peak_memory_bytes > 0
+
+
+def test_compare_flags_only_slowdowns_beyond_threshold() -> None:
+    baseline = _report(fast=1.0, slow=1.0, gone=1.0)
+    current = _report(fast=0.5, slow=1.5, new=9.0)
+
+    regressions = compare_reports(baseline, current, threshold=0.2)
+
+    assert [(r.stage, r.ratio) for r in regressions] == [("slow", 1.5)]
+
+
+def test_serialization_stages_agree() -> None:
+    topic = synthetic_topic(20, 2, 2, constrained=True)
+    response = TopicResponse(topic=topic, stats=build_topic_stats(topic))
+
+    once = TOPIC_RESPONSE_ADAPTER.dump_json(response)
+
+    assert json.loads(_serialize_response_model(response)) == json.loads(once)
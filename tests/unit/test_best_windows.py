@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+from itertools import pairwise
+
+import pytest
+
+from app.core.exceptions import DurationNotAlignedError
+from app.service.best_windows import (
+    BestWindowsCache,
+    _sliding_extremes,
+    _top_windows,
+    find_best_windows,
+    find_windows_from_counts,
+)
+from app.service.topic_stats import count_vote_slots
+from tests.unit.util import make_interval, random_intervals, simplify, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+def _naive_extremes(counts: dict[int, int], width: int) -> list[tuple[int, int, int]]:
+    windows = []
+    for start in sorted(counts):
+        slots = range(start, start + width)
+        if all(slot in counts for slot in slots):
+            values = [counts[slot] for slot in slots]
+            windows.append((start, min(values), max(values)))
+    return windows
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("width", [1, 2, 5])
+def test_sliding_extremes_match_reference(seed: int, width: int) -> None:
+    rng = random.Random(seed)
+    counts = {slot: rng.randint(0, 9) for slot in range(60) if rng.random() < 0.85}
+
+    assert list(_sliding_extremes(counts, width)) == _naive_extremes(counts, width)
+
+
+def test_top_windows_do_not_overlap_and_rank_by_attendance() -> None:
+    counts = {0: 1, 1: 3, 2: 3, 3: 2, 4: 3, 5: 3, 6: 1}
+
+    windows = _top_windows(counts, 2, 5)
+
+    assert windows[:2] == [(1, 3, 3, 3), (4, 6, 3, 3)]
+    starts = sorted(start for start, *_ in windows)
+    assert all(b - a >= 2 for a, b in pairwise(starts))
+
+
+def test_best_windows_stay_inside_constraints() -> None:
+    sample = topic(
+        [make_interval(BASE, hours=(0, 1))],
+        {
+            "alice": [make_interval(BASE, hours=(0, 3))],
+            "bob": [make_interval(BASE, minutes=(30, 180))],
+        },
+    )
+
+    windows = find_best_windows(sample, 30, 3)
+
+    assert simplify(windows) == [
+        (BASE.replace(minute=30), BASE.replace(hour=10)),
+        (BASE, BASE.replace(minute=30)),
+    ]
+    assert [w.people_min for w in windows] == [2, 1]
+
+
+def test_duration_splitting_a_slot_is_rejected() -> None:
+    sample = topic([], {"alice": [make_interval(BASE, hours=(0, 1))]})
+
+    with pytest.raises(DurationNotAlignedError):
+        find_best_windows(sample, 20, 1)
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("constrained", [False, True])
+def test_windows_from_counts_match_votes(seed: int, constrained: bool) -> None:
+    rng = random.Random(seed)
+    votes = {f"user{idx}": random_intervals(rng, BASE, 3) for idx in range(8)}
+    sample = topic(random_intervals(rng, BASE, 2) if constrained else [], votes)
+
+    windows = find_windows_from_counts(sample, count_vote_slots(sample), 60, 5)
+
+    assert windows == find_best_windows(sample, 60, 5)
+
+
+def test_windows_cache_keeps_latest_version_only() -> None:
+    cache = BestWindowsCache(max_entries=1)
+    windows = find_best_windows(
+        topic([], {"alice": [make_interval(BASE, hours=(0, 1))]}), 30, 1
+    )
+
+    cache.put("a", 1, 30, 1, windows)
+    cache.put("a", 1, 60, 1, [])
+    assert cache.get("a", 1, 30, 1) is windows
+    assert cache.get("a", 1, 30, 2) is None
+    assert cache.get("a", 2, 30, 1) is None
+
+    cache.put("a", 2, 60, 1, [])
+    assert cache.get("a", 2, 30, 1) is None
+    cache.put("b", 1, 30, 1, windows)
+    assert cache.get("a", 2, 60, 1) is None
+    assert len(cache) == 1
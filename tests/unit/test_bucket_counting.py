@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import CompactTopic, Interval, SlotCounts, SlotGrid
+from app.service.topic_stats import (
+    _ceil_to_slot,
+    _count_buckets,
+    _count_buckets_naive,
+    build_stats_from_counts,
+    build_topic_stats,
+    count_vote_slots,
+    runs_delta,
+)
+from tests.unit.util import make_interval, random_intervals, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+def _count(
+    constraints: list[Interval], votes: list[list[Interval]], slot_minutes: int = 15
+) -> dict[datetime, int]:
+    compact = CompactTopic.from_topic(
+        topic(
+            constraints,
+            {f"user{idx}": vote for idx, vote in enumerate(votes)},
+            slot_minutes,
+        )
+    )
+    runs = compact.constraints if compact.constrained else None
+    counts = _count_buckets(runs, compact.votes.values())
+    return {compact.grid.to_datetime(slot): count for slot, count in counts.items()}
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("with_constraints", [True, False])
+@pytest.mark.parametrize("slot_minutes", [5, 15, 60])
+def test_sweep_matches_reference(
+    seed: int, with_constraints: bool, slot_minutes: int
+) -> None:
+    rng = random.Random(seed)
+    constraints = (
+        random_intervals(rng, BASE, rng.randint(1, 4)) if with_constraints else []
+    )
+    votes = [random_intervals(rng, BASE, rng.randint(0, 5)) for _ in range(30)]
+
+    assert _count(constraints, votes, slot_minutes) == _count_buckets_naive(
+        constraints, votes, slot_minutes
+    )
+
+
+@pytest.mark.parametrize(
+    ("moment", "slot_minutes", "expected"),
+    [
+        (datetime(2025, 1, 1, 9, 0), 15, datetime(2025, 1, 1, 9, 0)),
+        (datetime(2025, 1, 1, 9, 0, 1), 15, datetime(2025, 1, 1, 9, 15)),
+        (datetime(2025, 1, 1, 9, 7), 5, datetime(2025, 1, 1, 9, 10)),
+        (datetime(2025, 1, 1, 9, 31), 30, datetime(2025, 1, 1, 10, 0)),
+        (datetime(2025, 1, 1, 23, 1), 60, datetime(2025, 1, 2, 0, 0)),
+    ],
+)
+def test_ceil_to_slot_on_epoch_boundaries(
+    moment: datetime, slot_minutes: int, expected: datetime
+) -> None:
+    assert _ceil_to_slot(moment, timedelta(minutes=slot_minutes)) == expected
+
+
+def test_overlapping_intervals_of_one_voter_count_once() -> None:
+    votes = [[make_interval(BASE, (0, 60)), make_interval(BASE, (30, 90))]]
+
+    counts = _count([], votes)
+
+    assert set(counts.values()) == {1}
+    assert len(counts) == 6
+
+
+def test_uncovered_allowed_buckets_are_kept() -> None:
+    constraints = [make_interval(BASE, (0, 60))]
+    votes = [[make_interval(BASE, (15, 30))]]
+
+    counts = _count(constraints, votes)
+
+    assert list(counts.values()) == [0, 1, 0, 0]
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("with_constraints", [True, False])
+def test_incremental_counts_match_full_rebuild(
+    seed: int, with_constraints: bool
+) -> None:
+    rng = random.Random(seed)
+    constraints = (
+        random_intervals(rng, BASE, rng.randint(1, 4)) if with_constraints else []
+    )
+    sample = topic(constraints, {})
+    slot_counts: SlotCounts = {}
+
+    for _ in range(40):
+        username = f"user{rng.randrange(10)}"
+        vote = random_intervals(rng, BASE, rng.randint(0, 4))
+        grid = SlotGrid.for_topic(sample)
+        previous = grid.to_runs(sample.votes.get(username, []))
+        delta = runs_delta(previous, grid.to_runs(vote))
+        sample.votes[username] = vote
+        for slot, change in delta.items():
+            slot_counts[slot] = slot_counts.get(slot, 0) + change
+
+        assert {slot: c for slot, c in slot_counts.items() if c} == count_vote_slots(
+            sample
+        )
+        assert build_stats_from_counts(sample, slot_counts) == build_topic_stats(sample)
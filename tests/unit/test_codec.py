@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import random
+from datetime import UTC, datetime, timedelta, timezone
+
+from app.db.codec import (
+    VOTE_ADAPTER,
+    decode_topic,
+    decode_vote,
+    encode_meta,
+    encode_vote,
+    pack_topic,
+)
+from tests.unit.util import make_interval, random_intervals, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+MOSCOW = timezone(timedelta(hours=3))
+
+
+def test_naive_vote_roundtrip() -> None:
+    vote = random_intervals(random.Random(7), BASE, 20)
+
+    assert decode_vote(encode_vote(vote)) == vote
+
+
+def test_aware_vote_keeps_offset_and_serialization() -> None:
+    vote = [make_interval(BASE.replace(tzinfo=MOSCOW), minutes=(15, 45))]
+    vote[0].end = vote[0].end.replace(microsecond=123)
+
+    decoded = decode_vote(encode_vote(vote))
+
+    assert decoded == vote
+    assert decoded[0].start.utcoffset() == timedelta(hours=3)
+    assert VOTE_ADAPTER.dump_json(decoded) == VOTE_ADAPTER.dump_json(vote)
+
+
+def test_mixed_offsets_fall_back_to_json() -> None:
+    vote = [
+        make_interval(BASE.replace(tzinfo=MOSCOW), hours=(0, 1)),
+        make_interval(BASE.replace(tzinfo=UTC), hours=(0, 1)),
+    ]
+
+    data = encode_vote(vote)
+
+    assert data.startswith(b"[")
+    assert decode_vote(data) == vote
+
+
+def test_empty_vote_roundtrip() -> None:
+    assert decode_vote(encode_vote([])) == []
+
+
+def test_legacy_json_vote_is_decoded() -> None:
+    vote = [make_interval(BASE, minutes=(0, 30))]
+
+    assert decode_vote(VOTE_ADAPTER.dump_json(vote)) == vote
+
+
+def test_binary_vote_is_smaller_than_json() -> None:
+    vote = random_intervals(random.Random(3), BASE.replace(tzinfo=MOSCOW), 50)
+
+    assert len(encode_vote(vote)) * 2 < len(VOTE_ADAPTER.dump_json(vote))
+
+
+def test_packed_topic_roundtrip_is_order_independent() -> None:
+    rng = random.Random(11)
+    votes = {f"user{idx}": random_intervals(rng, BASE, 3) for idx in range(5)}
+    stored = topic([make_interval(BASE, hours=(0, 8))], votes)
+    raw = {user.encode(): encode_vote(vote) for user, vote in votes.items()}
+    meta = encode_meta(stored).encode()
+
+    packed = pack_topic(meta, raw)
+
+    assert decode_topic(packed) == stored
+    assert pack_topic(meta, dict(reversed(raw.items()))) == packed
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import os
+
+import pytest
+
+from app.db.compression import MARKER, Compressor
+
+PAYLOAD = b"[" + b'{"start":"2025-01-01T09:00:00"},' * 200 + b"]"
+
+
+@pytest.mark.parametrize("algorithm", ["zlib", "lzma"])
+def test_roundtrip_shrinks_large_values(algorithm: str) -> None:
+    compressor = Compressor(algorithm, level=6, min_bytes=64)
+
+    packed = compressor.compress(PAYLOAD)
+
+    assert packed.startswith(MARKER)
+    assert len(packed) < len(PAYLOAD)
+    assert compressor.decompress(packed) == PAYLOAD
+    assert compressor.counters()["ratio"] > 1
+
+
+def test_small_and_incompressible_values_are_kept() -> None:
+    compressor = Compressor("zlib", level=6, min_bytes=64)
+    noise = os.urandom(256)
+
+    assert compressor.compress(b"[]") == b"[]"
+    assert compressor.compress(noise) == noise
+    assert compressor.counters()["compressed"] == 0
+
+
+def test_values_stay_readable_when_compression_is_off() -> None:
+    packed = Compressor("zlib", level=6, min_bytes=0).compress(PAYLOAD)
+    compressor = Compressor("none", level=6, min_bytes=0)
+
+    assert compressor.compress(PAYLOAD) == PAYLOAD
+    assert compressor.decompress(packed) == PAYLOAD
+    assert compressor.decompress(PAYLOAD) == PAYLOAD
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.core.exceptions import ForbiddenActionError, TopicNotFoundError
+from app.db.codec import decode_stats, decode_topic
+from app.db.memory import MemoryStorage
+from app.service.topic_stats import (
+    build_stats_from_counts,
+    build_topic_stats,
+    count_vote_slots,
+)
+from tests.unit.util import make_interval, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+def _stored():
+    return topic(
+        [make_interval(BASE, hours=(0, 2))],
+        {"bob": [make_interval(BASE, minutes=(0, 30))]},
+    )
+
+
+def _set_votes(storage: MemoryStorage, votes: list):
+    return storage.set_votes(
+        "tid",
+        votes,
+        count_slots=count_vote_slots,
+        summarize=build_stats_from_counts,
+    )
+
+
+@pytest.mark.asyncio
+async def test_roundtrip_with_versioned_stats() -> None:
+    storage = MemoryStorage(ttl_seconds=60)
+    stored = _stored()
+    stats = build_topic_stats(stored)
+
+    assert await storage.save_topic(stored, stats=stats) == 1
+    data, version, snapshot = await storage.get_raw_topic_snapshot("tid")
+
+    assert decode_topic(data) == stored
+    assert decode_stats(snapshot, version) == stats
+    assert not await storage.save_stats("tid", 0, stats)
+
+
+@pytest.mark.asyncio
+async def test_votes_return_replaced_runs_and_bump_versions() -> None:
+    storage = MemoryStorage(ttl_seconds=60)
+    await storage.save_topic(_stored())
+    vote = [make_interval(BASE, minutes=(15, 45))]
+
+    topic_, stats, version, previous = await _set_votes(
+        storage, [("bob", vote), ("eve", vote), ("bob", [])]
+    )
+
+    assert version == 4
+    assert topic_.votes == {"bob": [], "eve": vote}
+    assert stats == build_topic_stats(topic_)
+    assert [list(runs) for runs in previous] == [[4, 6], [], [5, 7]]
+    _, _, snapshot = await storage.get_raw_topic_snapshot("tid")
+    assert decode_stats(snapshot, version) == stats
+
+
+@pytest.mark.asyncio
+async def test_constraints_update_and_delete() -> None:
+    storage = MemoryStorage(ttl_seconds=60)
+    await storage.save_topic(_stored())
+
+    with pytest.raises(ForbiddenActionError):
+        await storage.set_constraints("tid", "bob", [])
+    topic_, version = await storage.set_constraints("tid", "Admin", [])
+
+    assert version == 2
+    assert await storage.get_topic_version("tid") == 2
+    data, _, _ = await storage.get_raw_topic_snapshot("tid")
+    assert decode_topic(data) == topic_
+    assert topic_.constraints == []
+
+    await storage.delete_topic("tid")
+    with pytest.raises(TopicNotFoundError):
+        await storage.get_raw_topic_snapshot("tid")
+
+
+@pytest.mark.asyncio
+async def test_topics_expire_unless_ttl_is_refreshed() -> None:
+    storage = MemoryStorage(ttl_seconds=60)
+    with patch("app.db.memory.monotonic", return_value=0):
+        await storage.save_topic(_stored())
+    with patch("app.db.memory.monotonic", return_value=50):
+        await storage.save_topic(_stored())
+    with patch("app.db.memory.monotonic", return_value=61):
+        assert await storage.get_topic_version("tid") == 0
+        await storage.save_topic(_stored(), refresh_ttl=True)
+    with patch("app.db.memory.monotonic", return_value=120):
+        assert await storage.get_topic_version("tid") == 1
+    assert len(storage) == 1
+
+
+@pytest.mark.asyncio
+async def test_body_is_only_served_for_its_version() -> None:
+    storage = MemoryStorage(ttl_seconds=60)
+    version = await storage.save_topic(_stored())
+
+    assert await storage.get_body("tid") == (version, None)
+    assert not await storage.save_body("tid", version + 1, b"{}")
+    assert await storage.save_body("tid", version, b"{}")
+    assert await storage.get_body("tid") == (version, b"{}")
+
+    await storage.set_constraints("tid", "Admin", [])
+    assert await storage.get_body("tid") == (version + 1, None)
+    assert await storage.get_body("missing") == (0, None)
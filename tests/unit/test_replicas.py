@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from operator import itemgetter
+
+import pytest
+from redis.asyncio import Redis
+from redis.exceptions import ConnectionError
+
+from app.core.exceptions import TopicNotFoundError
+from app.db.codec import RawSnapshot
+from app.db.replicas import ReplicaPool
+
+VERSION = itemgetter(1)
+
+
+def _pool(size: int = 2) -> ReplicaPool:
+    return ReplicaPool(
+        [Redis.from_url(f"redis://replica-{idx}") for idx in range(size)],
+        check_interval_seconds=1,
+    )
+
+
+def _loader(version: int, calls: list[Redis], error: Exception | None = None):
+    async def load(replica: Redis) -> RawSnapshot:
+        calls.append(replica)
+        if error is not None:
+            raise error
+        return b"topic", version, None
+
+    return load
+
+
+@pytest.mark.asyncio
+async def test_reads_rotate_over_replicas() -> None:
+    pool = _pool()
+    calls: list[Redis] = []
+
+    for _ in range(4):
+        assert await pool.read(_loader(3, calls), 3, version_of=VERSION) == (
+            b"topic",
+            3,
+            None,
+        )
+
+    assert calls == pool.replicas * 2
+    assert pool.counters()["reads"] == 4
+
+
+@pytest.mark.asyncio
+async def test_lagging_replica_is_a_miss() -> None:
+    pool = _pool()
+    calls: list[Redis] = []
+
+    assert await pool.read(_loader(2, calls), 3, version_of=VERSION) is None
+    assert (
+        await pool.read(_loader(0, calls, TopicNotFoundError()), 0, version_of=VERSION)
+        is None
+    )
+
+    assert pool.lagging == 2
+    assert pool.counters()["healthy"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_replica_is_skipped_until_checked() -> None:
+    pool = _pool()
+    calls: list[Redis] = []
+
+    assert (
+        await pool.read(_loader(1, calls, ConnectionError()), 0, version_of=VERSION)
+        is None
+    )
+    await pool.read(_loader(1, calls), 0, version_of=VERSION)
+    await pool.read(_loader(1, calls), 0, version_of=VERSION)
+
+    assert calls == [pool.replicas[0], pool.replicas[1], pool.replicas[1]]
+    assert (pool.failures, pool.counters()["healthy"]) == (1, 1)
+
+
+def test_no_replica_without_healthy_ones() -> None:
+    pool = _pool(size=1)
+    pool._healthy[0] = False
+
+    assert pool.pick() is None
+    assert _pool(size=0).pick() is None
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+from pydantic import TypeAdapter
+
+from app.api.responses import ModelResponse
+from app.models import SlotVoters
+
+
+def test_models_and_lists_are_serialized_once() -> None:
+    voters = SlotVoters(
+        start=datetime(2025, 1, 1, 9), end=datetime(2025, 1, 1, 10), voters=["bob"]
+    )
+
+    single = ModelResponse(voters, 201)
+    many = ModelResponse([voters], adapter=TypeAdapter(list[SlotVoters]))
+
+    assert single.status_code == 201
+    assert single.body == voters.model_dump_json().encode()
+    assert many.body == b"[" + single.body + b"]"
+    assert single.headers["content-type"] == "application/json"
+
+
+def test_prepared_bytes_are_sent_as_is() -> None:
+    assert ModelResponse(b'{"a":1}').body == b'{"a":1}'
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+
+import pytest
+from pydantic import ValidationError
+
+from app.core import config
+from app.core.grid import LEGACY_SLOT_MINUTES, GridSettings
+from app.models import CompactTopic, SlotGrid, Topic
+from tests.unit.util import make_interval, topic
+
+MSK = timezone(timedelta(hours=3))
+
+
+def test_runs_cover_only_whole_slots_and_merge() -> None:
+    base = datetime(2025, 1, 1, 10, 5)
+    grid = SlotGrid.for_topic(topic([], {}))
+    runs = grid.to_runs(
+        [
+            make_interval(base, (0, 45)),
+            make_interval(base, (40, 70)),
+            make_interval(base, (120, 125)),
+        ]
+    )
+
+    assert grid.to_intervals(runs) == [
+        make_interval(datetime(2025, 1, 1, 10, 15), (0, 60))
+    ]
+
+
+def test_aware_slots_round_trip_in_reference_offset() -> None:
+    start = datetime(2025, 1, 1, 9, 0, tzinfo=MSK)
+    sample = topic([make_interval(start, (0, 30))], {})
+    sample.created_at = datetime(2025, 1, 1, 6, 0, tzinfo=UTC)
+    compact = CompactTopic.from_topic(sample)
+
+    assert list(compact.constraints) == [0, 2]
+    assert compact.grid.to_datetime(1) == start + timedelta(minutes=15)
+    assert compact.grid.to_datetime(1).utcoffset() == timedelta(hours=3)
+
+
+def test_ceil_and_floor_around_boundaries() -> None:
+    grid = SlotGrid.for_topic(topic([], {}))
+    on_boundary = datetime(2025, 1, 1, 8, 15)
+    inside = on_boundary + timedelta(microseconds=1)
+
+    assert grid.ceil(on_boundary) == grid.floor(on_boundary) == 1
+    assert (grid.ceil(inside), grid.floor(inside)) == (2, 1)
+
+
+def test_grid_settings_cast_slot_minutes_before_checking() -> None:
+    settings = GridSettings.model_validate(
+        {"SLOT_MINUTES_SIZE": "30", "TOPIC_ID_LENGTH": "8"}
+    )
+    assert settings.SLOT_MINUTES_SIZE == 30
+
+    with pytest.raises(ValidationError):
+        GridSettings.model_validate({"SLOT_MINUTES_SIZE": 20, "TOPIC_ID_LENGTH": 8})
+
+
+def test_legacy_topics_keep_their_slot_size(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(config.GRID, "SLOT_MINUTES_SIZE", 30)
+    legacy = topic([], {}).model_dump(exclude={"slot_minutes"})
+
+    assert Topic.model_validate(legacy).slot_minutes == LEGACY_SLOT_MINUTES
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from app.models import TopicStats
+from app.service.stats_cache import StatsCache
+from tests.unit.util import topic
+
+SAMPLE = topic([], {})
+STATS = TopicStats()
+
+
+def test_hit_after_put_and_miss_for_other_content() -> None:
+    cache = StatsCache(max_entries=4, max_bytes=1024, ttl_seconds=60)
+    key = cache.fingerprint(b"payload")
+
+    assert cache.get(key) is None
+    cache.put(key, 7, SAMPLE, STATS)
+
+    assert cache.get(key) == (SAMPLE, STATS)
+    assert cache.get(cache.fingerprint(b"payload!")) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_least_recently_used_entry_is_evicted_by_count() -> None:
+    cache = StatsCache(max_entries=2, max_bytes=1024, ttl_seconds=60)
+    cache.put(b"a", 1, SAMPLE, STATS)
+    cache.put(b"b", 1, SAMPLE, STATS)
+    cache.get(b"a")
+
+    cache.put(b"c", 1, SAMPLE, STATS)
+
+    assert cache.get(b"b") is None
+    assert cache.get(b"a") is not None
+    assert cache.evictions == 1
+
+
+def test_byte_budget_is_respected() -> None:
+    cache = StatsCache(max_entries=10, max_bytes=100, ttl_seconds=60)
+    cache.put(b"a", 60, SAMPLE, STATS)
+    cache.put(b"b", 60, SAMPLE, STATS)
+    cache.put(b"huge", 101, SAMPLE, STATS)
+
+    assert len(cache) == 1
+    assert cache.size == 60
+    assert cache.get(b"huge") is None
+
+
+def test_entries_expire_after_ttl() -> None:
+    cache = StatsCache(max_entries=10, max_bytes=100, ttl_seconds=5)
+    with patch("app.service.stats_cache.monotonic", return_value=0):
+        cache.put(b"a", 1, SAMPLE, STATS)
+    with patch("app.service.stats_cache.monotonic", return_value=6):
+        assert cache.get(b"a") is None
+    assert len(cache) == 0
+
+
+def test_zero_entries_disables_cache() -> None:
+    cache = StatsCache(max_entries=0, max_bytes=100, ttl_seconds=5)
+    cache.put(b"a", 1, SAMPLE, STATS)
+
+    assert cache.get(b"a") is None
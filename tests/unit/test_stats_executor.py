@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+
+from app.core.exceptions import StatsOverloadedError, StatsTimeoutError
+from app.models import CompactTopic
+from app.service.best_windows import find_best_windows
+from app.service.stats_executor import StatsExecutor
+from app.service.topic_stats import build_topic_stats
+from tests.unit.util import random_intervals, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+def _sample(voters: int = 40):
+    rng = random.Random(3)
+    votes = {f"user{idx}": random_intervals(rng, BASE, 3) for idx in range(voters)}
+    return topic(random_intervals(rng, BASE, 2), votes)
+
+
+def _executor(**overrides) -> StatsExecutor:
+    params = {
+        "workers": 1,
+        "inline_budget": 0,
+        "timeout_seconds": 30,
+        "max_pending": 2,
+    } | overrides
+    return StatsExecutor(**params)
+
+
+def test_cost_is_voters_times_span() -> None:
+    compact = CompactTopic.from_topic(_sample())
+
+    assert StatsExecutor.cost(compact) == len(compact.votes) * compact.span
+    assert compact.span > 0
+
+
+@pytest.mark.asyncio
+async def test_small_topics_are_built_inline() -> None:
+    executor = _executor(inline_budget=10**9)
+    sample = _sample()
+
+    assert await executor.build(sample) == build_topic_stats(sample)
+    assert (executor.inline, executor.offloaded) == (1, 0)
+
+
+@pytest.mark.asyncio
+async def test_large_topics_are_offloaded_to_pool() -> None:
+    executor = _executor()
+    sample = _sample()
+    try:
+        stats = await executor.build(sample)
+    finally:
+        executor.shutdown()
+
+    assert stats == build_topic_stats(sample)
+    assert (executor.inline, executor.offloaded) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_best_windows_are_offloaded_like_stats() -> None:
+    executor = _executor()
+    sample = _sample()
+    try:
+        windows = await executor.best_windows(sample, 60, 3)
+    finally:
+        executor.shutdown()
+
+    assert windows == find_best_windows(sample, 60, 3)
+    assert (executor.inline, executor.offloaded) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_limit_rejects_offloads() -> None:
+    executor = _executor(max_pending=0)
+
+    with pytest.raises(StatsOverloadedError):
+        await executor.build(_sample())
+    assert executor.counters()["rejected"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_offload_times_out() -> None:
+    executor = _executor(timeout_seconds=1e-6)
+    try:
+        with pytest.raises(StatsTimeoutError):
+            await executor.build(_sample(voters=400))
+    finally:
+        executor.shutdown()
+    assert executor.timeouts == 1
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from redis.crc import key_slot
+
+from app.db.redis import topic_key
+from app.db.tracking import RawSnapshot, TopicCache
+
+
+def _cache(max_entries: int = 4, max_bytes: int = 1024) -> TopicCache:
+    cache = TopicCache(
+        enabled=True,
+        max_entries=max_entries,
+        max_bytes=max_bytes,
+        reconnect_seconds=1,
+    )
+    cache._connected = True
+    return cache
+
+
+def _loader(snapshot: RawSnapshot, calls: list[str]):
+    async def load() -> RawSnapshot:
+        calls.append("load")
+        return snapshot
+
+    return load
+
+
+@pytest.mark.asyncio
+async def test_hit_until_key_is_invalidated() -> None:
+    cache = _cache()
+    calls: list[str] = []
+    load = _loader((b"topic", 1, None), calls)
+
+    assert await cache.get("t1", load) == (b"topic", 1, None)
+    assert await cache.get("t1", load) == (b"topic", 1, None)
+    cache.invalidate_keys([b"topic:{t1}:votes"])
+    await cache.get("t1", load)
+
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses, cache.invalidations) == (1, 2, 1)
+
+
+@pytest.mark.asyncio
+async def test_entry_older_than_min_version_is_reloaded() -> None:
+    cache = _cache()
+    calls: list[str] = []
+    await cache.get("t1", _loader((b"old", 1, None), calls))
+
+    fresh = await cache.get("t1", _loader((b"new", 2, None), calls), min_version=2)
+
+    assert fresh == (b"new", 2, None)
+    assert await cache.get("t1", _loader((b"x", 3, None), calls), 2) == fresh
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_result_loaded_during_invalidation_is_not_cached() -> None:
+    cache = _cache()
+    started, release = asyncio.Event(), asyncio.Event()
+
+    async def slow_load() -> RawSnapshot:
+        started.set()
+        await release.wait()
+        return b"stale", 1, None
+
+    pending = asyncio.create_task(cache.get("t1", slow_load))
+    await started.wait()
+    cache.invalidate("t1")
+    release.set()
+
+    assert await pending == (b"stale", 1, None)
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_disconnected_cache_reads_through() -> None:
+    cache = _cache()
+    cache._connected = False
+    calls: list[str] = []
+
+    for _ in range(2):
+        await cache.get("t1", _loader((b"topic", 1, None), calls))
+
+    assert len(calls) == 2
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_bounds_evict_least_recently_used() -> None:
+    cache = _cache(max_entries=2, max_bytes=10)
+    calls: list[str] = []
+
+    await cache.get("a", _loader((b"aaaa", 1, None), calls))
+    await cache.get("b", _loader((b"bbbb", 1, None), calls))
+    await cache.get("a", _loader((b"aaaa", 1, None), calls))
+    await cache.get("c", _loader((b"cc", 1, b"cc"), calls))
+    await cache.get("huge", _loader((b"x" * 11, 1, None), calls))
+
+    assert len(cache) == 2
+    assert cache.counters()["bytes"] == 8
+    assert cache.evictions == 1
+    await cache.get("b", _loader((b"bbbb", 1, None), calls))
+    assert len(calls) == 5
+
+
+@pytest.mark.asyncio
+async def test_flush_message_clears_cache() -> None:
+    cache = _cache()
+    await cache.get("t1", _loader((b"topic", 1, None), []))
+
+    cache.invalidate_keys(None)
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_untagged_legacy_keys_are_skipped() -> None:
+    cache = _cache()
+    await cache.get("t1", _loader((b"topic", 1, None), []))
+
+    cache.invalidate_keys([b"topic:t1", b"topic:t1:votes", b"topic:{t1"])
+
+    assert len(cache) == 1
+    cache.invalidate_keys([b"topic:t1:votes", b"topic:{t1}:votes"])
+    assert len(cache) == 0
+
+
+def test_topic_keys_share_a_cluster_slot() -> None:
+    suffixes = ["meta", "votes", "runs", "slot_counts", "version", "stats"]
+    slots = {key_slot(topic_key("t1", suffix).encode()) for suffix in suffixes}
+
+    assert len(slots) == 1
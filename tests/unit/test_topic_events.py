@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.service.topic_events import TopicEvents, TopicListener
+
+
+@pytest.mark.asyncio
+async def test_slow_listener_keeps_only_newest_update() -> None:
+    listener = TopicListener("t1", version=1)
+
+    listener.offer(1, b"seen")
+    listener.offer(3, b"third")
+    listener.offer(2, b"second")
+    listener.offer(4, b"fourth")
+
+    assert await listener.next(timeout=1) == (4, b"fourth")
+    assert await listener.next(timeout=0.01) is None
+    assert (listener.version, listener.skipped) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_closed_listener_wakes_up() -> None:
+    listener = TopicListener("t1")
+    waiting = asyncio.create_task(listener.next(timeout=10))
+
+    await asyncio.sleep(0)
+    listener.close()
+
+    assert await waiting is None
+    assert listener.closed
+
+
+@pytest.mark.asyncio
+async def test_in_process_updates_reach_topic_listeners() -> None:
+    events = TopicEvents(url=None, reconnect_seconds=1)
+
+    async with events.listen("t1") as first, events.listen("t1") as second:
+        async with events.listen("t2") as other:
+            await events.publish("t1", 2, b"body")
+            assert len(events) == 3
+
+        assert await first.next(timeout=1) == (2, b"body")
+        assert await second.next(timeout=1) == (2, b"body")
+        assert await other.next(timeout=0.01) is None
+
+    assert events.counters() == {
+        "published": 1,
+        "delivered": 2,
+        "disconnects": 0,
+        "topics": 0,
+        "listeners": 0,
+    }
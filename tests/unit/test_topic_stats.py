@@ -3,11 +3,22 @@ from __future__ import annotations
 from datetime import datetime
 from functools import partial
 
+import pytest
+
+from app.core import config
 from app.models import Interval
 from app.service import build_topic_stats
 from tests.unit.util import make_interval, make_simple_tuple, simplify, topic
 
 
+@pytest.fixture(autouse=True, params=["python", "numpy", "bitset"])
+def stats_backend(
+    request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch
+) -> str:
+    monkeypatch.setattr(config.STATS, "BACKEND", request.param)
+    return request.param
+
+
 def test_returns_empty_stats_without_constraints() -> None:
     stats = build_topic_stats(topic([], {}))
     assert stats.blocks_90 == []
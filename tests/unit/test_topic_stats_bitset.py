@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+from functools import partial
+
+import pytest
+
+from app.models import CompactTopic
+from app.service.topic_stats import _build_topic_stats_python
+from app.service.topic_stats_bitset import AvailabilityBitsets, build_topic_stats
+from tests.unit.util import make_interval, random_intervals, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("with_constraints", [True, False])
+def test_bitset_backend_matches_python(seed: int, with_constraints: bool) -> None:
+    rng = random.Random(seed)
+    constraints = (
+        random_intervals(rng, BASE, rng.randint(1, 4), span_minutes=3 * 24 * 60)
+        if with_constraints
+        else []
+    )
+    votes = {
+        f"user{idx}": random_intervals(
+            rng, BASE, rng.randint(0, 5), span_minutes=3 * 24 * 60
+        )
+        for idx in range(40)
+    }
+    sample = CompactTopic.from_topic(topic(constraints, votes))
+
+    assert build_topic_stats(sample) == _build_topic_stats_python(sample)
+
+
+def test_all_free_intersects_voters_within_constraints() -> None:
+    get_interval = partial(make_interval, BASE)
+    compact = CompactTopic.from_topic(
+        topic(
+            [get_interval((0, 120))],
+            {
+                "a": [get_interval((0, 90))],
+                "b": [get_interval((30, 150))],
+                "c": [get_interval((60, 75))],
+            },
+        )
+    )
+    bitsets = AvailabilityBitsets.from_compact(compact)
+    assert bitsets is not None
+
+    both = bitsets.to_runs(bitsets.all_free(["a", "b"]))
+    everyone = bitsets.to_runs(bitsets.all_free(["a", "b", "c"]))
+
+    assert compact.grid.to_intervals(both) == [get_interval((30, 90))]
+    assert compact.grid.to_intervals(everyone) == [get_interval((60, 75))]
+    assert bitsets.to_runs(bitsets.at_least(2)) == both
+
+
+@pytest.mark.parametrize("voters", [3, 300])
+def test_counts_match_voters_per_slot(voters: int) -> None:
+    rng = random.Random(voters)
+    votes = {
+        f"user{idx}": random_intervals(rng, BASE, 3, span_minutes=2 * 24 * 60)
+        for idx in range(voters)
+    }
+    compact = CompactTopic.from_topic(topic([], votes))
+    bitsets = AvailabilityBitsets.from_compact(compact)
+    assert bitsets is not None
+
+    expected = [
+        sum(mask >> offset & 1 for mask in bitsets.voters.values())
+        for offset in range(bitsets.size)
+    ]
+    assert list(bitsets.counts()) == expected
+    assert build_topic_stats(compact) == _build_topic_stats_python(compact)
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+
+from app.models import CompactTopic, Interval
+from app.service import topic_stats_numpy
+from app.service.topic_stats import _build_topic_stats_python
+from tests.unit.util import random_intervals, topic
+
+if not topic_stats_numpy.is_available():
+    pytest.skip("numpy is not installed", allow_module_level=True)
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+@pytest.mark.parametrize("seed", range(25))
+@pytest.mark.parametrize("with_constraints", [True, False])
+def test_numpy_backend_matches_python(seed: int, with_constraints: bool) -> None:
+    rng = random.Random(seed)
+    constraints = (
+        random_intervals(rng, BASE, rng.randint(1, 4), span_minutes=3 * 24 * 60)
+        if with_constraints
+        else []
+    )
+    votes = {
+        f"user{idx}": random_intervals(
+            rng, BASE, rng.randint(0, 5), span_minutes=3 * 24 * 60
+        )
+        for idx in range(40)
+    }
+    sample = CompactTopic.from_topic(topic(constraints, votes))
+
+    assert topic_stats_numpy.build_topic_stats(sample) == _build_topic_stats_python(
+        sample
+    )
+
+
+def test_too_wide_horizon_is_left_to_python() -> None:
+    start = datetime(2000, 1, 1)
+    end = datetime(2100, 1, 1)
+    sample = CompactTopic.from_topic(
+        topic([], {"solo": [Interval(start=start, end=end)]})
+    )
+
+    assert topic_stats_numpy.build_topic_stats(sample) is None
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import random
+from datetime import datetime
+
+import pytest
+
+from app.models import SlotGrid
+from app.service.topic_stats import runs_delta
+from app.service.voter_index import SlotVoterIndex, VoterIndexCache
+from tests.unit.util import make_interval, random_intervals, topic
+
+BASE = datetime(2025, 1, 1, 9, 0)
+
+
+def _snapshot(index: SlotVoterIndex) -> dict[int, list[str]]:
+    return {slot: index.voters(slot).voters for slot in index._slots}
+
+
+def test_lookup_returns_slot_voters() -> None:
+    sample = topic(
+        [],
+        {
+            "bob": [make_interval(BASE, minutes=(15, 45))],
+            "alice": [make_interval(BASE, hours=(0, 1))],
+        },
+    )
+    index = SlotVoterIndex.from_topic(sample)
+    slot = index.grid.floor(BASE.replace(minute=20))
+
+    found = index.voters(slot)
+
+    assert found.voters == ["alice", "bob"]
+    assert (found.start, found.end) == (
+        BASE.replace(minute=15),
+        BASE.replace(minute=30),
+    )
+    assert index.voters(slot + 4).voters == []
+    assert [s.voters for s in index.voters_between(slot - 2, slot + 10)] == [
+        ["alice"],
+        ["alice", "bob"],
+        ["alice", "bob"],
+        ["alice"],
+    ]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_incremental_updates_match_rebuild(seed: int) -> None:
+    rng = random.Random(seed)
+    sample = topic([], {})
+    index = SlotVoterIndex.from_topic(sample)
+
+    for _ in range(30):
+        username = f"user{rng.randrange(6)}"
+        vote = random_intervals(rng, BASE, rng.randint(0, 3))
+        grid = SlotGrid.for_topic(sample)
+        previous = grid.to_runs(sample.votes.get(username, []))
+        index.apply(username, runs_delta(previous, grid.to_runs(vote)))
+        sample.votes[username] = vote
+
+        assert _snapshot(index) == _snapshot(SlotVoterIndex.from_topic(sample))
+
+
+def test_cache_advances_only_from_previous_version() -> None:
+    sample = topic([], {"alice": [make_interval(BASE, hours=(0, 1))]})
+    cache = VoterIndexCache(max_entries=2)
+    cache.put("tid", 3, SlotVoterIndex.from_topic(sample))
+
+    cache.advance("tid", 4, "bob", {0: 1})
+    assert cache.get("tid", 3) is None
+    assert cache.get("tid", 4).voters(0).voters == ["bob"]
+
+    cache.advance("tid", 6, "bob", {0: -1})
+    assert len(cache) == 0
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import random
 from datetime import datetime, timedelta
 
 from app.models import Interval, Topic
 
 
-def topic(constraints: list[Interval], votes: dict[str, list[Interval]]) -> Topic:
+def topic(
+    constraints: list[Interval],
+    votes: dict[str, list[Interval]],
+    slot_minutes: int = 15,
+) -> Topic:
     return Topic(
         topic_id="tid",
         topic_name="Demo",
@@ -14,6 +19,7 @@ def topic(constraints: list[Interval], votes: dict[str, list[Interval]]) -> Topi
         constraints=constraints,
         votes=votes,
         created_at=datetime(2025, 1, 1, 8, 0),
+        slot_minutes=slot_minutes,
     )
 
 
@@ -37,3 +43,13 @@ def make_simple_tuple(
 
 def simplify(blocks: list) -> list[tuple[datetime, datetime]]:
     return [(block.start, block.end) for block in blocks]
+
+
+def random_intervals(
+    rng: random.Random, base: datetime, count: int, span_minutes: int = 24 * 60
+) -> list[Interval]:
+    intervals = []
+    for _ in range(count):
+        start = rng.randrange(0, span_minutes, 5)
+        intervals.append(make_interval(base, (start, start + rng.randrange(0, 300, 5))))
+    return intervals